@@ -5,10 +5,37 @@ Canonical, dependency-light building blocks used by lab and sim layers.
 from __future__ import annotations
 
 from .managers import ActionSpec, ActionManager, SensorManager, RewardManager
+from .observation import ObservationLayout, ObservationBuffer, DEFAULT_LAYOUT, POLICY_SPAN
+from .history import ObservationHistory
+from .rotations import frame_features, quat_from_matrices, yaw_from_matrices, yaw_from_quats
+from .rewards import REWARD_TERMS, CompiledReward, register_reward_term, load_reward_weights
+from .batched import BatchedActionManager, BatchedSensorManager, BatchedRewardManager
+from .occupancy import GridSpec, OccupancyGrid, rasterize
+from .spawn import SpawnSampler
 
 __all__ = [
     "ActionSpec",
     "ActionManager",
     "SensorManager",
     "RewardManager",
+    "ObservationLayout",
+    "ObservationBuffer",
+    "DEFAULT_LAYOUT",
+    "POLICY_SPAN",
+    "ObservationHistory",
+    "frame_features",
+    "quat_from_matrices",
+    "yaw_from_matrices",
+    "yaw_from_quats",
+    "REWARD_TERMS",
+    "CompiledReward",
+    "register_reward_term",
+    "load_reward_weights",
+    "BatchedActionManager",
+    "BatchedSensorManager",
+    "BatchedRewardManager",
+    "GridSpec",
+    "OccupancyGrid",
+    "rasterize",
+    "SpawnSampler",
 ]
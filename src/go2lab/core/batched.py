@@ -0,0 +1,164 @@
+"""Batched (N-robot) variants of the manager test doubles.
+
+Same contract as go2lab.core.managers, but the state of all robots lives in
+contiguous (N, ...) NumPy arrays so clamping, scaling, differentiation and
+reward evaluation run as one vectorized call per step:
+- BatchedActionManager: clamps/scales (N, 3) actions and forwards them to the controller(s)
+- BatchedSensorManager: writes (N, D) observation rows (go2lab.core.observation) from N base prims
+- BatchedRewardManager: per-robot reward terms as (N,) arrays (fused go2lab.core.rewards evaluation)
+
+Outputs use the same keys as SensorManager.observe()/RewardManager.compute().
+Pass as_torch=True to get zero-copy torch views of the same buffers.
+"""
+from __future__ import annotations
+
+from typing import Dict, Any, Sequence
+import math
+
+import numpy as np
+from ..sim.util.xform_cache import shared_xform_cache
+from .history import ObservationHistory
+from .managers import ActionSpec, _with_scan_fields
+from .rotations import frame_features
+from .observation import DEFAULT_LAYOUT, ObservationBuffer, ObservationLayout
+from .rewards import CompiledReward, load_reward_weights
+
+
+def _views(arrays: Dict[str, np.ndarray], as_torch: bool) -> Dict[str, Any]:
+    # torch.from_numpy shares memory, so the dict can be built once and reused every step
+    if not as_torch:
+        return dict(arrays)
+    import torch  # type: ignore
+
+    return {k: torch.from_numpy(v) for k, v in arrays.items()}
+
+
+class BatchedActionManager:
+    def __init__(self, controller, spec: ActionSpec, num_envs: int):
+        # controller: object exposing set_cmds((N, 3)) or a sequence of N per-robot controllers
+        self.ctrl = controller
+        self.spec = spec
+        self.num_envs = int(num_envs)
+        self._scale = np.array([spec.scale_lin_xy, spec.scale_lin_xy, spec.scale_yaw], dtype=np.float32)
+        self.action = np.zeros((self.num_envs, 3), dtype=np.float32)
+        self.prev_action = np.zeros((self.num_envs, 3), dtype=np.float32)
+        self.delta = np.zeros((self.num_envs, 3), dtype=np.float32)
+
+    def apply(self, actions) -> np.ndarray:
+        # actions = (N, 3) [ax, ay, ayaw] in [-1, 1]; CPU torch tensors are accepted as-is
+        a = np.asarray(actions, dtype=np.float32)
+        self.prev_action[:] = self.action
+        np.clip(a, -1.0, 1.0, out=self.action)
+        self.action *= self._scale
+        np.subtract(self.action, self.prev_action, out=self.delta)
+        if hasattr(self.ctrl, "set_cmds"):
+            self.ctrl.set_cmds(self.action)
+        else:
+            for ctrl, (ax, ay, ayaw) in zip(self.ctrl, self.action.tolist()):
+                ctrl.set_cmd(ax, ay, ayaw)
+        return self.action
+
+    def reset(self, env_ids=None) -> None:
+        ids = slice(None) if env_ids is None else env_ids
+        self.action[ids] = 0.0
+        self.prev_action[ids] = 0.0
+        self.delta[ids] = 0.0
+
+
+class BatchedSensorManager:
+    def __init__(self, stage, base_prims: Sequence, as_torch: bool = False, layout: ObservationLayout = DEFAULT_LAYOUT,
+                 history_len: int = 0, raycaster=None):
+        self.stage = stage
+        self.bases = list(base_prims)
+        # optional go2lab.core.raycast.RayCaster: height_scan/lidar slices appended to the layout
+        self.raycaster = raycaster
+        layout = _with_scan_fields(layout, raycaster)
+        self.num_envs = n = len(self.bases)
+        self._paths = [prim.GetPath() for prim in self.bases]
+        self._xf = shared_xform_cache(stage)
+        self._mats = np.zeros((n, 4, 4), dtype=np.float64)
+        self._prev_pos = np.zeros((n, 3), dtype=np.float64)
+        self._prev_yaw = np.zeros(n, dtype=np.float64)
+        self._has_prev = np.zeros(n, dtype=bool)
+
+        # (N, D) float32 observation rows written in place; observe() returns dict views of them
+        self.obs_buf = ObservationBuffer(layout, num_envs=n)
+        self._buf = self.obs_buf.as_dict()
+        self._out = self.obs_buf.as_dict(as_torch=as_torch)
+        # optional (N, K, D) window of the last K observation rows
+        self.history = ObservationHistory(n, history_len, layout.dim) if history_len > 0 else None
+
+    def _read_transforms(self) -> np.ndarray:
+        return self._xf.world_matrices(self._paths, out=self._mats)
+
+    def observe(self, dt: float) -> Dict[str, Any]:
+        return self.observe_matrices(self._read_transforms(), dt)
+
+    def observe_matrices(self, mats: np.ndarray, dt: float) -> Dict[str, Any]:
+        """Build observations from (N, 4, 4) Gf-layout matrices (translation in the last row)."""
+        b = self._buf
+        pos = mats[:, 3, :3]
+        yaw, quat, up, _ = frame_features(mats)
+        b["up_dot"][:] = up[:, 2]
+
+        inv_dt = 1.0 / max(dt, 1e-6)
+        # wrap yaw diff to [-pi, pi]
+        dyaw = (yaw - self._prev_yaw + math.pi) % (2 * math.pi) - math.pi
+        np.multiply(pos - self._prev_pos, inv_dt, out=b["base_lin_vel"])
+        b["base_ang_vel"][:, 2] = dyaw * inv_dt
+        first = ~self._has_prev
+        b["base_lin_vel"][first] = 0.0
+        b["base_ang_vel"][first] = 0.0
+
+        self._prev_pos[:] = pos
+        self._prev_yaw[:] = yaw
+        self._has_prev[:] = True
+
+        b["imu_quat"][:] = quat
+        b["base_height"][:] = pos[:, 2]
+        b["yaw"][:] = yaw
+        b["pos"][:] = pos
+        if self.raycaster is not None:
+            self.raycaster.observe(self.obs_buf, pos, yaw)
+        if self.history is not None:
+            self.history.push(self.obs_buf.data)
+        return self._out
+
+    def reset(self, env_ids=None) -> None:
+        ids = slice(None) if env_ids is None else env_ids
+        self._has_prev[ids] = False
+        if self.history is not None:
+            self.history.reset(env_ids)
+
+
+class BatchedRewardManager:
+    def __init__(self, num_envs: int, action_mgr: BatchedActionManager | None = None, as_torch: bool = False,
+                 weights: Dict[str, float] | None = None):
+        self.num_envs = n = int(num_envs)
+        self.action_mgr = action_mgr
+        self._prev_action = np.zeros((n, 3), dtype=np.float32)
+        self._delta = np.zeros((n, 3), dtype=np.float32)
+        self.reward = CompiledReward(weights if weights is not None else load_reward_weights(), num_envs=n)
+        self._out = _views(self.reward.breakdown, as_torch)
+
+    def compute(self, obs: Dict[str, Any], action) -> Dict[str, Any]:
+        act = np.asarray(action, dtype=np.float32)
+        # smoothness based on delta action (scaled commands after BatchedActionManager)
+        if self.action_mgr is not None:
+            delta = self.action_mgr.delta
+        else:
+            delta = np.subtract(act, self._prev_action, out=self._delta)
+        self.reward.evaluate(obs, act, delta)
+        self._prev_action[:] = act
+        return self._out
+
+    def reset(self, env_ids=None) -> None:
+        ids = slice(None) if env_ids is None else env_ids
+        self._prev_action[ids] = 0.0
+
+
+__all__ = [
+    "BatchedActionManager",
+    "BatchedSensorManager",
+    "BatchedRewardManager",
+]
@@ -0,0 +1,58 @@
+"""Preallocated observation history with zero-copy (N, K, D) windows.
+
+Frames are written twice into a (N, 2K, D) ring so the last K frames are always the
+slice [head, head + K) of the storage: push() is two row writes and view() is a
+slice, whatever K is. Each robot's window is one contiguous (K, D) block ordered
+oldest -> newest. Robots flagged by reset() have their whole window filled with the
+next pushed frame (the usual frame-stacking reset).
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+class ObservationHistory:
+    def __init__(self, num_envs: int, history_len: int, dim: int, dtype=np.float32):
+        if history_len < 1:
+            raise ValueError("history_len must be >= 1")
+        self.num_envs = int(num_envs)
+        self.history_len = k = int(history_len)
+        self.dim = int(dim)
+        self._buf = np.zeros((self.num_envs, 2 * k, self.dim), dtype=dtype)
+        self._head = 0
+        self._pending = np.ones(self.num_envs, dtype=bool)
+        self._torch = None
+
+    def push(self, frame) -> None:
+        """Append one (N, D) frame for every robot."""
+        k = self.history_len
+        h = self._head
+        self._buf[:, h] = frame
+        self._buf[:, h + k] = frame
+        if self._pending.any():
+            ids = np.flatnonzero(self._pending)
+            self._buf[ids] = self._buf[ids, h:h + 1]
+            self._pending[ids] = False
+        self._head = (h + 1) % k
+
+    def view(self) -> np.ndarray:
+        """(N, K, D) view of the last K frames, oldest first (no copy)."""
+        return self._buf[:, self._head:self._head + self.history_len]
+
+    def torch(self):
+        """Same window as a torch tensor sharing memory with the ring."""
+        if self._torch is None:
+            import torch  # type: ignore
+
+            self._torch = torch.from_numpy(self._buf)
+        return self._torch[:, self._head:self._head + self.history_len]
+
+    def latest(self) -> np.ndarray:
+        return self._buf[:, (self._head - 1) % self.history_len + self.history_len]
+
+    def reset(self, env_ids=None) -> None:
+        """Refill the given robots' windows with their next pushed frame."""
+        self._pending[slice(None) if env_ids is None else env_ids] = True
+
+
+__all__ = ["ObservationHistory"]
@@ -2,8 +2,11 @@
 
 This does NOT depend on Isaac Lab runtime. It mirrors the idea of managers:
 - ActionManager: scales/clamps actions and applies to controller
-- SensorManager: builds observation dict from USD transform, computes vel/height/quat
+- SensorManager: writes observations from the (cached) USD world transform into a fixed-layout
+  buffer (go2lab.core.observation), computes vel/height/yaw/quat via go2lab.core.rotations;
+  with a go2lab.core.raycast.RayCaster it also fills height_scan/lidar fields
 - RewardManager: combines forward progress, smoothness, survive, lateral penalty, uprightness
+  (terms/weights from go2lab.core.rewards, configured in configs/go2_task_config.yaml)
 
 Environment runs in Isaac Sim 5.0 via our existing sim utilities.
 """
@@ -13,7 +16,13 @@ from dataclasses import dataclass
 from typing import Dict, Any
 import math
 
-from pxr import UsdGeom, Gf  # type: ignore
+import numpy as np
+from pxr import Gf  # type: ignore
+
+from ..sim.util.xform_cache import shared_xform_cache
+from .observation import DEFAULT_LAYOUT, DEFAULT_OBS_FIELDS, ObservationBuffer, ObservationLayout
+from .rotations import frame_features
+from .rewards import CompiledReward, load_reward_weights
 
 
 @dataclass
@@ -37,101 +46,95 @@ class ActionManager:
         self.prev_action = (ax, ay, ayaw)
 
 
+def _with_scan_fields(layout: ObservationLayout, raycaster) -> ObservationLayout:
+    # append the raycaster's fields unless the layout already places them
+    if raycaster is None:
+        return layout
+    missing = [f for f in raycaster.fields if f[0] not in layout.names]
+    return layout.extend(*missing) if missing else layout
+
+
 class SensorManager:
-    def __init__(self, stage, base_prim):
+    def __init__(self, stage, base_prim, layout: ObservationLayout = DEFAULT_LAYOUT, raycaster=None):
+        if layout.fields[:len(DEFAULT_OBS_FIELDS)] != DEFAULT_OBS_FIELDS:
+            raise ValueError("Observation layout must start with DEFAULT_OBS_FIELDS")
+        # optional go2lab.core.raycast.RayCaster: height_scan/lidar slices appended to the layout
+        self.raycaster = raycaster
+        layout = _with_scan_fields(layout, raycaster)
         self.stage = stage
         self.base = base_prim
-        self._prev_pos: Gf.Vec3d | None = None
+        self._xf = shared_xform_cache(stage)
+        self._prev_pos: np.ndarray | None = None
         self._prev_yaw: float | None = None
-
-    @staticmethod
-    def _yaw_from_mat(m: Gf.Matrix4d) -> float:
-        # yaw from rotation matrix (z-up)
-        r00 = m[0][0]
-        r10 = m[1][0]
-        return math.atan2(r10, r00)
+        # observations are written in place into one float32 row; observe() returns dict views of it
+        self.obs_buf = ObservationBuffer(layout, num_envs=1)
+        self._row = self.obs_buf.data[0]
+        self._sl = self.obs_buf.slices
+        self._obs = self.obs_buf.as_dict(0)
 
     def _read_transform(self) -> Gf.Matrix4d:
-        xform = UsdGeom.Xformable(self.base)
-        ops = xform.GetOrderedXformOps()
-        if ops:
-            try:
-                return ops[0].GetOpTransform(0.0)
-            except Exception:
-                pass
-        return Gf.Matrix4d(1.0)
+        # world transform (all ops + parents) through the stage-wide cached reader
+        try:
+            return self._xf.world_matrix(self.base.GetPath())
+        except Exception:
+            return Gf.Matrix4d(1.0)
+
+    def reset(self) -> None:
+        # forget the previous pose (e.g. after a teleport): the next observe() reports zero velocity
+        self._prev_pos = None
+        self._prev_yaw = None
 
     def observe(self, dt: float) -> Dict[str, Any]:
-        m = self._read_transform()
-        pos = Gf.Vec3d(m.ExtractTranslation())
-        yaw = self._yaw_from_mat(m)
-        # up vector = third column of rotation (assuming z-up)
-        up = Gf.Vec3d(m[0][2], m[1][2], m[2][2])
-        up_dot = float(up.GetNormalized().Dot(Gf.Vec3d(0, 0, 1))) if up.GetLength() > 1e-6 else 1.0
+        m = np.array(self._read_transform())
+        # yaw, full orientation quaternion (x, y, z, w) and body up axis from go2lab.core.rotations
+        yaw, quat, up, _ = frame_features(m)
+        yaw = float(yaw)
+        pos = m[3, :3]
 
         if self._prev_pos is None:
-            lin = Gf.Vec3d(0, 0, 0)
+            lin = 0.0
             ang_z = 0.0
         else:
-            dpos = pos - self._prev_pos
             dyaw = yaw - (self._prev_yaw or 0.0)
             # wrap yaw diff to [-pi, pi]
             dyaw = (dyaw + math.pi) % (2 * math.pi) - math.pi
-            lin = dpos / max(dt, 1e-6)
+            lin = (pos - self._prev_pos) / max(dt, 1e-6)
             ang_z = dyaw / max(dt, 1e-6)
 
         self._prev_pos = pos
         self._prev_yaw = yaw
 
-        # imu quaternion: yaw-only approximation
-        half = 0.5 * yaw
-        imu_quat = (0.0, 0.0, math.sin(half), math.cos(half))
-
-        return {
-            "base_lin_vel": (float(lin[0]), float(lin[1]), float(lin[2])),
-            "base_ang_vel": (0.0, 0.0, float(ang_z)),
-            "base_height": float(pos[2]),
-            "imu_quat": imu_quat,
-            "up_dot": up_dot,
-            "yaw": float(yaw),
-            "pos": (float(pos[0]), float(pos[1]), float(pos[2])),
-        }
+        row, sl = self._row, self._sl
+        row[sl["base_lin_vel"]] = lin
+        row[sl["base_ang_vel"]] = (0.0, 0.0, ang_z)
+        row[sl["base_height"]] = pos[2]
+        row[sl["up_dot"]] = up[2]
+        row[sl["yaw"]] = yaw
+        row[sl["pos"]] = pos
+        row[sl["imu_quat"]] = quat
+        if self.raycaster is not None:
+            self.raycaster.observe(self.obs_buf, pos[None], np.array([yaw]))
+        return self._obs
 
 
 class RewardManager:
-    def __init__(self, action_mgr: ActionManager | None = None):
+    def __init__(self, action_mgr: ActionManager | None = None, weights: Dict[str, float] | None = None):
         self.action_mgr = action_mgr
         self._prev_action = (0.0, 0.0, 0.0)
+        # weights come from the `rewards:` section of configs/go2_task_config.yaml unless given
+        self.reward = CompiledReward(weights if weights is not None else load_reward_weights(), num_envs=1)
+        self._action = np.zeros((1, 3), dtype=np.float32)
+        self._delta = np.zeros((1, 3), dtype=np.float32)
+        self._breakdown = tuple(self.reward.breakdown.items())
 
     def compute(self, obs: Dict[str, Any], action) -> Dict[str, float]:
-        # weights (can be tuned)
-        w_survive = 0.01
-        w_forward = 0.05
-        w_smooth = 0.002
-        w_lat_pen = 0.02
-        w_upright = 0.02
-
-        survive_bonus = w_survive
-        forward_progress = w_forward * max(obs.get("base_lin_vel", (0, 0, 0))[0], 0.0)
         # smoothness based on delta action (scaled commands after ActionManager)
         prev = getattr(self.action_mgr, "prev_action", self._prev_action) if self.action_mgr else self._prev_action
-        da0 = action[0] - prev[0]
-        da1 = action[1] - prev[1]
-        da2 = action[2] - prev[2]
-        smoothness = -w_smooth * (da0 * da0 + da1 * da1 + da2 * da2)
-        lateral_pen = -w_lat_pen * abs(obs.get("base_lin_vel", (0, 0, 0))[1])
-        upright = w_upright * max(0.0, obs.get("up_dot", 1.0))
-
-        total = survive_bonus + forward_progress + smoothness + lateral_pen + upright
+        self._action[0] = action[:3]
+        np.subtract(self._action, prev, out=self._delta)
+        self.reward.evaluate(obs, self._action, self._delta)
         self._prev_action = action
-        return {
-            "survive_bonus": survive_bonus,
-            "forward_progress": forward_progress,
-            "smoothness": smoothness,
-            "lateral_pen": lateral_pen,
-            "upright": upright,
-            "reward": total,
-        }
+        return {name: float(v[0]) for name, v in self._breakdown}
 
 
 __all__ = [
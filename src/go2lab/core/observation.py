@@ -0,0 +1,106 @@
+"""Fixed-layout observation buffer shared by sensors and policies.
+
+ObservationLayout names contiguous slices of one float32 row per robot. Sensors write
+into ObservationBuffer.data in place every step; policies read zero-copy NumPy/torch
+views of the same memory, and as_dict() keeps the observe() dict keys for existing
+scripts (size-1 fields are exposed as scalars, i.e. 0-d / (N,) views).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+# (name, size) in buffer order; the first five fields are the 9-dim policy input
+DEFAULT_OBS_FIELDS: Tuple[Tuple[str, int], ...] = (
+    ("base_lin_vel", 3),
+    ("base_ang_vel", 3),
+    ("base_height", 1),
+    ("up_dot", 1),
+    ("yaw", 1),
+    ("pos", 3),
+    ("imu_quat", 4),
+)
+
+
+@dataclass(frozen=True)
+class ObservationLayout:
+    fields: Tuple[Tuple[str, int], ...] = DEFAULT_OBS_FIELDS
+
+    @property
+    def dim(self) -> int:
+        return sum(size for _, size in self.fields)
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(name for name, _ in self.fields)
+
+    def slice(self, name: str) -> slice:
+        start = 0
+        for n, size in self.fields:
+            if n == name:
+                return slice(start, start + size)
+            start += size
+        raise KeyError(name)
+
+    def span(self, first: str, last: str) -> slice:
+        """Contiguous slice covering fields first..last (inclusive)."""
+        return slice(self.slice(first).start, self.slice(last).stop)
+
+    def extend(self, *fields: Tuple[str, int]) -> "ObservationLayout":
+        return ObservationLayout(self.fields + tuple(fields))
+
+
+DEFAULT_LAYOUT = ObservationLayout()
+# Policy input used by policy_inference_lab_go2: lin vel, ang vel, height, up_dot, yaw
+POLICY_SPAN = DEFAULT_LAYOUT.span("base_lin_vel", "yaw")
+
+
+class ObservationBuffer:
+    def __init__(self, layout: ObservationLayout = DEFAULT_LAYOUT, num_envs: int = 1):
+        self.layout = layout
+        self.num_envs = int(num_envs)
+        self.data = np.zeros((self.num_envs, layout.dim), dtype=np.float32)
+        self.slices: Dict[str, slice] = {name: layout.slice(name) for name in layout.names}
+        self._dicts: Dict[Any, Dict[str, Any]] = {}
+        self._torch = None
+
+    def torch(self):
+        """Zero-copy torch view of the (N, D) buffer."""
+        if self._torch is None:
+            import torch  # type: ignore
+
+            self._torch = torch.from_numpy(self.data)
+        return self._torch
+
+    def field(self, name: str) -> np.ndarray:
+        return self.data[:, self.slices[name]]
+
+    def as_dict(self, env: int | None = None, as_torch: bool = False) -> Dict[str, Any]:
+        """Dict of views keyed like SensorManager.observe(): (N, k)/(N,) batched or (k,)/0-d for one env."""
+        key = (env, as_torch)
+        d = self._dicts.get(key)
+        if d is None:
+            src = self.torch() if as_torch else self.data
+            d = {}
+            for name, sl in self.slices.items():
+                size = sl.stop - sl.start
+                if env is None:
+                    d[name] = src[:, sl.start] if size == 1 else src[:, sl]
+                else:
+                    d[name] = src[env, sl].reshape(()) if size == 1 else src[env, sl]
+            self._dicts[key] = d
+        return d
+
+    def reset(self, env_ids=None) -> None:
+        self.data[slice(None) if env_ids is None else env_ids] = 0.0
+
+
+__all__ = [
+    "DEFAULT_OBS_FIELDS",
+    "DEFAULT_LAYOUT",
+    "POLICY_SPAN",
+    "ObservationLayout",
+    "ObservationBuffer",
+]
@@ -0,0 +1,216 @@
+"""2D occupancy grid, Euclidean distance field and heightmap of static geometry.
+
+Static geometry comes in as axis-aligned boxes (N, 6) = [xmin, ymin, zmin, xmax, ymax, zmax]
+(see go2lab.sim.util.static_geometry). rasterize() marks every cell whose center lies in
+the footprint of a box that starts below `max_z` (boxes entirely above the robot do not
+block it), records the highest box top per cell, and computes the distance (meters) from
+each cell center to the nearest occupied cell. Cells outside the grid count as occupied.
+
+Grids are saved as plain .npy files plus meta.json and loaded memory-mapped, so run-time
+free-space queries are O(1) array lookups without reading the whole map.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+GRID_FORMAT = 1
+_ARRAYS = ("occupied", "distance", "height")
+
+
+@dataclass(frozen=True)
+class GridSpec:
+    resolution: float = 0.05   # meters per cell
+    max_z: float = 1.0         # boxes starting at or above this height do not block
+    floor_z: float = 0.0
+    min_height: float = 0.02   # boxes whose top is within this of the floor are floor, not obstacles
+    padding: float = 0.5       # margin around the geometry bounds
+
+
+def _edt_rows(g2: np.ndarray) -> np.ndarray:
+    # exact 1D pass: d[i, x] = min_x' (x - x')^2 + g2[i, x'], scanning offsets k = |x - x'|
+    # outwards until k^2 exceeds every current minimum (so the cost follows the free-space radius)
+    out = g2.copy()
+    w = g2.shape[1]
+    for k in range(1, w):
+        kk = float(k * k)
+        if kk >= out.max():
+            break
+        np.minimum(out[:, k:], g2[:, :-k] + kk, out=out[:, k:])
+        np.minimum(out[:, :-k], g2[:, k:] + kk, out=out[:, :-k])
+    return out
+
+
+def distance_field(occupied: np.ndarray, resolution: float) -> np.ndarray:
+    """(H, W) float32 Euclidean distance (meters) from each cell to the nearest occupied cell."""
+    free = ~occupied.astype(bool)
+    if not free.any():
+        return np.zeros(occupied.shape, dtype=np.float32)
+    if free.all():
+        return np.full(occupied.shape, np.inf, dtype=np.float32)
+    try:
+        from scipy.ndimage import distance_transform_edt  # type: ignore
+
+        return (distance_transform_edt(free) * resolution).astype(np.float32)
+    except ImportError:
+        pass
+    # separable exact EDT without scipy: nearest obstacle along each column, then rows
+    h, w = free.shape
+    big = float(h + w) ** 2
+    idx = np.arange(h)[:, None]
+    last = np.where(~free, idx, -h - w)
+    last = np.maximum.accumulate(last, axis=0)
+    nxt = np.where(~free, idx, 2 * (h + w))
+    nxt = np.minimum.accumulate(nxt[::-1], axis=0)[::-1]
+    col = np.minimum(idx - last, nxt - idx).astype(np.float64)
+    g2 = np.where(col < h + w, col ** 2, big)
+    return (np.sqrt(_edt_rows(g2)) * resolution).astype(np.float32)
+
+
+class OccupancyGrid:
+    """occupied (H, W) uint8, distance (H, W) float32 [m], height (H, W) float32 [m]; row i is
+    y = origin[1] + (i + 0.5) * resolution, column j is x = origin[0] + (j + 0.5) * resolution."""
+
+    def __init__(self, occupied: np.ndarray, distance: np.ndarray, height: np.ndarray,
+                 origin: Tuple[float, float], resolution: float, key: str = "", spec: Optional[GridSpec] = None):
+        self.occupied = occupied
+        self.distance = distance
+        self.height = height
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.resolution = float(resolution)
+        self.key = key
+        self.spec = spec or GridSpec(resolution=self.resolution)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return tuple(self.occupied.shape)
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """(xmin, ymin, xmax, ymax) covered by the grid."""
+        h, w = self.shape
+        x0, y0 = self.origin
+        return (x0, y0, x0 + w * self.resolution, y0 + h * self.resolution)
+
+    # queries --------------------------------------------------------------
+    def world_to_cell(self, xy) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(rows, cols, inside) for (..., 2) world points; rows/cols are clipped into the grid."""
+        xy = np.asarray(xy, dtype=np.float64)
+        ij = np.floor((xy - self.origin) / self.resolution).astype(np.int64)
+        h, w = self.shape
+        inside = (ij[..., 0] >= 0) & (ij[..., 0] < w) & (ij[..., 1] >= 0) & (ij[..., 1] < h)
+        return np.clip(ij[..., 1], 0, h - 1), np.clip(ij[..., 0], 0, w - 1), inside
+
+    def cell_centers(self, rows, cols) -> np.ndarray:
+        return np.stack([self.origin[0] + (np.asarray(cols) + 0.5) * self.resolution,
+                         self.origin[1] + (np.asarray(rows) + 0.5) * self.resolution], axis=-1)
+
+    def distance_at(self, xy) -> np.ndarray:
+        """Distance to the nearest obstacle [m] at each point (0 outside the grid)."""
+        r, c, inside = self.world_to_cell(xy)
+        return np.where(inside, self.distance[r, c], 0.0).astype(np.float32)
+
+    def height_at(self, xy) -> np.ndarray:
+        r, c, inside = self.world_to_cell(xy)
+        return np.where(inside, self.height[r, c], 0.0).astype(np.float32)
+
+    def is_free(self, xy, clearance: float = 0.0) -> np.ndarray:
+        """True where a point is inside the grid and at least clearance [m] from any obstacle."""
+        r, c, inside = self.world_to_cell(xy)
+        return inside & (self.distance[r, c] > max(clearance, 0.0))
+
+    def free_mask(self, clearance: float = 0.0) -> np.ndarray:
+        return self.distance > max(clearance, 0.0)
+
+    # storage --------------------------------------------------------------
+    def save(self, directory: Path | str) -> Path:
+        """Write occupied/distance/height .npy files and meta.json into directory (atomically
+        renamed into place, so concurrent builders never expose a partial grid)."""
+        directory = Path(directory)
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        tmp = directory.with_name(f".tmp-{os.getpid()}-{directory.name}")
+        tmp.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        meta = {"format": GRID_FORMAT, "key": self.key, "origin": self.origin.tolist(),
+                "resolution": self.resolution, "shape": list(self.shape), "spec": asdict(self.spec)}
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        try:
+            os.rename(tmp, directory)
+        except OSError:
+            # another process finished first (or a stale copy exists): keep theirs
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not (directory / "meta.json").exists():
+                raise
+        return directory
+
+    @classmethod
+    def load(cls, directory: Path | str, mmap: bool = True) -> "OccupancyGrid":
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("format") != GRID_FORMAT:
+            raise ValueError(f"unsupported occupancy grid format in {directory}")
+        arrays = {n: np.load(directory / f"{n}.npy", mmap_mode="r" if mmap else None) for n in _ARRAYS}
+        spec = GridSpec(**meta.get("spec", {}))
+        return cls(origin=tuple(meta["origin"]), resolution=meta["resolution"], key=meta.get("key", ""),
+                   spec=spec, **arrays)
+
+
+def blocking_boxes(boxes: np.ndarray, spec: GridSpec = GridSpec()) -> np.ndarray:
+    """The (k, 6) boxes that block a robot under spec: above the floor and starting below max_z."""
+    boxes = np.asarray(boxes).reshape(-1, 6)
+    return boxes[(boxes[:, 5] > spec.floor_z + spec.min_height) & (boxes[:, 2] < spec.max_z)]
+
+
+def rasterize(boxes: np.ndarray, spec: GridSpec = GridSpec(),
+              bounds: Optional[Tuple[float, float, float, float]] = None, key: str = "") -> OccupancyGrid:
+    """Occupancy grid, distance field and heightmap of (N, 6) boxes over bounds
+    (xmin, ymin, xmax, ymax; default: the boxes' footprint plus spec.padding)."""
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 6)
+    boxes = boxes[boxes[:, 5] > spec.floor_z + spec.min_height]
+    if bounds is None:
+        if len(boxes):
+            lo, hi = boxes[:, :2].min(axis=0), boxes[:, 3:5].max(axis=0)
+        else:
+            lo, hi = np.zeros(2), np.zeros(2)
+        bounds = (lo[0] - spec.padding, lo[1] - spec.padding, hi[0] + spec.padding, hi[1] + spec.padding)
+    res = spec.resolution
+    x0, y0, x1, y1 = bounds
+    w = max(1, int(np.ceil((x1 - x0) / res)))
+    h = max(1, int(np.ceil((y1 - y0) / res)))
+
+    # cell index range [c0, c1) whose centers fall inside each footprint
+    c0 = np.clip(np.ceil((boxes[:, 0] - x0) / res - 0.5), 0, w).astype(np.int64)
+    c1 = np.clip(np.floor((boxes[:, 3] - x0) / res - 0.5) + 1, 0, w).astype(np.int64)
+    r0 = np.clip(np.ceil((boxes[:, 1] - y0) / res - 0.5), 0, h).astype(np.int64)
+    r1 = np.clip(np.floor((boxes[:, 4] - y0) / res - 0.5) + 1, 0, h).astype(np.int64)
+    valid = (c1 > c0) & (r1 > r0)
+
+    # occupancy: 2D difference array over blocking footprints, one cumsum per axis
+    blk = valid & (boxes[:, 2] < spec.max_z)
+    acc = np.zeros((h + 1, w + 1), dtype=np.int32)
+    np.add.at(acc, (r0[blk], c0[blk]), 1)
+    np.add.at(acc, (r0[blk], c1[blk]), -1)
+    np.add.at(acc, (r1[blk], c0[blk]), -1)
+    np.add.at(acc, (r1[blk], c1[blk]), 1)
+    occupied = (acc.cumsum(axis=0).cumsum(axis=1)[:h, :w] > 0).astype(np.uint8)
+
+    # heightmap: paint footprints lowest-top first so each cell keeps the highest top
+    height = np.zeros((h, w), dtype=np.float32)
+    order = np.flatnonzero(valid)
+    order = order[np.argsort(boxes[order, 5], kind="stable")]
+    for k in order.tolist():
+        height[r0[k]:r1[k], c0[k]:c1[k]] = boxes[k, 5]
+
+    # border cells: outside counts as occupied, so free cells cannot be farther than the edge
+    dist = distance_field(np.pad(occupied, 1, constant_values=1), res)[1:-1, 1:-1]
+    return OccupancyGrid(occupied, np.ascontiguousarray(dist), height, (x0, y0), res, key=key, spec=spec)
+
+
+__all__ = ["GridSpec", "OccupancyGrid", "rasterize", "blocking_boxes", "distance_field", "GRID_FORMAT"]
@@ -0,0 +1,127 @@
+"""Reward term registry and fused, preallocated reward evaluation.
+
+Terms are registered by name and write their unweighted value for every robot into a
+preallocated row. CompiledReward resolves the active terms once (from a name -> weight
+mapping, usually the `rewards:` section of configs/go2_task_config.yaml) and evaluates
+them into a (T, N) array followed by a single weighted reduction. Per-term breakdowns
+are views into that array, so they are available without recomputation or new dicts.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping
+import logging
+
+import numpy as np
+
+LOGGER = logging.getLogger("go2lab.rewards")
+
+# fn(obs, action, delta_action, out) -> None; writes the unweighted term into out (N,)
+RewardTermFn = Callable[[Mapping[str, Any], np.ndarray, np.ndarray, np.ndarray], None]
+
+REWARD_TERMS: Dict[str, RewardTermFn] = {}
+
+# Matches the weights previously hardcoded in RewardManager.compute (penalties are negative)
+DEFAULT_REWARD_WEIGHTS: Dict[str, float] = {
+    "survive_bonus": 0.01,
+    "forward_progress": 0.05,
+    "smoothness": -0.002,
+    "lateral_pen": -0.02,
+    "upright": 0.02,
+}
+
+TASK_CONFIG_PATH = Path(__file__).resolve().parents[3] / "configs/go2_task_config.yaml"
+
+# observation defaults for partial obs dicts (terms read obs.get(name, default))
+_ZERO_VEL = np.zeros(3, dtype=np.float32)
+
+
+def register_reward_term(name: str) -> Callable[[RewardTermFn], RewardTermFn]:
+    def _register(fn: RewardTermFn) -> RewardTermFn:
+        REWARD_TERMS[name] = fn
+        return fn
+
+    return _register
+
+
+@register_reward_term("survive_bonus")
+def _survive_bonus(obs, action, delta, out) -> None:
+    out[...] = 1.0
+
+
+@register_reward_term("forward_progress")
+def _forward_progress(obs, action, delta, out) -> None:
+    np.maximum(np.asarray(obs.get("base_lin_vel", _ZERO_VEL))[..., 0], 0.0, out=out)
+
+
+@register_reward_term("smoothness")
+def _smoothness(obs, action, delta, out) -> None:
+    # L2 of the action delta (scaled commands after the action manager)
+    np.einsum("ij,ij->i", delta, delta, out=out)
+
+
+@register_reward_term("lateral_pen")
+def _lateral_pen(obs, action, delta, out) -> None:
+    np.abs(np.asarray(obs.get("base_lin_vel", _ZERO_VEL))[..., 1], out=out)
+
+
+@register_reward_term("upright")
+def _upright(obs, action, delta, out) -> None:
+    np.maximum(np.asarray(obs.get("up_dot", 1.0)), 0.0, out=out)
+
+
+def load_reward_weights(cfg_path: Path | str | None = None) -> Dict[str, float]:
+    """Read the `rewards:` mapping from the task config; fall back to DEFAULT_REWARD_WEIGHTS."""
+    path = Path(cfg_path) if cfg_path else TASK_CONFIG_PATH
+    try:
+        import yaml  # type: ignore
+
+        cfg = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        weights = cfg.get("rewards")
+        if isinstance(weights, dict) and weights:
+            return {str(k): float(v) for k, v in weights.items()}
+    except Exception as e:
+        LOGGER.debug("Using default reward weights (%s): %s", path, e)
+    return dict(DEFAULT_REWARD_WEIGHTS)
+
+
+class CompiledReward:
+    """Configured reward terms resolved once into a fused evaluation over N robots.
+
+    Every configured term keeps its breakdown key; terms weighted 0 are not evaluated and
+    stay 0."""
+
+    def __init__(self, weights: Mapping[str, float], num_envs: int = 1):
+        configured = [(name, float(w)) for name, w in weights.items()]
+        unknown = [name for name, _ in configured if name not in REWARD_TERMS]
+        if unknown:
+            raise KeyError(f"Unknown reward term(s): {', '.join(unknown)}")
+        self.num_envs = n = int(num_envs)
+        self.names = tuple(name for name, _ in configured)
+        self.weights = np.array([w for _, w in configured], dtype=np.float32).reshape(-1, 1)
+        # raw (unweighted) and weighted per-term values, plus the per-robot total
+        self.terms = np.zeros((len(self.names), n), dtype=np.float32)
+        self.weighted = np.zeros_like(self.terms)
+        self.total = np.zeros(n, dtype=np.float32)
+        # (fn, row) of the terms with a non-zero weight
+        self._active = tuple((REWARD_TERMS[name], self.terms[i])
+                             for i, (name, w) in enumerate(configured) if w != 0.0)
+        self.breakdown: Dict[str, np.ndarray] = {name: self.weighted[i] for i, name in enumerate(self.names)}
+        self.breakdown["reward"] = self.total
+
+    def evaluate(self, obs: Mapping[str, Any], action: np.ndarray, delta: np.ndarray) -> np.ndarray:
+        for fn, row in self._active:
+            fn(obs, action, delta, row)
+        np.multiply(self.terms, self.weights, out=self.weighted)
+        self.weighted.sum(axis=0, out=self.total)
+        return self.total
+
+
+__all__ = [
+    "REWARD_TERMS",
+    "DEFAULT_REWARD_WEIGHTS",
+    "RewardTermFn",
+    "register_reward_term",
+    "load_reward_weights",
+    "CompiledReward",
+]
@@ -0,0 +1,152 @@
+"""Vectorized rotation kernels for batches of poses (NumPy arrays or torch tensors).
+
+Matrices use the USD/Gf row-vector layout, i.e. what np.array(Gf.Matrix4d) returns:
+rows 0..2 are the body x/y/z axes expressed in world, translation is the last row.
+Both (..., 4, 4) and (..., 3, 3) inputs are accepted; per-axis scale is removed.
+Quaternions are (x, y, z, w) unless scalar_first=True, matching scipy's convention.
+
+All functions operate on any leading batch shape and return the same array type.
+"""
+from __future__ import annotations
+
+from typing import Any, Tuple
+
+import numpy as np
+
+
+def _xp(x) -> Any:
+    # array namespace for x: torch for tensors, NumPy otherwise
+    if type(x).__module__.startswith("torch"):
+        import torch  # type: ignore
+
+        return torch
+    return np
+
+
+def _rows(m):
+    """Unit body axes of Gf-layout matrices as nine (...,) arrays: rows[i][j] = axis i, world component j."""
+    xp = _xp(m)
+    r = xp.moveaxis(m[..., :3, :3], (-2, -1), (0, 1))
+    n = xp.sqrt((r * r).sum(1))
+    r = r / xp.where(n > 1e-12, n, xp.ones_like(n))[:, None]
+    return tuple(tuple(r[i, j] for j in range(3)) for i in range(3))
+
+
+def _order(q, scalar_first: bool):
+    xp = _xp(q)
+    if scalar_first:
+        return xp.stack((q[..., 1], q[..., 2], q[..., 3], q[..., 0]), -1)
+    return q
+
+
+def _reorder(q, scalar_first: bool):
+    xp = _xp(q)
+    if scalar_first:
+        return xp.stack((q[..., 3], q[..., 0], q[..., 1], q[..., 2]), -1)
+    return q
+
+
+def yaw_from_matrices(m):
+    """Heading about +z in radians, (...,)."""
+    xp = _xp(m)
+    return xp.arctan2(m[..., 0, 1], m[..., 0, 0])
+
+
+def up_from_matrices(m):
+    """Body z axis in world, (..., 3)."""
+    return _xp(m).stack(_rows(m)[2], -1)
+
+
+def projected_gravity_from_matrices(m):
+    """Unit gravity (0, 0, -1) expressed in the body frame, (..., 3)."""
+    rows = _rows(m)
+    return -_xp(m).stack((rows[0][2], rows[1][2], rows[2][2]), -1)
+
+
+def _quat_from_rows(xp, rows, scalar_first: bool):
+    # Shepperd's method: solve for the largest of |w|, |x|, |y|, |z| first, selected branch-free.
+    # With column-vector R = rows^T, R_ij = rows[j][i].
+    (r00, r10, r20), (r01, r11, r21), (r02, r12, r22) = rows
+    t0, t1, t2, t3 = r00 + r11 + r22, r00 - r11 - r22, r11 - r00 - r22, r22 - r00 - r11
+    a, b, c = r21 - r12, r02 - r20, r10 - r01
+    d, e, f = r01 + r10, r02 + r20, r12 + r21
+    s1 = (t1 > t0) & (t1 >= t2) & (t1 >= t3)
+    s2 = (t2 > t0) & (t2 > t1) & (t2 >= t3)
+    s3 = (t3 > t0) & (t3 > t1) & (t3 > t2)
+
+    def pick(v0, v1, v2, v3):
+        return xp.where(s3, v3, xp.where(s2, v2, xp.where(s1, v1, v0)))
+
+    # each candidate (x, y, z, w) is 4 * pivot * q; normalizing removes the scale
+    q = xp.stack((
+        pick(a, 1.0 + t1, d, e),
+        pick(b, d, 1.0 + t2, f),
+        pick(c, e, f, 1.0 + t3),
+        pick(1.0 + t0, a, b, c),
+    ), -1)
+    q = q / xp.sqrt((q * q).sum(-1, keepdims=True))
+    q = xp.where(q[..., 3:4] < 0, -q, q)
+    return _reorder(q, scalar_first)
+
+
+def quat_from_matrices(m, scalar_first: bool = False):
+    """Full orientation quaternion with w >= 0, (..., 4)."""
+    return _quat_from_rows(_xp(m), _rows(m), scalar_first)
+
+
+def yaw_from_quats(q, scalar_first: bool = False):
+    xp = _xp(q)
+    x, y, z, w = (_order(q, scalar_first)[..., i] for i in range(4))
+    return xp.arctan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+
+
+def up_from_quats(q, scalar_first: bool = False):
+    xp = _xp(q)
+    x, y, z, w = (_order(q, scalar_first)[..., i] for i in range(4))
+    return xp.stack((2.0 * (x * z + w * y), 2.0 * (y * z - w * x), 1.0 - 2.0 * (x * x + y * y)), -1)
+
+
+def projected_gravity_from_quats(q, scalar_first: bool = False):
+    xp = _xp(q)
+    x, y, z, w = (_order(q, scalar_first)[..., i] for i in range(4))
+    return xp.stack((2.0 * (w * y - x * z), -2.0 * (y * z + w * x), 2.0 * (x * x + y * y) - 1.0), -1)
+
+
+def quat_from_yaw(yaw, scalar_first: bool = False):
+    xp = _xp(yaw)
+    half = 0.5 * yaw
+    zero = xp.zeros_like(half)
+    return _reorder(xp.stack((zero, zero, xp.sin(half), xp.cos(half)), -1), scalar_first)
+
+
+def rotate_by_yaw(v, yaw):
+    """Rotate (..., 3) vectors about +z by yaw (radians)."""
+    xp = _xp(v)
+    c, s = xp.cos(yaw), xp.sin(yaw)
+    return xp.stack((c * v[..., 0] - s * v[..., 1], s * v[..., 0] + c * v[..., 1], v[..., 2] + 0.0 * c), -1)
+
+
+def frame_features(m, scalar_first: bool = False) -> Tuple[Any, Any, Any, Any]:
+    """(yaw, quat, up, projected_gravity) for a batch of Gf-layout matrices in one pass."""
+    xp = _xp(m)
+    rows = _rows(m)
+    return (
+        xp.arctan2(rows[0][1], rows[0][0]),
+        _quat_from_rows(xp, rows, scalar_first),
+        xp.stack(rows[2], -1),
+        -xp.stack((rows[0][2], rows[1][2], rows[2][2]), -1),
+    )
+
+
+__all__ = [
+    "yaw_from_matrices",
+    "up_from_matrices",
+    "projected_gravity_from_matrices",
+    "quat_from_matrices",
+    "yaw_from_quats",
+    "up_from_quats",
+    "projected_gravity_from_quats",
+    "quat_from_yaw",
+    "rotate_by_yaw",
+    "frame_features",
+]
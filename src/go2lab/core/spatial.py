@@ -0,0 +1,218 @@
+"""Uniform-grid spatial index over static axis-aligned boxes, with batched 2D queries.
+
+Boxes are (N, 6) [xmin, ymin, zmin, xmax, ymax, zmax] (go2lab.sim.util.static_geometry);
+the index works on their xy footprints, since robots move in the plane. Each box is listed in
+every grid cell its footprint touches (CSR layout: cell_start / cell_boxes), so a query only
+tests the boxes in the few cells around it instead of every box on the stage.
+
+All queries take M query points at once and run as a handful of array operations:
+- nearest(xy): distance to and index of the closest footprint
+- overlap(xy, radius): does a disc of radius touch any footprint
+- sweep(p0, p1, radius): first time of contact t in [0, 1] of a disc moving p0 -> p1
+The index is saved as .npy files plus meta.json and loaded memory-mapped.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+INDEX_FORMAT = 1
+_ARRAYS = ("boxes", "cell_start", "cell_boxes")
+
+
+def _pairs_min(q: np.ndarray, values: np.ndarray, m: int) -> Tuple[np.ndarray, np.ndarray]:
+    # per-query minimum of values over (query, candidate) pairs and the pair index reaching it
+    best = np.full(m, np.inf)
+    arg = np.full(m, -1, dtype=np.int64)
+    if q.size:
+        order = np.lexsort((values, q))
+        first = order[np.r_[True, q[order][1:] != q[order][:-1]]]
+        best[q[first]] = values[first]
+        arg[q[first]] = first
+    return best, arg
+
+
+class BoxIndex:
+    """Static box footprints bucketed in a uniform grid of `cell` meters."""
+
+    def __init__(self, boxes: np.ndarray, origin: Tuple[float, float], cell: float, shape: Tuple[int, int],
+                 cell_start: np.ndarray, cell_boxes: np.ndarray, key: str = ""):
+        self.boxes = boxes
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.cell = float(cell)
+        self.shape = (int(shape[0]), int(shape[1]))  # (rows along y, cols along x)
+        self.cell_start = cell_start
+        self.cell_boxes = cell_boxes
+        self.key = key
+        self._lo = np.asarray(boxes[:, 0:2], dtype=np.float64)
+        self._hi = np.asarray(boxes[:, 3:5], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return int(self.boxes.shape[0])
+
+    @classmethod
+    def build(cls, boxes: np.ndarray, cell: Optional[float] = None, key: str = "") -> "BoxIndex":
+        """Index (N, 6) boxes; cell defaults to twice the median footprint extent (>= 0.25 m)."""
+        boxes = np.ascontiguousarray(np.asarray(boxes, dtype=np.float64).reshape(-1, 6))
+        if len(boxes) == 0:
+            return cls(boxes, (0.0, 0.0), cell or 1.0, (1, 1), np.zeros(2, dtype=np.int64),
+                       np.zeros(0, dtype=np.int64), key=key)
+        ext = np.maximum(boxes[:, 3] - boxes[:, 0], boxes[:, 4] - boxes[:, 1])
+        cell = float(cell) if cell else max(0.25, 2.0 * float(np.median(ext)))
+        lo, hi = boxes[:, 0:2].min(axis=0), boxes[:, 3:5].max(axis=0)
+        w = max(1, int(np.ceil((hi[0] - lo[0]) / cell)))
+        h = max(1, int(np.ceil((hi[1] - lo[1]) / cell)))
+        c0 = np.clip(np.floor((boxes[:, 0] - lo[0]) / cell), 0, w - 1).astype(np.int64)
+        c1 = np.clip(np.floor((boxes[:, 3] - lo[0]) / cell), 0, w - 1).astype(np.int64)
+        r0 = np.clip(np.floor((boxes[:, 1] - lo[1]) / cell), 0, h - 1).astype(np.int64)
+        r1 = np.clip(np.floor((boxes[:, 4] - lo[1]) / cell), 0, h - 1).astype(np.int64)
+        # one (cell, box) entry per covered cell, then counting-sort by cell
+        nc, nr = c1 - c0 + 1, r1 - r0 + 1
+        counts = nc * nr
+        box_ids = np.repeat(np.arange(len(boxes)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows = r0[box_ids] + local // nc[box_ids]
+        cols = c0[box_ids] + local % nc[box_ids]
+        cells = rows * w + cols
+        order = np.argsort(cells, kind="stable")
+        cell_start = np.zeros(h * w + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=h * w), out=cell_start[1:])
+        return cls(boxes, (lo[0], lo[1]), cell, (h, w), cell_start, box_ids[order].astype(np.int64), key=key)
+
+    # candidates -----------------------------------------------------------
+    def candidates(self, lo, hi) -> Tuple[np.ndarray, np.ndarray]:
+        """(query, box) index pairs for every box listed in a cell overlapping the query
+        rectangles [lo, hi] (M, 2); a box may appear more than once per query."""
+        lo = np.asarray(lo, dtype=np.float64).reshape(-1, 2)
+        hi = np.asarray(hi, dtype=np.float64).reshape(-1, 2)
+        h, w = self.shape
+        c0 = np.floor((lo[:, 0] - self.origin[0]) / self.cell).astype(np.int64)
+        c1 = np.floor((hi[:, 0] - self.origin[0]) / self.cell).astype(np.int64)
+        r0 = np.floor((lo[:, 1] - self.origin[1]) / self.cell).astype(np.int64)
+        r1 = np.floor((hi[:, 1] - self.origin[1]) / self.cell).astype(np.int64)
+        # clip to the grid; rectangles entirely outside get an empty range
+        c0, c1 = np.maximum(c0, 0), np.minimum(c1, w - 1)
+        r0, r1 = np.maximum(r0, 0), np.minimum(r1, h - 1)
+        nc, nr = np.maximum(c1 - c0 + 1, 0), np.maximum(r1 - r0 + 1, 0)
+        if len(self) == 0 or not (nc * nr).any():
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        # (query, cell) pairs
+        per_q = nc * nr
+        q = np.repeat(np.arange(len(lo)), per_q)
+        local = np.arange(per_q.sum()) - np.repeat(np.cumsum(per_q) - per_q, per_q)
+        cells = (r0[q] + local // nc[q]) * w + c0[q] + local % nc[q]
+        # (query, box) pairs through the CSR lists
+        start = self.cell_start[cells]
+        count = self.cell_start[cells + 1] - start
+        qq = np.repeat(q, count)
+        offs = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        return qq, np.asarray(self.cell_boxes)[np.repeat(start, count) + offs]
+
+    def _footprint_distance(self, xy: np.ndarray, q: np.ndarray, b: np.ndarray) -> np.ndarray:
+        p = xy[q]
+        d = np.maximum(np.maximum(self._lo[b] - p, p - self._hi[b]), 0.0)
+        return np.sqrt((d * d).sum(axis=1))
+
+    # queries --------------------------------------------------------------
+    def nearest(self, xy, max_dist: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """Distance (M,) from each point to the nearest footprint (0 inside one) and that box's
+        index (-1 when none lies within max_dist). The search square doubles until it holds
+        the answer, so the cost follows the local free-space radius."""
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        m = len(xy)
+        best = np.full(m, np.inf)
+        arg = np.full(m, -1, dtype=np.int64)
+        if len(self) == 0 or m == 0:
+            return best, arg
+        h, w = self.shape
+        span = self.cell * max(h, w) + np.abs(xy - self.origin).max(initial=0.0)
+        active = np.arange(m)
+        r = self.cell
+        while active.size:
+            radius = min(r, max_dist)
+            q, b = self.candidates(xy[active] - radius, xy[active] + radius)
+            d = self._footprint_distance(xy[active], q, b)
+            dmin, pair = _pairs_min(q, d, active.size)
+            better = dmin < best[active]
+            best[active[better]] = dmin[better]
+            arg[active[better]] = b[pair[better]]
+            # any box within `radius` intersects the search square, so best <= radius is exact
+            done = (best[active] <= radius) | (radius >= max_dist) | (radius > span)
+            active = active[~done]
+            r *= 2.0
+        far = best > max_dist
+        best[far], arg[far] = np.inf, -1
+        return best, arg
+
+    def overlap(self, xy, radius: float = 0.0) -> np.ndarray:
+        """(M,) bool: the disc of radius around each point touches a footprint."""
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        q, b = self.candidates(xy - radius, xy + radius)
+        hit = np.zeros(len(xy), dtype=bool)
+        hit[q[self._footprint_distance(xy, q, b) <= radius]] = True
+        return hit
+
+    def sweep(self, p0, p1, radius: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """First contact of discs moving p0 -> p1 (M, 2): (t (M,) in [0, 1], 1 when free;
+        box index (M,), -1 when free). Footprints are inflated by radius as rectangles (a
+        conservative sweep near corners). Discs that already overlap a box at p0 are not
+        stopped by it, so robots spawned or pushed into geometry can move out."""
+        p0 = np.asarray(p0, dtype=np.float64).reshape(-1, 2)
+        p1 = np.asarray(p1, dtype=np.float64).reshape(-1, 2)
+        m = len(p0)
+        t = np.ones(m)
+        arg = np.full(m, -1, dtype=np.int64)
+        q, b = self.candidates(np.minimum(p0, p1) - radius, np.maximum(p0, p1) + radius)
+        if q.size == 0:
+            return t, arg
+        o, d = p0[q], (p1 - p0)[q]
+        d = np.where(np.abs(d) < 1e-12, 1e-12, d)  # keeps zero-motion axes as infinite slabs
+        t1 = (self._lo[b] - radius - o) / d
+        t2 = (self._hi[b] + radius - o) / d
+        t_in = np.minimum(t1, t2).max(axis=1)
+        t_out = np.maximum(t1, t2).min(axis=1)
+        hit = (t_in <= t_out) & (t_in >= 0.0) & (t_in <= 1.0)
+        tmin, pair = _pairs_min(q[hit], t_in[hit], m)
+        stop = tmin < 1.0
+        t[stop] = tmin[stop]
+        arg[stop] = b[hit][pair[stop]]
+        return t, arg
+
+    # storage --------------------------------------------------------------
+    def save(self, directory: Path | str) -> Path:
+        """Write the arrays and meta.json into directory (atomic rename, first writer wins)."""
+        directory = Path(directory)
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        tmp = directory.with_name(f".tmp-{os.getpid()}-{directory.name}")
+        tmp.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        meta = {"format": INDEX_FORMAT, "key": self.key, "origin": self.origin.tolist(), "cell": self.cell,
+                "shape": list(self.shape)}
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        try:
+            os.rename(tmp, directory)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not (directory / "meta.json").exists():
+                raise
+        return directory
+
+    @classmethod
+    def load(cls, directory: Path | str, mmap: bool = True) -> "BoxIndex":
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("format") != INDEX_FORMAT:
+            raise ValueError(f"unsupported box index format in {directory}")
+        arrays = {n: np.load(directory / f"{n}.npy", mmap_mode="r" if mmap else None) for n in _ARRAYS}
+        return cls(origin=tuple(meta["origin"]), cell=meta["cell"], shape=tuple(meta["shape"]),
+                   key=meta.get("key", ""), **arrays)
+
+
+__all__ = ["BoxIndex", "INDEX_FORMAT"]
@@ -0,0 +1,134 @@
+"""Collision-free spawn poses drawn from an occupancy grid's free space.
+
+SpawnSampler precomputes, once per grid, the flat indices of every cell that is far enough
+from static geometry (go2lab.core.occupancy distance field) and inside an optional region;
+sample(n) then costs one vectorized draw: n random candidate cells, a uniform offset inside
+each cell and a uniform yaw. No rejection loops, so resetting thousands of robots costs the
+same few array operations as resetting one.
+
+The clearance is kept conservatively: a cell is a candidate when its distance exceeds
+clearance + resolution * (1 + sqrt(1/2)), which covers both the distance field being measured
+between cell centers and the in-cell offset of the sampled point.
+With separation > 0, candidates are thinned to a lattice of that pitch and drawn without
+replacement, so robots sampled in the same call never overlap each other either.
+"""
+from __future__ import annotations
+
+import math
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from .occupancy import OccupancyGrid
+
+Region = Tuple[float, float, float, float]  # (xmin, ymin, xmax, ymax) in meters
+
+
+def parse_region(text: Optional[str]) -> Optional[Region]:
+    """"xmin,ymin,xmax,ymax" (e.g. GO2_SPAWN_REGION) -> tuple, or None when empty/invalid."""
+    if not text:
+        return None
+    try:
+        values = tuple(float(v) for v in text.replace(" ", "").split(","))
+    except ValueError:
+        return None
+    return values if len(values) == 4 else None
+
+
+class SpawnSampler:
+    """Draws (x, y, yaw) spawn poses from the free cells of an OccupancyGrid.
+
+    clearance: minimum distance [m] between a spawn point and any static obstacle
+    region: optional (xmin, ymin, xmax, ymax) the points must lie in (e.g. registry spawn_region)
+    separation: minimum distance [m] between poses returned by one sample() call (0 = off)
+    yaw_range: yaw is uniform in [lo, hi) radians
+    height: z of returned positions (base height above the floor)
+    """
+
+    def __init__(self, grid: OccupancyGrid, clearance: float = 0.4, region: Optional[Sequence[float]] = None,
+                 separation: float = 0.0, yaw_range: Tuple[float, float] = (-math.pi, math.pi),
+                 height: float = 0.45, seed: Optional[int] = None):
+        self.grid = grid
+        self.clearance = float(clearance)
+        self.region: Optional[Region] = tuple(float(v) for v in region) if region is not None else None
+        self.separation = float(separation)
+        self.yaw_range = (float(yaw_range[0]), float(yaw_range[1]))
+        self.height = float(height)
+        self.rng = np.random.default_rng(seed)
+
+        res = grid.resolution
+        mask = grid.free_mask(self.clearance + res * (1.0 + math.sqrt(0.5)))
+        h, w = mask.shape
+        # cell [r, c] and everything sampled in it lies in [x0 + c*res, x0 + (c+1)*res) etc.
+        if self.region is not None:
+            xmin, ymin, xmax, ymax = self.region
+            x0, y0 = grid.origin
+            c_lo = max(0, int(math.ceil((xmin - x0) / res)))
+            c_hi = min(w, int(math.floor((xmax - x0) / res)))
+            r_lo = max(0, int(math.ceil((ymin - y0) / res)))
+            r_hi = min(h, int(math.floor((ymax - y0) / res)))
+            inside = np.zeros_like(mask)
+            inside[r_lo:max(r_lo, r_hi), c_lo:max(c_lo, c_hi)] = True
+            mask &= inside
+        if self.separation > 0.0:
+            # a lattice of pitch k cells keeps in-cell offsets at least (k - 1) * res apart
+            k = int(math.ceil(self.separation / res)) + 1
+            lattice = np.zeros_like(mask)
+            lattice[::k, ::k] = True
+            mask &= lattice
+        self.candidates = np.flatnonzero(mask)
+        self._width = w
+
+    def __len__(self) -> int:
+        return int(self.candidates.size)
+
+    @property
+    def free_area(self) -> float:
+        """Area [m^2] of the candidate cells (lattice points when separation is set)."""
+        return float(self.candidates.size) * self.grid.resolution ** 2
+
+    def sample(self, n: int, rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return pos (n, 3) float64 world positions and yaw (n,) radians.
+
+        Raises ValueError when the grid has no candidate cell (or, with separation, fewer than n).
+        """
+        rng = rng or self.rng
+        n = int(n)
+        m = self.candidates.size
+        if m == 0:
+            raise ValueError("SpawnSampler: no free cell satisfies the clearance/region")
+        if self.separation > 0.0:
+            if n > m:
+                raise ValueError(f"SpawnSampler: {n} poses requested but only {m} separated cells are free")
+            pick = self.candidates[rng.choice(m, size=n, replace=False)]
+        else:
+            pick = self.candidates[rng.integers(0, m, size=n)]
+        rows, cols = np.divmod(pick, self._width)
+        res = self.grid.resolution
+        pos = np.empty((n, 3), dtype=np.float64)
+        pos[:, 0] = self.grid.origin[0] + (cols + rng.random(n)) * res
+        pos[:, 1] = self.grid.origin[1] + (rows + rng.random(n)) * res
+        pos[:, 2] = self.height
+        lo, hi = self.yaw_range
+        yaw = lo + (hi - lo) * rng.random(n)
+        return pos, yaw
+
+    def sample_local(self, origins, rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Like sample(len(origins)), but positions relative to per-env origins (k, 3), i.e.
+        ready for BatchedBaseController.set_poses(pos, yaw, env_ids) under spawn_go2_batch envs."""
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        pos, yaw = self.sample(len(origins), rng)
+        pos[:, :2] -= origins[:, :2]
+        return pos, yaw
+
+    def check(self, pos, yaw=None) -> np.ndarray:
+        """True for world positions (k, 3) that satisfy the clearance and region."""
+        xy = np.asarray(pos, dtype=np.float64)[..., :2]
+        ok = self.grid.is_free(xy, self.clearance + self.grid.resolution)
+        if self.region is not None:
+            xmin, ymin, xmax, ymax = self.region
+            ok &= (xy[..., 0] >= xmin) & (xy[..., 0] <= xmax) & (xy[..., 1] >= ymin) & (xy[..., 1] <= ymax)
+        return ok
+
+
+__all__ = ["SpawnSampler", "parse_region"]
@@ -1,12 +1,39 @@
 # Wrapper to import env registry from legacy location
 from __future__ import annotations
 
+import ast
+import json
+from dataclasses import dataclass, field
+import logging
+import os
 from pathlib import Path
-from typing import Tuple
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
 
 from .sim.util.usd_path import resolve_usd_spec, isaaclab_asset_path
 
+LOGGER = logging.getLogger("go2lab.env_registry")
+
 REGISTRY_PATH = Path(__file__).resolve().parents[2] / "env/registry.yaml"
+# generated entries (e.g. warehouse layout variants); entries in registry.yaml take precedence
+VARIANTS_PATH = REGISTRY_PATH.with_name("variants.yaml")
+
+
+@dataclass(frozen=True)
+class StageOptions:
+	"""Per-environment stage performance flags."""
+	instanceable: bool = True   # spawn robots as instanceable references (spawn_go2_batch)
+	prefetch: bool = True       # prefetch the layer dependency graph before opening
+	snapshot: bool = False      # open from a flattened local snapshot when available
+
+
+@dataclass(frozen=True)
+class EnvEntry:
+	name: str
+	usd: str
+	spawn_region: Optional[Tuple[float, float, float, float]] = None  # (xmin, ymin, xmax, ymax) in meters
+	num_robots: int = 1
+	render_preset: Optional[str] = None  # performance | quality | pathtraced
+	stage_opts: StageOptions = field(default_factory=StageOptions)
 
 
 def _expand_spec(spec: str) -> str:
@@ -17,34 +44,200 @@ def _expand_spec(spec: str) -> str:
 	return s
 
 
-def _load_mapping() -> dict:
-	if not REGISTRY_PATH.exists():
-		return {}
-	text = REGISTRY_PATH.read_text(encoding="utf-8")
+def _scalar(text: str) -> Any:
+	s = text.split(" #", 1)[0].strip()
+	low = s.lower()
+	if low in ("true", "false"):
+		return low == "true"
+	if low in ("null", "none", "~", ""):
+		return None
+	if s.startswith("{") and s.endswith("}"):
+		# flow mapping, e.g. {prefetch: true, snapshot: false}
+		items = (kv.split(":", 1) for kv in s[1:-1].split(",") if ":" in kv)
+		return {k.strip(): _scalar(v) for k, v in items}
 	try:
-		import yaml  # type: ignore
-		data = yaml.safe_load(text)
-		return data or {}
-	except Exception:
-		pass
-	mapping: dict[str, str] = {}
+		return ast.literal_eval(s)
+	except (ValueError, SyntaxError):
+		return s.strip('"').strip("'")
+
+
+def _parse_simple(text: str) -> dict:
+	# fallback for environments without PyYAML: top-level `name: spec` or `name:` + indented `key: value`
+	mapping: Dict[str, Any] = {}
+	stack: list[tuple[int, dict]] = [(-1, mapping)]
 	for line in text.splitlines():
 		s = line.strip()
-		if not s or s.startswith("#"):
+		if not s or s.startswith("#") or ":" not in s:
 			continue
-		if ":" in s:
-			k, v = s.split(":", 1)
-			mapping[k.strip()] = v.strip()
+		indent = len(line) - len(line.lstrip())
+		while stack[-1][0] >= indent:
+			stack.pop()
+		k, v = s.split(":", 1)
+		parent = stack[-1][1]
+		if v.split(" #", 1)[0].strip():
+			parent[k.strip()] = _scalar(v)
+		else:
+			child: Dict[str, Any] = {}
+			parent[k.strip()] = child
+			stack.append((indent, child))
 	return mapping
 
 
+def _make_entry(name: str, value: Any) -> EnvEntry:
+	if not isinstance(value, dict):
+		return EnvEntry(name=name, usd=str(value or "").strip())
+	region = value.get("spawn_region")
+	opts = value.get("stage_opts") or {}
+	return EnvEntry(
+		name=name,
+		usd=str(value.get("usd", "") or "").strip(),
+		spawn_region=tuple(float(x) for x in region) if region else None,
+		num_robots=int(value.get("num_robots", 1) or 1),
+		render_preset=value.get("render_preset") or None,
+		stage_opts=StageOptions(**{k: bool(v) for k, v in opts.items() if k in StageOptions.__dataclass_fields__}),
+	)
+
+
+class EnvRegistry:
+	"""env/registry.yaml (plus overlay files) parsed once into EnvEntry records, re-read only
+	when one of the files changes."""
+
+	def __init__(self, path: Path | str = REGISTRY_PATH, overlays: Sequence[Path | str] = ()):
+		self.path = Path(path)
+		self.overlays = tuple(Path(p) for p in overlays)
+		self._stamp: Optional[tuple] = None
+		self._entries: Dict[str, EnvEntry] = {}
+		self._expanded: Dict[str, str] = {}
+
+	@staticmethod
+	def _file_stamp(path: Path) -> Optional[tuple[int, int]]:
+		try:
+			st = os.stat(path)
+		except OSError:
+			return None
+		return (st.st_mtime_ns, st.st_size)
+
+	def _refresh(self) -> Dict[str, EnvEntry]:
+		paths = (*self.overlays, self.path)
+		stamp = tuple(self._file_stamp(p) for p in paths)
+		if stamp != self._stamp:
+			entries: Dict[str, EnvEntry] = {}
+			for p, st in zip(paths, stamp):
+				if st is not None:
+					entries.update(self._parse(p.read_text(encoding="utf-8")))
+			self._entries = entries
+			self._expanded.clear()
+			self._stamp = stamp
+		return self._entries
+
+	@staticmethod
+	def _parse(text: str) -> Dict[str, EnvEntry]:
+		try:
+			import yaml  # type: ignore
+			data = yaml.safe_load(text) or {}
+		except ImportError:
+			data = _parse_simple(text)
+		except Exception as exc:
+			LOGGER.error("Could not parse env registry: %s", exc)
+			data = {}
+		return {str(k): _make_entry(str(k), v) for k, v in data.items()}
+
+	@property
+	def entries(self) -> Dict[str, EnvEntry]:
+		return self._refresh()
+
+	def names(self) -> list[str]:
+		return list(self._refresh())
+
+	def get(self, name: str) -> Optional[EnvEntry]:
+		return self._refresh().get((name or "").strip())
+
+	def __contains__(self, name: str) -> bool:
+		return self.get(name) is not None
+
+	def entry_for(self, name_or_spec: str) -> EnvEntry:
+		"""Registry entry for a name, or a default entry wrapping a direct USD spec."""
+		key = (name_or_spec or "").strip()
+		return self.get(key) or EnvEntry(name=key, usd=key)
+
+	def expanded_usd(self, name_or_spec: str) -> str:
+		"""USD spec with isaaclab:// expanded (memoized until the registry file changes)."""
+		usd = self.entry_for(name_or_spec).usd
+		spec = self._expanded.get(usd)
+		if spec is None:
+			spec = self._expanded[usd] = _expand_spec(usd)
+		return spec
+
+	def resolve(self, name_or_spec: str, repo_root: Path | str) -> Tuple[str, str, bool]:
+		return resolve_usd_spec(self.expanded_usd(name_or_spec), Path(repo_root))
+
+
+_DEFAULT: Optional[EnvRegistry] = None
+
+
+def default_registry() -> EnvRegistry:
+	global _DEFAULT
+	if _DEFAULT is None:
+		_DEFAULT = EnvRegistry(overlays=(VARIANTS_PATH,))
+	return _DEFAULT
+
+
+def _dump_value(value: Any) -> str:
+	if isinstance(value, bool):
+		return "true" if value else "false"
+	if isinstance(value, dict):
+		return "{" + ", ".join(f"{k}: {_dump_value(v)}" for k, v in value.items()) + "}"
+	if isinstance(value, (list, tuple)):
+		return "[" + ", ".join(_dump_value(v) for v in value) + "]"
+	return json.dumps(value)
+
+
+def register_entries(entries: Mapping[str, dict], path: Path | str = VARIANTS_PATH) -> int:
+	"""Merge mapping-form entries into a generated overlay registry file (default
+	env/variants.yaml) and return the total entry count. The file is written in the subset
+	both PyYAML and the fallback parser read."""
+	from .sim.util.asset_cache import _atomic_write
+
+	path = Path(path)
+	current: Dict[str, Any] = {}
+	if path.exists():
+		text = path.read_text(encoding="utf-8")
+		try:
+			import yaml  # type: ignore
+			current = yaml.safe_load(text) or {}
+		except ImportError:
+			current = _parse_simple(text)
+	current.update(entries)
+	lines = ["# Generated by sim/scripts/generate_variants.py -- do not edit by hand."]
+	for name in sorted(current):
+		value = current[name]
+		if not isinstance(value, dict):
+			lines.append(f"{name}: {_dump_value(value)}")
+			continue
+		lines.append(f"{name}:")
+		lines.extend(f"  {k}: {_dump_value(v)}" for k, v in value.items())
+	_atomic_write(path, ("\n".join(lines) + "\n").encode("utf-8"))
+	return len(current)
+
+
+def registry_specs() -> dict[str, str]:
+	"""Registry name -> expanded USD spec (isaaclab:// mapped to the Isaac Lab asset root)."""
+	reg = default_registry()
+	return {name: reg.expanded_usd(name) for name in reg.names()}
+
+
 def resolve_env(name_or_spec: str, repo_root: Path | str) -> Tuple[str, str, bool]:
-	rr = Path(repo_root)
-	key = (name_or_spec or "").strip()
-	mapping = _load_mapping()
-	spec = mapping.get(key, key)
-	expanded = _expand_spec(spec)
-	return resolve_usd_spec(expanded, rr)
+	return default_registry().resolve(name_or_spec, repo_root)
 
 
-__all__ = ["resolve_env", "REGISTRY_PATH"]
+__all__ = [
+	"EnvEntry",
+	"EnvRegistry",
+	"StageOptions",
+	"default_registry",
+	"resolve_env",
+	"registry_specs",
+	"register_entries",
+	"REGISTRY_PATH",
+	"VARIANTS_PATH",
+]
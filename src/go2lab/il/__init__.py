@@ -0,0 +1,19 @@
+"""go2lab.il: imitation learning on recorder output.
+
+ILDataset windows (obs, actions[, frames]) over shard directories and output/<timestamp>/
+recordings, ILLoader prefetches shuffled batches on worker processes, and
+go2lab.il.bc_policy is a get_policy() factory for lab/scripts/infer_il_with_lab.py.
+"""
+from __future__ import annotations
+
+from .dataset import ILDataset, Episode, find_episodes, dataset_from_env
+from .loader import ILLoader, shuffle_buffer_order
+
+__all__ = [
+    "ILDataset",
+    "Episode",
+    "find_episodes",
+    "dataset_from_env",
+    "ILLoader",
+    "shuffle_buffer_order",
+]
@@ -0,0 +1,100 @@
+"""Linear behaviour-cloning policy: a get_policy() factory for infer_il_with_lab.py.
+
+fit_linear_bc() streams ILLoader batches and solves ridge regression from the POLICY_SPAN
+fields of the K-frame observation window to the next normalized action, accumulating only
+the (F, F) normal equations, so datasets of any length fit in memory. The resulting
+LinearBCPolicy accepts what infer_il_with_lab feeds a policy: the observe() dict
+(frame stack 1) or a (1, K, D) Go2WarehouseEnv.history.view() window.
+
+get_policy(dataset=None) fits on `dataset`, else on GO2_IL_DATASET (paths separated by
+os.pathsep; window GO2_IL_WINDOW, default 1), or loads saved weights from GO2_IL_WEIGHTS.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+from go2lab.core.observation import DEFAULT_LAYOUT, POLICY_SPAN
+from go2lab.il.dataset import ACTION_DIM, ILDataset, dataset_from_env
+from go2lab.il.loader import ILLoader
+
+LOGGER = logging.getLogger("go2lab.il.bc")
+
+
+class LinearBCPolicy:
+    def __init__(self, weights: np.ndarray, window: int):
+        self.window = int(window)
+        self.weights = np.asarray(weights, dtype=np.float32)  # (K * |POLICY_SPAN| + 1, 3)
+        self._x = np.ones(self.weights.shape[0], dtype=np.float32)
+
+    def _features(self, obs: Any) -> np.ndarray:
+        if isinstance(obs, dict):
+            row = np.concatenate([np.ravel(np.asarray(obs[n], dtype=np.float32)) for n in DEFAULT_LAYOUT.names])
+            rows = row[None]
+        else:
+            rows = np.asarray(obs, dtype=np.float32).reshape(-1, np.shape(obs)[-1])
+        rows = rows[-self.window:, POLICY_SPAN]
+        if len(rows) < self.window:
+            # shorter stack than trained on: repeat the oldest frame, like a fresh history
+            rows = np.concatenate([np.repeat(rows[:1], self.window - len(rows), axis=0), rows])
+        self._x[:-1] = rows.ravel()
+        return self._x
+
+    def __call__(self, obs: Any) -> Tuple[float, float, float]:
+        a = np.clip(self._features(obs) @ self.weights, -1.0, 1.0)
+        return float(a[0]), float(a[1]), float(a[2])
+
+    def save(self, path: Path | str) -> None:
+        with open(path, "wb") as fh:
+            np.savez(fh, weights=self.weights, window=self.window)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "LinearBCPolicy":
+        data = np.load(path)
+        return cls(data["weights"], int(data["window"]))
+
+
+def fit_linear_bc(dataset: ILDataset, ridge: float = 1e-3, batch_size: int = 4096, workers: int = 2,
+                  seed: int = 0) -> LinearBCPolicy:
+    """Ridge regression of the first action of each window on its flattened POLICY_SPAN rows."""
+    k = dataset.window
+    f = k * (POLICY_SPAN.stop - POLICY_SPAN.start) + 1
+    xtx = np.zeros((f, f), dtype=np.float64)
+    xty = np.zeros((f, ACTION_DIM), dtype=np.float64)
+    n = 0
+    with ILLoader(dataset, batch_size=batch_size, workers=workers, shuffle_buffer=0, seed=seed) as loader:
+        for batch in loader:
+            x = np.ones((len(batch["obs"]), f), dtype=np.float64)
+            x[:, :-1] = batch["obs"][:, :, POLICY_SPAN].reshape(len(x), -1)
+            y = batch["actions"][:, 0].astype(np.float64)
+            xtx += x.T @ x
+            xty += x.T @ y
+            n += len(x)
+    if n == 0:
+        raise ValueError("no samples to fit")
+    reg = ridge * n * np.eye(f)
+    reg[-1, -1] = 0.0  # do not shrink the bias
+    weights = np.linalg.solve(xtx + reg, xty)
+    LOGGER.info("Fitted linear BC on %d samples (window %d, %d features)", n, k, f)
+    return LinearBCPolicy(weights, k)
+
+
+def get_policy(dataset: Optional[ILDataset] = None) -> LinearBCPolicy:
+    if dataset is None:
+        weights = os.environ.get("GO2_IL_WEIGHTS", "").strip()
+        if weights and Path(weights).exists():
+            return LinearBCPolicy.load(weights)
+        dataset = dataset_from_env(window=int(os.environ.get("GO2_IL_WINDOW", "1")))
+        if dataset is None:
+            raise RuntimeError("pass --dataset or set GO2_IL_DATASET / GO2_IL_WEIGHTS")
+    policy = fit_linear_bc(dataset)
+    if os.environ.get("GO2_IL_WEIGHTS", "").strip():
+        policy.save(os.environ["GO2_IL_WEIGHTS"])
+    return policy
+
+
+__all__ = ["LinearBCPolicy", "fit_linear_bc", "get_policy"]
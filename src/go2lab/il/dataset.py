@@ -0,0 +1,232 @@
+"""Random-access imitation-learning dataset over recorder output.
+
+Episodes come from shard directories (go2lab.sim.util.shards, one episode each) and
+recording directories (output/<timestamp>/ with telemetry.bin/.json and per-frame files);
+a parent directory such as output/ is searched one level deep. Telemetry stays memory-mapped
+and frames are read on demand (zero-copy .npy views from shard chunks or mmap'd files).
+
+Samples are windows ending at telemetry row t:
+    obs      (K, D)  rows t-K+1 .. t in DEFAULT_LAYOUT order, rebuilt from the logged pose
+                     like SensorManager.observe() does (finite-difference velocities, up_dot 1,
+                     yaw quaternion); rows before the episode start repeat row 0, like
+                     ObservationHistory after a reset
+    actions  (H, 3)  commands of rows t .. t+H-1 (row t's command is applied after the frame
+                     and pose of row t, see go2lab.sim.util.telemetry), divided by ActionSpec
+                     scales and clipped to [-1, 1], i.e. what env.step() expects
+    <channel> (K, ...) recorded frames of the obs rows for each requested channel
+so a (1, K, D) window has the layout of Go2WarehouseEnv.history.view(). batch() gathers any
+set of indices vectorized (grouped per episode) into preallocated outputs; ILLoader
+(go2lab.il.loader) runs it on worker processes.
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from go2lab.core.managers import ActionSpec
+from go2lab.core.observation import DEFAULT_LAYOUT
+from go2lab.sim.util.channel_codecs import decode
+from go2lab.sim.util.shards import MANIFEST_NAME, ShardReader
+from go2lab.sim.util.telemetry import SCHEMA_NAME, load_telemetry
+
+ACTION_DIM = 3
+
+
+@dataclass
+class Episode:
+    name: str
+    records: np.ndarray  # telemetry records (memmap), TELEMETRY_FIELDS layout
+    fps: float
+    read_frame: Optional[Callable[[str, int], np.ndarray]] = None  # (channel, frame) -> array
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+def _read_file_frame(directory: Path) -> Callable[[str, int], np.ndarray]:
+    def read(channel: str, frame: int) -> np.ndarray:
+        stem = directory / f"{channel}_{frame:04d}"
+        npy = stem.with_suffix(".npy")
+        if npy.exists():
+            return np.load(npy, mmap_mode="r")
+        encoded = stem.with_suffix(".g2c")
+        if encoded.exists():
+            return decode(encoded.read_bytes())
+        from PIL import Image  # type: ignore
+
+        return np.asarray(Image.open(stem.with_suffix(".png")))
+
+    return read
+
+
+def _shard_frame(reader, episode: int) -> Callable[[str, int], np.ndarray]:
+    def read(channel: str, frame: int) -> np.ndarray:
+        return reader.get(episode, frame, channel)
+
+    return read
+
+
+def find_episodes(paths: Iterable[Path | str]) -> List[Episode]:
+    """Episodes of shard directories, recording directories and parents of either."""
+    episodes: List[Episode] = []
+    for path in paths:
+        path = Path(path)
+        if (path / MANIFEST_NAME).exists():
+            reader = ShardReader(path)
+            for ep, meta in sorted(reader.episodes.items()):
+                if not reader.has(ep, -1, SCHEMA_NAME):
+                    continue
+                records, attrs = reader.telemetry(ep)
+                fps = float(attrs.get("fps", meta.get("fps", 20.0)))
+                name = f"{path.name}/{meta.get('name') or ep}"
+                episodes.append(Episode(name, records, fps, _shard_frame(reader, ep)))
+        elif (path / SCHEMA_NAME).exists():
+            records, attrs = load_telemetry(path)
+            episodes.append(Episode(path.name, records, float(attrs.get("fps", 20.0)), _read_file_frame(path)))
+        elif path.is_dir():
+            children = [p for p in sorted(path.iterdir()) if p.is_dir()]
+            episodes.extend(find_episodes(p for p in children
+                                          if (p / MANIFEST_NAME).exists() or (p / SCHEMA_NAME).exists()))
+    return episodes
+
+
+class ILDataset:
+    """Windows of (obs, actions[, frames]) over every episode found under `paths`."""
+
+    def __init__(self, paths: Sequence[Path | str] | Path | str, window: int = 1, horizon: int = 1,
+                 channels: Sequence[str] = (), action_spec: Optional[ActionSpec] = None, captured_only: bool = True):
+        # captured_only: with channels, skip windows containing frames the writer dropped
+        self._args = (paths, window, horizon, tuple(channels), action_spec, captured_only)
+        self.paths = [Path(p) for p in ([paths] if isinstance(paths, (str, Path)) else paths)]
+        self.window = max(1, int(window))
+        self.horizon = max(1, int(horizon))
+        self.channels = tuple(channels)
+        spec = action_spec or ActionSpec()
+        self.action_scale = np.array([spec.scale_lin_xy, spec.scale_lin_xy, spec.scale_yaw], dtype=np.float32)
+        self.layout = DEFAULT_LAYOUT
+        self.episodes = [e for e in find_episodes(self.paths) if len(e) >= self.horizon]
+        # sample i -> (episode, row t): valid t leave `horizon` actions (rows t .. t+H-1) in the episode
+        ep_ids, rows = [], []
+        for e, ep in enumerate(self.episodes):
+            t = np.arange(len(ep) - self.horizon + 1, dtype=np.int64)
+            if self.channels and captured_only and "captured" in ep.records.dtype.names:
+                bad = np.flatnonzero(np.asarray(ep.records["captured"]) == 0)
+                # a window [t-K+1, t] is clean when no dropped frame lies inside it
+                next_bad = np.searchsorted(bad, t - self.window + 1)
+                ok = (next_bad >= len(bad)) | (bad[np.minimum(next_bad, len(bad) - 1)] > t)
+                t = t[ok]
+            ep_ids.append(np.full(len(t), e, dtype=np.int32))
+            rows.append(t)
+        self.sample_episode = np.concatenate(ep_ids) if ep_ids else np.zeros(0, np.int32)
+        self.sample_row = np.concatenate(rows) if rows else np.zeros(0, np.int64)
+        self._frame_spec: Dict[str, Tuple[Tuple[int, ...], np.dtype]] = {}
+
+    def __getstate__(self):
+        # reopen (memory maps, shard readers) in worker processes instead of pickling arrays
+        return self._args
+
+    def __setstate__(self, args) -> None:
+        self.__init__(*args)
+
+    def __len__(self) -> int:
+        return len(self.sample_row)
+
+    def spec(self) -> Dict[str, Tuple[Tuple[int, ...], np.dtype]]:
+        """Per-sample {name: (shape, dtype)} of what batch() returns."""
+        out = {"obs": ((self.window, self.layout.dim), np.dtype(np.float32)),
+               "actions": ((self.horizon, ACTION_DIM), np.dtype(np.float32))}
+        for ch in self.channels:
+            if ch not in self._frame_spec:
+                if not len(self):
+                    raise ValueError("empty dataset")
+                ep = self.episodes[self.sample_episode[0]]
+                arr = np.asarray(ep.read_frame(ch, int(ep.records["frame"][self.sample_row[0]])))
+                self._frame_spec[ch] = (arr.shape, arr.dtype)
+            shape, dtype = self._frame_spec[ch]
+            out[ch] = ((self.window,) + tuple(shape), dtype)
+        return out
+
+    def allocate(self, batch_size: int) -> Dict[str, np.ndarray]:
+        return {k: np.zeros((batch_size,) + shape, dtype=dtype) for k, (shape, dtype) in self.spec().items()}
+
+    def __getitem__(self, i: int) -> Dict[str, np.ndarray]:
+        return {k: v[0] for k, v in self.batch(np.array([i])).items()}
+
+    def batch(self, indices, out: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """Samples `indices` into `out` (allocate(len(indices)) when None; larger buffers are
+        filled from the front)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        n = len(indices)
+        if out is None:
+            out = self.allocate(n)
+        eps = self.sample_episode[indices]
+        for e in np.unique(eps).tolist():
+            sel = np.flatnonzero(eps == e)
+            self._fill(self.episodes[e], self.sample_row[indices[sel]], sel, out)
+        return out
+
+    def _fill(self, ep: Episode, t: np.ndarray, sel: np.ndarray, out: Dict[str, np.ndarray]) -> None:
+        rec = ep.records
+        rows = np.maximum(t[:, None] + np.arange(1 - self.window, 1), 0)  # (n, K)
+        prev = np.maximum(rows - 1, 0)
+        flat = np.unique(np.concatenate([rows.ravel(), prev.ravel()]))
+        # one gather of the touched telemetry rows, then index into the small copy
+        pos_all = np.asarray(rec["pos"][flat], dtype=np.float64)
+        yaw_all = np.asarray(rec["yaw"][flat], dtype=np.float64)
+        time_all = np.asarray(rec["sim_time"][flat], dtype=np.float64)
+        r, p = np.searchsorted(flat, rows), np.searchsorted(flat, prev)
+        pos, yaw = pos_all[r], yaw_all[r]
+        dt = time_all[r] - time_all[p]
+        dt = np.where(dt > 0, dt, 1.0 / ep.fps)[..., None]
+        first = (rows == prev)[..., None]  # velocity is 0 on the first observation
+        lin = np.where(first, 0.0, (pos - pos_all[p]) / dt)
+        dyaw = (yaw - yaw_all[p] + np.pi) % (2 * np.pi) - np.pi
+        ang_z = np.where(first[..., 0], 0.0, dyaw / dt[..., 0])
+
+        obs = out["obs"]
+        sl = {name: self.layout.slice(name) for name in self.layout.names}
+        o = obs[sel]
+        o[..., sl["base_lin_vel"]] = lin
+        o[..., sl["base_ang_vel"]] = 0.0
+        o[..., sl["base_ang_vel"].start + 2] = ang_z
+        o[..., sl["base_height"].start] = pos[..., 2]
+        o[..., sl["up_dot"].start] = 1.0  # the kinematic base never tilts
+        o[..., sl["yaw"].start] = yaw
+        o[..., sl["pos"]] = pos
+        q = sl["imu_quat"].start  # (x, y, z, w)
+        o[..., q:q + 2] = 0.0
+        o[..., q + 2] = np.sin(yaw / 2)
+        o[..., q + 3] = np.cos(yaw / 2)
+        obs[sel] = o
+
+        future = t[:, None] + np.arange(self.horizon)
+        cmd = np.asarray(rec["cmd"][future.ravel()], dtype=np.float32).reshape(len(t), self.horizon, ACTION_DIM)
+        out["actions"][sel] = np.clip(cmd / self.action_scale, -1.0, 1.0)
+
+        if self.channels:
+            frames = np.asarray(rec["frame"])[rows]
+            for ch in self.channels:
+                dst = out[ch]
+                for i, s in enumerate(sel.tolist()):
+                    for k in range(self.window):
+                        dst[s, k] = ep.read_frame(ch, int(frames[i, k]))
+
+    def describe(self) -> Dict[str, Any]:
+        return {"episodes": len(self.episodes), "samples": len(self), "frames": int(sum(len(e) for e in self.episodes)),
+                "window": self.window, "horizon": self.horizon, "channels": list(self.channels),
+                "spec": {k: [list(s), str(d)] for k, (s, d) in self.spec().items()}}
+
+
+def dataset_from_env(window: int = 1, horizon: int = 1, channels: Sequence[str] = ()) -> Optional[ILDataset]:
+    """ILDataset over the os.pathsep-separated paths in GO2_IL_DATASET, None when unset."""
+    spec = os.environ.get("GO2_IL_DATASET", "").strip()
+    if not spec:
+        return None
+    return ILDataset([p for p in spec.split(os.pathsep) if p], window=window, horizon=horizon, channels=channels)
+
+
+__all__ = ["ILDataset", "Episode", "find_episodes", "dataset_from_env", "ACTION_DIM"]
@@ -0,0 +1,206 @@
+"""Multi-process batch prefetching for ILDataset.
+
+ILLoader keeps `prefetch` batch slots in shared memory (multiprocessing.RawArray, handed to
+the workers at start-up, so nothing is pickled per batch). Worker processes receive
+(sequence, slot, indices) tasks, run ILDataset.batch() straight into the slot and report
+back; the iterator yields the slots in sequence order as NumPy views. A yielded batch stays
+valid until the next one is requested (copy it, or move it to a tensor, to keep it).
+
+Sample order streams through a shuffle buffer: indices arrive episode by episode (so frames
+of a shard chunk are read close together) and each batch is drawn at random from a
+`shuffle_buffer`-sized pool that is refilled from the stream. shuffle_buffer >= len(dataset)
+is a full permutation, 0 keeps the recorded order. workers=0 builds batches in-process.
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+import queue
+import traceback
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from go2lab.il.dataset import ILDataset
+
+def shuffle_buffer_order(n: int, batch_size: int, buffer: int, rng: np.random.Generator,
+                         episodes: Optional[np.ndarray] = None) -> np.ndarray:
+    """Permutation of range(n) drawn batch by batch from a pool of `buffer` stream entries.
+
+    The stream visits episodes (sample -> episode ids in `episodes`) in random order, samples
+    in recorded order within each."""
+    if buffer <= 0:
+        return np.arange(n, dtype=np.int64)
+    if buffer >= n:
+        return rng.permutation(n)
+    if episodes is not None and len(episodes):
+        ids = np.unique(episodes)
+        rank = np.empty(int(ids.max()) + 1, dtype=np.int64)
+        rank[ids] = rng.permutation(len(ids))
+        stream = np.argsort(rank[episodes], kind="stable")
+    else:
+        stream = np.arange(n, dtype=np.int64)
+    pool = stream[:buffer].copy()
+    size, pos = len(pool), len(pool)
+    out = np.empty(n, dtype=np.int64)
+    done = 0
+    while done < n:
+        take = min(batch_size, size)
+        pick = rng.choice(size, take, replace=False)
+        out[done:done + take] = pool[pick]
+        done += take
+        refill = stream[pos:pos + take]
+        pos += len(refill)
+        pool[pick[:len(refill)]] = refill
+        if len(refill) < take:
+            # stream exhausted: compact the pool
+            keep = np.ones(size, dtype=bool)
+            keep[pick[len(refill):]] = False
+            pool = pool[:size][keep]
+            size = len(pool)
+    return out
+
+
+def _slot_layout(spec: Dict[str, Tuple[Tuple[int, ...], np.dtype]], batch_size: int) -> Tuple[list, int]:
+    fields, offset = [], 0
+    for name, (shape, dtype) in spec.items():
+        offset = -(-offset // 64) * 64
+        shape = (batch_size,) + tuple(shape)
+        fields.append((name, offset, shape, np.dtype(dtype)))
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return fields, offset
+
+
+def _slot_views(raw, fields) -> Dict[str, np.ndarray]:
+    buf = np.frombuffer(raw, dtype=np.uint8)
+    return {name: buf[off:off + int(np.prod(shape)) * dt.itemsize].view(dt).reshape(shape)
+            for name, off, shape, dt in fields}
+
+
+def _worker(dataset: ILDataset, slots, fields, tasks, results) -> None:
+    views = [_slot_views(raw, fields) for raw in slots]
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        seq, slot, indices = task
+        try:
+            dataset.batch(indices, out=views[slot])
+            results.put((seq, slot, len(indices), None))
+        except Exception:
+            results.put((seq, slot, len(indices), traceback.format_exc()))
+
+
+class ILLoader:
+    """Iterate ILDataset batches {"obs": (B, K, D), "actions": (B, H, 3), <channel>: ...}."""
+
+    def __init__(self, dataset: ILDataset, batch_size: int = 256, workers: int = 2, prefetch: int = 4,
+                 shuffle_buffer: int = 8192, seed: Optional[int] = None, drop_last: bool = False,
+                 start_method: Optional[str] = None, timeout: float = 120.0):
+        self.dataset = dataset
+        self.batch_size = max(1, int(batch_size))
+        self.workers = max(0, int(workers))
+        self.prefetch = max(1, int(prefetch), self.workers)
+        self.shuffle_buffer = int(shuffle_buffer)
+        self.drop_last = drop_last
+        self.timeout = timeout
+        self.rng = np.random.default_rng(seed)
+        self.epoch = 0
+        self._fields, self._slot_bytes = _slot_layout(dataset.spec(), self.batch_size)
+        self._ctx = mp.get_context(start_method)
+        self._procs: List = []
+        self._slots: List = []
+        self._local: Optional[Dict[str, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        n = len(self.dataset)
+        return n // self.batch_size if self.drop_last else -(-n // self.batch_size)
+
+    def _start(self) -> None:
+        if self._procs or self.workers == 0:
+            return
+        self._slots = [self._ctx.RawArray("B", max(1, self._slot_bytes)) for _ in range(self.prefetch)]
+        self._views = [_slot_views(raw, self._fields) for raw in self._slots]
+        self._tasks = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        for i in range(self.workers):
+            p = self._ctx.Process(target=_worker, name=f"il-loader-{i}", daemon=True,
+                                  args=(self.dataset, self._slots, self._fields, self._tasks, self._results))
+            p.start()
+            self._procs.append(p)
+
+    def _batches(self) -> List[np.ndarray]:
+        order = shuffle_buffer_order(len(self.dataset), self.batch_size, self.shuffle_buffer, self.rng,
+                                     self.dataset.sample_episode)
+        batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+        if self.drop_last and batches and len(batches[-1]) < self.batch_size:
+            batches.pop()
+        return batches
+
+    def __iter__(self) -> Iterator[Dict[str, np.ndarray]]:
+        batches = self._batches()
+        self.epoch += 1
+        if self.workers == 0:
+            if self._local is None:
+                self._local = self.dataset.allocate(self.batch_size)
+            for idx in batches:
+                out = self.dataset.batch(idx, out=self._local)
+                yield {k: v[:len(idx)] for k, v in out.items()}
+            return
+        self._start()
+        free = list(range(self.prefetch))
+        submitted = received = 0
+        done: Dict[int, Tuple[int, int]] = {}
+        held = None
+        try:
+            for seq in range(len(batches)):
+                # the consumer asked for the next batch: the previous slot is free again
+                if held is not None:
+                    free.append(held)
+                    held = None
+                while free and submitted < len(batches):
+                    self._tasks.put((submitted, free.pop(), batches[submitted]))
+                    submitted += 1
+                while seq not in done:
+                    s, slot, n, err = self._result()
+                    received += 1
+                    if err is not None:
+                        raise RuntimeError(f"loader worker failed:\n{err}")
+                    done[s] = (slot, n)
+                slot, n = done.pop(seq)
+                held = slot
+                yield {k: v[:n] for k, v in self._views[slot].items()}
+        finally:
+            # an abandoned epoch: wait for in-flight batches so the next one starts with every slot free
+            while received < submitted:
+                self._result()
+                received += 1
+
+    def _result(self):
+        try:
+            return self._results.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RuntimeError(f"no batch from the loader workers within {self.timeout:.0f}s") from None
+
+    def close(self) -> None:
+        for _ in self._procs:
+            self._tasks.put(None)
+        for p in self._procs:
+            p.join(5.0)
+            if p.is_alive():
+                p.terminate()
+        self._procs = []
+
+    def __enter__(self) -> "ILLoader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+__all__ = ["ILLoader", "shuffle_buffer_order"]
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+import math
 from pathlib import Path
 import os
 from typing import Tuple
@@ -13,16 +14,26 @@ except Exception:  # pragma: no cover - fallback for type checkers
 
 from pxr import Usd  # type: ignore
 
+from go2lab.core.history import ObservationHistory
 from go2lab.core.managers import ActionManager, SensorManager, RewardManager, ActionSpec
-from go2lab.sim.scripts.spawn_go2 import spawn_go2, SimpleBaseController
+from go2lab.core.raycast import RayCaster
+from go2lab.sim.scripts.spawn_go2 import GO2_RADIUS, spawn_go2, SimpleBaseController, reset_pose
 from go2lab.sim.util.kit import get_stage_and_backends
-from go2lab.sim.util.usd_path import resolve_usd_spec, isaaclab_asset_path
+from go2lab.sim.util.static_geometry import index_for_stage, occupancy_for_stage, spawn_sampler_for_stage
+from go2lab.sim.util.usd_path import isaaclab_asset_path
+from go2lab.world import open_warehouse
 
 LOGGER = logging.getLogger("lab.env.go2")
 
 
 class Go2WarehouseEnv:
-    def __init__(self, steps_per_episode: int = 200, headless: bool = False, action_spec: ActionSpec | None = None, control_hz: int = 60):
+    def __init__(self, steps_per_episode: int = 200, headless: bool = False, action_spec: ActionSpec | None = None, control_hz: int = 60,
+                 history_len: int = 0, spawn_clearance: float | None = 0.4, seed: int | None = None,
+                 collision_radius: float | None = GO2_RADIUS, raycast: bool = False):
+        # spawn_clearance: reset() teleports GO2 to a random pose at least this far [m] from static
+        # geometry (free-space map of the opened stage); None keeps the spawn pose across episodes
+        # collision_radius: the kinematic base stops at static geometry (cached box index); None disables
+        # raycast: append CPU height_scan (17x11 grid) and lidar fields to the observation (go2lab.core.raycast)
         self.steps_per_episode = steps_per_episode
         renderer = os.environ.get("ISAAC_RENDERER", "RayTracedLighting")
         self.app = SimulationApp({"headless": headless, "renderer": renderer})
@@ -35,28 +46,46 @@ class Go2WarehouseEnv:
             pass
 
         repo_root = Path(__file__).resolve().parents[4]
-        # Open warehouse USD (Isaac Lab style). Do not auto-generate a USD.
+        # Open warehouse USD (Isaac Lab style; remote layers prefetched into the asset cache). Do not auto-generate a USD.
         try:
             wh_spec = os.environ.get("WAREHOUSE_USD", "") or isaaclab_asset_path("Environments/Simple_Warehouse/warehouse.usd")
-            kind, target, ok = resolve_usd_spec(wh_spec, repo_root)
-            if kind == "url":
-                self._open_stage(target)
-            else:
-                p = Path(target)
-                if p.exists():
-                    self._open_stage(str(p))
-                else:
-                    LOGGER.error("Warehouse USD not found at local path: %s.", p)
-                    raise FileNotFoundError(str(p))
+            if open_warehouse(self._open_stage, repo_root, spec=wh_spec, strict_missing=True, logger=LOGGER):
+                # opening replaces the context's stage
+                self.stage = get_stage_and_backends()[0]
         except Exception:
             # Non-fatal: continue with empty stage
             pass
 
+        self.spawn_sampler = None
+        if spawn_clearance is not None:
+            try:
+                self.spawn_sampler = spawn_sampler_for_stage(self.stage, clearance=spawn_clearance, seed=seed)
+                if len(self.spawn_sampler) == 0:
+                    LOGGER.warning("No free spawn cell with %.2f m clearance; reset keeps the pose", spawn_clearance)
+                    self.spawn_sampler = None
+            except Exception:
+                LOGGER.exception("Could not build the spawn free-space map; reset keeps the pose")
+
         self.go2_prim = spawn_go2(self.stage, repo_root)
         self.ctrl = SimpleBaseController(self.stage, prim_path=self.go2_prim.GetPath().pathString)
+        if collision_radius is not None:
+            try:
+                self.ctrl.set_collider(index_for_stage(self.stage), radius=collision_radius)
+            except Exception:
+                LOGGER.exception("Could not build the collision index; the base moves without collisions")
 
         self.act_mgr = ActionManager(self.ctrl, action_spec or ActionSpec())
-        self.sns_mgr = SensorManager(self.stage, self.go2_prim)
+        raycaster = None
+        if raycast:
+            try:
+                raycaster = RayCaster(occupancy_for_stage(self.stage))
+            except Exception:
+                LOGGER.exception("Could not build the occupancy grid; observations have no height_scan/lidar")
+        self.sns_mgr = SensorManager(self.stage, self.go2_prim, raycaster=raycaster)
+        # (1, D) float32 observation buffer updated in place every step (zero-copy for policies)
+        self.obs_buf = self.sns_mgr.obs_buf
+        # optional (1, K, D) frame stack over obs_buf rows, pushed once per step
+        self.history = ObservationHistory(1, history_len, self.obs_buf.data.shape[1]) if history_len > 0 else None
         self.rwd_mgr = RewardManager(self.act_mgr)
 
         self.t = 0
@@ -64,17 +93,28 @@ class Go2WarehouseEnv:
     def reset(self):
         self.t = 0
         self.ctrl.brake()
-        return self.sns_mgr.observe(dt=self.dt)
+        if self.spawn_sampler is not None:
+            pos, yaw = self.spawn_sampler.sample(1)
+            reset_pose(self.stage, prim_path=self.go2_prim.GetPath().pathString, pos=tuple(pos[0].tolist()),
+                       yaw=math.degrees(float(yaw[0])))
+        self.sns_mgr.reset()
+        obs = self.sns_mgr.observe(dt=self.dt)
+        if self.history is not None:
+            self.history.reset()
+            self.history.push(self.obs_buf.data)
+        return obs
 
     def step(self, action: Tuple[float, float, float]):
         self.act_mgr.apply(action)
         self.app.update()
         self.ctrl.step(dt=self.dt)
         obs = self.sns_mgr.observe(dt=self.dt)
+        if self.history is not None:
+            self.history.push(self.obs_buf.data)
         rew = self.rwd_mgr.compute(obs, action)
         self.t += 1
         done = self.t >= self.steps_per_episode
-        return obs, rew["reward"], done, {"rewards": rew}
+        return obs, float(rew["reward"]), done, {"rewards": rew}
 
     def close(self):
         self.app.close()
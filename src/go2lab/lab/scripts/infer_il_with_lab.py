@@ -14,6 +14,10 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--lab-path", default=None)
     p.add_argument("--policy", required=True, help="Python module path exposing get_policy() -> callable")
     p.add_argument("--steps", type=int, default=300)
+    p.add_argument("--frame-stack", type=int, default=1,
+                   help="Feed the policy the last K observation rows as a (1, K, D) array instead of the obs dict")
+    p.add_argument("--dataset", nargs="+", default=None,
+                   help="Recorded shards / output dirs: get_policy(dataset=ILDataset(..., window=--frame-stack))")
     p.add_argument("--headless", action="store_true")
     return p.parse_args()
 
@@ -28,21 +32,31 @@ def main() -> int:
         log.error("Isaac Lab repo not found. Set ISAAC_LAB_PATH or configs/lab2_config.json.")
         return 2
 
+    stack = max(1, args.frame_stack)
     # Import the IL policy factory from Lab-side module
     try:
         mod = __import__(args.policy, fromlist=["get_policy"])  # type: ignore
         get_policy = getattr(mod, "get_policy")
-        policy = get_policy()
+        if args.dataset:
+            from go2lab.il.dataset import ILDataset
+
+            dataset = ILDataset(args.dataset, window=stack)
+            log.info("IL dataset: %d episodes, %d samples", len(dataset.episodes), len(dataset))
+            policy = get_policy(dataset=dataset)
+        else:
+            policy = get_policy()
     except Exception as e:
         log.error("Failed to import policy %s: %s", args.policy, e)
         return 3
 
-    env = Go2WarehouseEnv(steps_per_episode=args.steps, headless=args.headless)
+    env = Go2WarehouseEnv(steps_per_episode=args.steps, headless=args.headless,
+                          history_len=stack if stack > 1 else 0)
     try:
         obs = env.reset()
         ret = 0.0
         for t in range(args.steps):
-            a = policy(obs)
+            # frame stack is a view into the env's ring buffer: no per-step copy or list bookkeeping
+            a = policy(env.history.view() if env.history is not None else obs)
             obs, r, done, info = env.step(a)
             ret += r
             if done:
@@ -16,16 +16,6 @@ def parse_args() -> argparse.Namespace:
     return p.parse_args()
 
 
-def _obs_to_vec(obs: dict) -> list[float]:
-    vec: list[float] = []
-    vec += list(obs.get("base_lin_vel", (0.0, 0.0, 0.0)))
-    vec += list(obs.get("base_ang_vel", (0.0, 0.0, 0.0)))
-    vec += [float(obs.get("base_height", 0.0))]
-    vec += [float(obs.get("up_dot", 1.0))]
-    vec += [float(obs.get("yaw", 0.0))]
-    return vec
-
-
 def main() -> int:
     args = parse_args()
     logging.basicConfig(level=logging.INFO)
@@ -63,12 +53,15 @@ def main() -> int:
             except Exception as e:
                 log.warning("Failed to load checkpoint: %s", e)
 
+        from go2lab.core.observation import POLICY_SPAN
+
+        # (1, 9) zero-copy view of the observation buffer: lin vel, ang vel, height, up_dot, yaw
+        x = env.obs_buf.torch()[:, POLICY_SPAN] if torch is not None else None
         obs = env.reset()
         total = 0.0
         for t in range(args.steps):
             if model is not None and torch is not None:
                 with torch.no_grad():
-                    x = torch.tensor(_obs_to_vec(obs), dtype=torch.float32).unsqueeze(0)
                     act = model(x)
                     if hasattr(act, "cpu"):
                         act = act.cpu()
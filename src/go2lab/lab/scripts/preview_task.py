@@ -62,7 +62,7 @@ def main() -> int:
     env = Go2WarehouseEnv(steps_per_episode=max_len, headless=False, control_hz=control_hz)
     try:
         obs = env.reset()
-        LOGGER.info("Reset obs: %s", {k: (v if isinstance(v, (int, float)) else "...") for k, v in obs.items()})
+        LOGGER.info("Reset obs: %s", {k: (float(v) if getattr(v, "size", 0) == 1 else "...") for k, v in obs.items()})
         steps = min(60, max_len)
         ret = 0.0
         for t in range(steps):
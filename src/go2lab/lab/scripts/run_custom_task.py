@@ -34,7 +34,7 @@ def main() -> int:
     env = Go2WarehouseEnv(steps_per_episode=args.max_steps, headless=args.headless, control_hz=args.control_hz)
     try:
         obs = env.reset()
-        LOGGER.info("Custom task reset obs: %s", {k: (v if isinstance(v, (int, float)) else "...") for k, v in obs.items()})
+        LOGGER.info("Custom task reset obs: %s", {k: (float(v) if getattr(v, "size", 0) == 1 else "...") for k, v in obs.items()})
         ret = 0.0
         for t in range(min(300, args.max_steps)):
             action = (random.uniform(-1, 1), random.uniform(-1, 1), random.uniform(-1, 1))
@@ -13,8 +13,8 @@ from omni.isaac.lab.managers import SceneEntityCfg  # type: ignore
 from omni.isaac.lab.utils.noise import UniformNoiseCfg  # type: ignore
 from omni.isaac.lab.assets import AssetBaseCfg  # type: ignore
 import numpy as np
-from scipy.spatial.transform import Rotation as R  # type: ignore
 from ..go2_ctrl import base_vel_cmd
+from ...core.rotations import rotate_by_yaw, yaw_from_quats
 
 
 @configclass
@@ -141,7 +141,6 @@ def camera_follow(env):
     if env.unwrapped.scene.num_envs == 1:
         robot_position = env.unwrapped.scene["unitree_go2"].data.root_state_w[0, :3].cpu().numpy()
         robot_orientation = env.unwrapped.scene["unitree_go2"].data.root_state_w[0, 3:7].cpu().numpy()
-        rotation = R.from_quat([robot_orientation[1], robot_orientation[2], robot_orientation[3], robot_orientation[0]])
-        yaw = rotation.as_euler("zyx")[0]
-        yaw_rotation = R.from_euler("z", yaw).as_matrix()
-        set_camera_view(yaw_rotation.dot(np.asarray([-4.0, 0.0, 5.0])) + robot_position, robot_position)
+        # root quaternion is (w, x, y, z)
+        yaw = yaw_from_quats(robot_orientation, scalar_first=True)
+        set_camera_view(rotate_by_yaw(np.asarray([-4.0, 0.0, 5.0]), yaw) + robot_position, robot_position)
@@ -0,0 +1,107 @@
+"""Benchmark: synchronous vs asynchronous frame writing under a slow disk.
+
+A fake sim loop runs at --fps (sleeping for the remainder of each period, like a render loop
+that is faster than real time) and produces one --width x --height RGB + depth frame per
+tick. Frames go through frame_file_writer() into a temp dir, with an injected slow disk:
+every write sleeps --disk-ms, and every --stall-every frames it stalls --stall-ms.
+Modes: sync (write inside the loop, as BasicWriter does) and AsyncFrameWriter with each
+backpressure policy. Reported: achieved loop fps, loop period p95 / max, frames written /
+dropped / skipped, writer queue depth and write latency.
+
+--check fails (exit 1) unless "block" wrote every frame and "drop_oldest" kept the loop
+within 1.5 periods at p95.
+Runs with numpy only, e.g. `python bench_async_writer.py --fps 20 --seconds 5 --check`.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from go2lab.sim.util.async_writer import BACKPRESSURE_POLICIES, AsyncFrameWriter, frame_file_writer
+
+LOGGER = logging.getLogger("bench_async_writer")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--fps", type=float, default=20.0)
+    p.add_argument("--seconds", type=float, default=5.0)
+    p.add_argument("--width", type=int, default=640)
+    p.add_argument("--height", type=int, default=480)
+    p.add_argument("--disk-ms", type=float, default=30.0, help="Injected latency of every write")
+    p.add_argument("--stall-every", type=int, default=25, help="Inject a long stall every N frames")
+    p.add_argument("--stall-ms", type=float, default=500.0)
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--queue", type=int, default=32)
+    p.add_argument("--check", action="store_true")
+    return p.parse_args()
+
+
+def _slow(write, disk_s: float, stall_every: int, stall_s: float):
+    def slow_write(index, frame):
+        time.sleep(disk_s + (stall_s if stall_every and index % stall_every == stall_every - 1 else 0.0))
+        write(index, frame)
+
+    return slow_write
+
+
+def run(mode: str, args, out: Path) -> dict:
+    period = 1.0 / args.fps
+    frames = int(args.seconds * args.fps)
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 255, size=(args.height, args.width, 3), dtype=np.uint8)
+    depth = rng.random((args.height, args.width), dtype=np.float32)
+    base = frame_file_writer(out)
+    write = _slow(base, args.disk_ms / 1e3, args.stall_every, args.stall_ms / 1e3)
+    writer = None if mode == "sync" else AsyncFrameWriter(write, args.workers, args.queue, policy=mode)
+    loop = []
+    t_start = t_prev = time.perf_counter()
+    deadline = t_start
+    for i in range(frames):
+        frame = {"arrays": {"rgb": rgb.copy(), "distance_to_image_plane": depth.copy()}, "meta": {"mode": mode}}
+        if writer is None:
+            write(i, frame)
+        else:
+            writer.submit(i, frame)
+        deadline += period
+        time.sleep(max(0.0, deadline - time.perf_counter()))
+        now = time.perf_counter()
+        loop.append(now - t_prev)
+        t_prev = now
+    wall = time.perf_counter() - t_start
+    stats = writer.close() if writer is not None else {"written": frames, "dropped": 0, "skipped": 0, "max_depth": 0,
+                                                         "latency_ms_p95": 0.0}
+    base.close()
+    loop_ms = np.asarray(loop) * 1e3
+    return {"mode": mode, "fps": frames / wall, "p95": float(np.percentile(loop_ms, 95)), "max": float(loop_ms.max()),
+            "frames": frames, **stats}
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    LOGGER.info("target %.1f fps (%.1f ms), disk %.0f ms/write + %.0f ms stall every %d frames", args.fps,
+                1e3 / args.fps, args.disk_ms, args.stall_ms, args.stall_every)
+    LOGGER.info("%12s %8s %10s %10s %8s %8s %8s %10s %12s", "mode", "fps", "p95[ms]", "max[ms]", "written", "dropped",
+                "skipped", "max queue", "write p95[ms]")
+    results = {}
+    for mode in ("sync",) + BACKPRESSURE_POLICIES:
+        with tempfile.TemporaryDirectory() as tmp:
+            r = results[mode] = run(mode, args, Path(tmp))
+        LOGGER.info("%12s %8.1f %10.1f %10.1f %8d %8d %8d %10d %12.1f", mode, r["fps"], r["p95"], r["max"], r["written"],
+                    r["dropped"], r["skipped"], r["max_depth"], r["latency_ms_p95"])
+    if args.check:
+        ok = results["block"]["written"] == results["block"]["frames"]
+        ok &= results["drop_oldest"]["p95"] <= 1.5e3 / args.fps
+        LOGGER.info("check %s", "ok" if ok else "FAILED")
+        return 0 if ok else 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
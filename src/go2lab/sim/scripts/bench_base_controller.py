@@ -0,0 +1,78 @@
+"""Micro-benchmark: per-prim SimpleBaseController.step vs BatchedBaseController.step.
+
+Builds an in-memory stage with N robot Xforms, gives every robot a non-zero velocity
+command and times one control step over all robots:
+- per_prim: one SimpleBaseController per robot, stepped in a Python loop
+- batched: one BatchedBaseController over all robots (vectorized update + one Sdf.ChangeBlock)
+
+Runs with plain pxr (no SimulationApp), e.g. `python.bat bench_base_controller.py --robots 1 100 1000`.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+
+import numpy as np
+from pxr import Usd, UsdGeom, Gf  # type: ignore
+
+from go2lab.sim.scripts.spawn_go2 import BatchedBaseController, SimpleBaseController
+
+LOGGER = logging.getLogger("bench_base_controller")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--robots", type=int, nargs="+", default=[1, 10, 100, 1000])
+    p.add_argument("--iters", type=int, default=50)
+    p.add_argument("--dt", type=float, default=1.0 / 60.0)
+    return p.parse_args()
+
+
+def _build_stage(robots: int) -> tuple[Usd.Stage, list[str]]:
+    stage = Usd.Stage.CreateInMemory()
+    paths = []
+    for i in range(robots):
+        xf = UsdGeom.Xform.Define(stage, f"/World/envs/env_{i}/go2")
+        xf.AddTranslateOp().Set(Gf.Vec3d(2.0 * i, 0.0, 0.4))
+        paths.append(xf.GetPath().pathString)
+    return stage, paths
+
+
+def _time_per_prim(robots: int, iters: int, dt: float) -> float:
+    stage, paths = _build_stage(robots)
+    ctrls = [SimpleBaseController(stage, prim_path=p) for p in paths]
+    for c in ctrls:
+        c.set_cmd(0.5, 0.1, 0.3)
+        c.step(dt)
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        for c in ctrls:
+            c.step(dt)
+    return (time.perf_counter() - t0) / iters
+
+
+def _time_batched(robots: int, iters: int, dt: float) -> float:
+    stage, paths = _build_stage(robots)
+    ctrl = BatchedBaseController(stage, paths)
+    ctrl.set_cmds(np.tile([0.5, 0.1, 0.3], (robots, 1)))
+    ctrl.step(dt)
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        ctrl.step(dt)
+    return (time.perf_counter() - t0) / iters
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    LOGGER.info("%8s %14s %14s %10s", "robots", "per_prim[us]", "batched[us]", "speedup")
+    for n in args.robots:
+        per_prim = _time_per_prim(n, args.iters, args.dt)
+        batched = _time_batched(n, args.iters, args.dt)
+        LOGGER.info("%8d %14.1f %14.1f %9.1fx", n, per_prim * 1e6, batched * 1e6, per_prim / batched)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,134 @@
+"""Benchmark + check: go2lab.core.spatial.BoxIndex batched queries vs brute force.
+
+A warehouse_gen layout with at least --props props is generated (floor grown like
+bench_warehouse_gen); its blocking boxes are indexed once, saved and re-loaded memory-mapped.
+For --queries random points/steps the bench times nearest / overlap / sweep through the index
+against the all-pairs brute force, then times collision-aware BatchedBaseController.step()
+for --robots placeholder robots (spawn_go2_batch, in-memory stage) driving forward.
+
+--check compares every index answer with the brute force (exit 1 on mismatch).
+Runs with plain pxr + numpy, e.g. `python bench_box_index.py --check --props 5000 --robots 512`.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from pxr import Usd  # type: ignore
+
+from go2lab.core.occupancy import GridSpec, blocking_boxes
+from go2lab.core.spatial import BoxIndex
+from go2lab.sim.scripts.bench_warehouse_gen import params_for_props
+from go2lab.sim.scripts.spawn_go2 import GO2_RADIUS, BatchedBaseController, grid_origins, spawn_go2_batch
+from go2lab.sim.scripts.warehouse_gen import WarehouseParams
+from go2lab.sim.util.static_geometry import boxes_from_params
+
+LOGGER = logging.getLogger("bench_box_index")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--props", type=int, default=5000, help="Minimum props in the generated layout")
+    p.add_argument("--queries", type=int, default=4096)
+    p.add_argument("--robots", type=int, default=512)
+    p.add_argument("--steps", type=int, default=120)
+    p.add_argument("--radius", type=float, default=GO2_RADIUS)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--check", action="store_true", help="Compare with brute force (exit 1 on mismatch)")
+    return p.parse_args()
+
+
+def _brute(boxes: np.ndarray, xy: np.ndarray, p1: np.ndarray, radius: float, chunk: int = 256):
+    lo, hi = boxes[None, :, 0:2], boxes[None, :, 3:5]
+    near, arg, over, t_first = [], [], [], []
+    for s in range(0, len(xy), chunk):
+        p = xy[s:s + chunk, None, :]
+        d = np.sqrt((np.maximum(np.maximum(lo - p, p - hi), 0.0) ** 2).sum(axis=-1))
+        near.append(d.min(axis=1))
+        arg.append(d.argmin(axis=1))
+        over.append((d <= radius).any(axis=1))
+        dd = p1[s:s + chunk, None, :] - p
+        dd = np.where(np.abs(dd) < 1e-12, 1e-12, dd)
+        t1, t2 = (lo - radius - p) / dd, (hi + radius - p) / dd
+        t_in, t_out = np.minimum(t1, t2).max(axis=-1), np.maximum(t1, t2).min(axis=-1)
+        hit = (t_in <= t_out) & (t_in >= 0.0) & (t_in <= 1.0)
+        t_first.append(np.where(hit, t_in, 1.0).min(axis=1))
+    return np.concatenate(near), np.concatenate(arg), np.concatenate(over), np.concatenate(t_first)
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    params = params_for_props(args.props, WarehouseParams(seed=args.seed))
+    boxes = blocking_boxes(boxes_from_params(params), GridSpec()).astype(np.float64)
+    t0 = time.perf_counter()
+    index = BoxIndex.build(boxes)
+    build_s = time.perf_counter() - t0
+    with tempfile.TemporaryDirectory() as tmp:
+        index.save(Path(tmp) / "index")
+        t0 = time.perf_counter()
+        index = BoxIndex.load(Path(tmp) / "index")
+        load_s = time.perf_counter() - t0
+        LOGGER.info("%d boxes, floor %.0f m, cell %.2f m (%dx%d), build %.1f ms, mmap load %.2f ms", len(boxes),
+                    params.floor_size[0], index.cell, index.shape[1], index.shape[0], build_s * 1e3, load_s * 1e3)
+
+        rng = np.random.default_rng(args.seed)
+        sx, sy = params.floor_size
+        xy = rng.uniform((-sx / 2, -sy / 2), (sx / 2, sy / 2), size=(args.queries, 2))
+        step = rng.normal(size=(args.queries, 2)) * 0.5
+        t0 = time.perf_counter()
+        near, arg = index.nearest(xy)
+        over = index.overlap(xy, args.radius)
+        t, _ = index.sweep(xy, xy + step, args.radius)
+        index_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        b_near, b_arg, b_over, b_t = _brute(boxes, xy, xy + step, args.radius)
+        brute_s = time.perf_counter() - t0
+        LOGGER.info("%d queries (nearest + overlap + sweep): index %.1f ms, brute force %.1f ms (%.0fx)",
+                    args.queries, index_s * 1e3, brute_s * 1e3, brute_s / index_s if index_s > 0 else float("inf"))
+        if args.check:
+            bad = {
+                "nearest": int((~np.isclose(near, b_near)).sum()),
+                "nearest box": int((~np.isclose(np.sqrt(((np.maximum(np.maximum(boxes[arg, 0:2] - xy, xy - boxes[arg, 3:5]),
+                                                                         0.0)) ** 2).sum(axis=1)), b_near)).sum()),
+                "overlap": int((over != b_over).sum()),
+                "sweep": int((~np.isclose(t, b_t)).sum()),
+            }
+            if any(bad.values()):
+                LOGGER.error("check FAILED: mismatches %s", bad)
+                return 1
+            LOGGER.info("check ok: nearest/overlap/sweep match brute force for %d queries", args.queries)
+
+    # collision-aware kinematic stepping for N robots
+    stage = Usd.Stage.CreateInMemory()
+    paths = spawn_go2_batch(stage, Path("."), args.robots, usd="")
+    origins = grid_origins(args.robots)
+    ctrl = BatchedBaseController(stage, paths)
+    ctrl.set_collider(index, args.radius, origins=origins)
+    cmds = np.zeros((args.robots, 3))
+    cmds[:, 0] = 1.0
+    ctrl.set_cmds(cmds)
+    hits = 0
+    t0 = time.perf_counter()
+    for _ in range(args.steps):
+        ctrl.step(1.0 / 60.0)
+        hits += int(ctrl.collided.sum())
+    step_s = time.perf_counter() - t0
+    world = ctrl.pos[:, :2] + origins[:, :2]
+    free = ~index.overlap(world, args.radius * 0.99)
+    start_free = ~index.overlap(origins[:, :2], args.radius)
+    LOGGER.info("%d robots x %d steps: %.3f ms/step, %d contacts, %d/%d robots that started free are still free",
+                args.robots, args.steps, step_s / args.steps * 1e3, hits, int((free & start_free).sum()),
+                int(start_free.sum()))
+    if args.check and not free[start_free].all():
+        LOGGER.error("check FAILED: robots moved into geometry")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
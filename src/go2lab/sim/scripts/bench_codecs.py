@@ -0,0 +1,211 @@
+"""Benchmark + check: per-channel codecs (go2lab.sim.util.channel_codecs), bytes per frame and
+encode / decode throughput.
+
+Synthesizes --frames recorder-like frames at --width x --height: depth of a camera looking
+over a floor with boxes (inf above the horizon), semantic ids (a few classes), instance ids
+(one id per box) and an RGB image. Each channel is encoded with its candidate codecs and
+compared with frame_file_writer's default format (.npy for depth and ids, PNG for RGB).
+Reported: bytes per frame, ratio, encode / decode MB/s (of raw array bytes), then
+frames/s of ProcessEncoder for each --processes count.
+
+--check (exit 1 on failure) round-trips every segmentation frame and edge cases (single
+value, all distinct, RGBA masks, empty) through "rle" and "palette" bit-exactly, bounds the
+depth16 error by scale / 2 with invalid pixels restored, and reads encoded frames back
+through frame_file_writer + ILDataset's file reader and shard_frame_writer + ShardReader.
+Runs with numpy (+ PIL for png/jpeg), e.g. `python bench_codecs.py --check`.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from go2lab.sim.util.async_writer import frame_file_writer
+from go2lab.sim.util.channel_codecs import ProcessEncoder, decode, encode, parse_codecs
+from go2lab.sim.util.shards import ShardReader, ShardWriter, shard_frame_writer
+
+LOGGER = logging.getLogger("bench_codecs")
+
+try:
+    import PIL  # type: ignore  # noqa: F401
+
+    _HAS_PIL = True
+except ImportError:
+    _HAS_PIL = False
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--frames", type=int, default=20)
+    p.add_argument("--width", type=int, default=640)
+    p.add_argument("--height", type=int, default=480)
+    p.add_argument("--scale", type=float, default=0.001, help="depth16 quantization step [m]")
+    p.add_argument("--processes", type=int, nargs="+", default=[0, 2])
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--check", action="store_true")
+    return p.parse_args()
+
+
+def synth_frame(rng: np.random.Generator, w: int, h: int) -> dict:
+    """Depth / semantic / instance / rgb of a pinhole camera 0.3 m above a floor with boxes."""
+    f = 0.8 * w
+    v = (np.arange(h, dtype=np.float32) - h / 2 + 0.5)[:, None]
+    u = (np.arange(w, dtype=np.float32) - w / 2 + 0.5)[None, :]
+    with np.errstate(divide="ignore"):
+        floor = np.where(v > 0, 0.3 * f / v, np.inf) * np.ones_like(u)
+    depth = floor.astype(np.float32)
+    semantic = np.where(v > 0, 1, 0).astype(np.uint32) * np.ones((1, w), np.uint32)
+    instance = semantic.copy()
+    for k in range(int(rng.integers(3, 9))):
+        z = float(rng.uniform(1.5, 12.0))
+        x0 = int(rng.integers(0, w - 20))
+        bw = int(max(8, rng.uniform(0.5, 2.5) * f / z))
+        top = int(h / 2 - rng.uniform(0.2, 1.5) * f / z)
+        bottom = int(min(h, h / 2 + 0.3 * f / z))
+        region = (slice(max(top, 0), bottom), slice(x0, min(w, x0 + bw)))
+        closer = depth[region] > z
+        depth[region] = np.where(closer, z + 0.01 * (u[:, region[1]] / f), depth[region])
+        semantic[region] = np.where(closer, 2 + k % 3, semantic[region])
+        instance[region] = np.where(closer, 100 + k, instance[region])
+    depth = np.where(np.isfinite(depth), depth + rng.normal(0, 0.002, depth.shape).astype(np.float32), depth)
+    shade = np.clip(np.where(np.isfinite(depth), 255 - 15 * np.nan_to_num(depth, posinf=16), 200), 0, 255)
+    rgb = np.clip(shade[..., None] * np.array([0.9, 0.85, 0.8]) + rng.normal(0, 3, (h, w, 3)), 0, 255).astype(np.uint8)
+    return {"distance_to_image_plane": depth, "semantic_segmentation": semantic,
+            "instance_segmentation": instance, "rgb": rgb}
+
+
+def _baseline(name: str, arr: np.ndarray) -> int:
+    buf = io.BytesIO()
+    if name == "rgb" and _HAS_PIL:
+        from PIL import Image  # type: ignore
+
+        Image.fromarray(arr).save(buf, format="PNG", compress_level=1)
+    else:
+        np.save(buf, arr)
+    return len(buf.getvalue())
+
+
+CANDIDATES = {
+    "distance_to_image_plane": [("depth16", {}), ("zlib", {"level": 1})],
+    "semantic_segmentation": [("rle", {}), ("palette", {}), ("zlib", {"level": 1})],
+    "instance_segmentation": [("rle", {}), ("palette", {}), ("zlib", {"level": 1})],
+    "rgb": [("png", {}), ("jpeg", {"quality": 90})] if _HAS_PIL else [("zlib", {"level": 1})],
+}
+
+
+def check(frames: list, scale: float) -> bool:
+    ok = True
+    rng = np.random.default_rng(7)
+    masks = [f[k] for f in frames for k in ("semantic_segmentation", "instance_segmentation")]
+    sem8 = frames[0]["semantic_segmentation"].astype(np.uint8) * 40
+    rgba = np.dstack([sem8, sem8, sem8, np.full_like(sem8, 255)])  # colorized mask
+    masks += [np.full((4, 5), 9, np.uint32), rng.integers(0, 1 << 32, (37, 53), dtype=np.uint32), rgba,
+              np.zeros((0, 8), np.uint32), rng.integers(0, 3, (64, 64), dtype=np.uint16)]
+    for codec in ("rle", "palette"):
+        bad = 0
+        for m in masks:
+            d = decode(encode(m, codec))
+            bad += not (d.dtype == m.dtype and d.shape == m.shape and np.array_equal(d, m))
+        (LOGGER.info if not bad else LOGGER.error)("%s: %d of %d masks round-trip bit-exactly", codec,
+                                                   len(masks) - bad, len(masks))
+        ok &= bad == 0
+    worst = 0.0
+    for f in frames:
+        dep = f["distance_to_image_plane"].copy()
+        dep[0, :3] = (np.nan, -1.0, 0.0)
+        got = decode(encode(dep, "depth16", scale=scale))
+        fin = np.isfinite(dep) & (dep > 0)
+        near = fin & (dep < 65535 * scale)  # farther pixels saturate at the range limit
+        worst = max(worst, float(np.abs(got[near] - dep[near]).max()))
+        ok &= bool(np.isinf(got[~fin]).all()) and got.dtype == dep.dtype
+        ok &= bool(np.allclose(got[fin & ~near], 65535 * scale))
+    ok &= worst <= scale / 2 + 2e-5  # plus float32 rounding at the far end of the range
+    LOGGER.info("depth16: max error %.6f m (scale %.4f), invalid pixels restored as inf", worst, scale)
+    sat = decode(encode(np.array([[100.0, 1.0]], np.float32), "depth16", scale=scale))
+    ok &= abs(float(sat[0, 0]) - 65535 * scale) < 1e-3
+
+    # writers and readers
+    codecs = parse_codecs("depth=depth16,semantic=rle,instance=palette",
+                          aliases={"depth": "distance_to_image_plane", "semantic": "semantic_segmentation",
+                                   "instance": "instance_segmentation"})
+    with tempfile.TemporaryDirectory() as tmp, ProcessEncoder(codecs, processes=0) as enc:
+        from go2lab.il.dataset import _read_file_frame
+
+        tmp = Path(tmp)
+        write = frame_file_writer(tmp / "rec", encode=enc.encode)
+        with ShardWriter(tmp / "shards") as shards:
+            ep = shards.new_episode(name="codecs")
+            swrite = shard_frame_writer(shards, ep, encode=enc.encode)
+            for i, f in enumerate(frames[:3]):
+                write(i, {"arrays": f})
+                swrite(i, {"arrays": f})
+        write.close()
+        read, reader = _read_file_frame(tmp / "rec"), ShardReader(tmp / "shards")
+        for i, f in enumerate(frames[:3]):
+            for name in ("semantic_segmentation", "instance_segmentation"):
+                ok &= bool(np.array_equal(read(name, i), f[name]))
+                ok &= bool(np.array_equal(reader.get(ep, i, name), f[name]))
+            dep = f["distance_to_image_plane"]
+            near = np.isfinite(dep) & (dep < 65535 * scale)
+            ok &= bool(np.allclose(reader.get(ep, i, "distance_to_image_plane")[near], dep[near], atol=scale))
+        ok &= (tmp / "rec" / "semantic_segmentation_0000.g2c").exists()
+    LOGGER.info("check %s", "ok" if ok else "FAILED")
+    return bool(ok)
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    rng = np.random.default_rng(args.seed)
+    frames = [synth_frame(rng, args.width, args.height) for _ in range(args.frames)]
+    LOGGER.info("%d frames %dx%d%s", args.frames, args.width, args.height,
+                "" if _HAS_PIL else " (PIL missing: no png/jpeg)")
+    LOGGER.info("%24s %8s %12s %8s %12s %12s", "channel", "codec", "bytes/frame", "ratio", "enc MB/s", "dec MB/s")
+    for name, candidates in CANDIDATES.items():
+        arrays = [f[name] for f in frames]
+        raw = sum(a.nbytes for a in arrays)
+        base = sum(_baseline(name, a) for a in arrays) / len(arrays)
+        LOGGER.info("%24s %8s %12.0f %8s %12s %12s", name, "default", base, "1.0x", "-", "-")
+        for codec, params in candidates:
+            t0 = time.perf_counter()
+            blobs = [encode(a, codec, scale=args.scale) if codec == "depth16" else encode(a, codec, **params)
+                     for a in arrays]
+            enc_s = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            for b in blobs:
+                decode(b)
+            dec_s = time.perf_counter() - t0
+            size = sum(len(b) for b in blobs) / len(blobs)
+            LOGGER.info("%24s %8s %12.0f %7.1fx %12.0f %12.0f", name, codec, size, base / size, raw / 1e6 / enc_s,
+                        raw / 1e6 / dec_s)
+    codecs = {"distance_to_image_plane": ("depth16", {"scale": args.scale}), "semantic_segmentation": ("rle", {}),
+              "instance_segmentation": ("rle", {})}
+    if _HAS_PIL:
+        codecs["rgb"] = ("png", {})
+    for procs in args.processes:
+        with ProcessEncoder(codecs, processes=procs) as enc:
+            enc.start()
+            t0 = time.perf_counter()
+            if procs:
+                from concurrent.futures import ThreadPoolExecutor
+
+                # writer threads block on the pool, like AsyncFrameWriter workers
+                with ThreadPoolExecutor(procs) as threads:
+                    list(threads.map(enc.encode, frames))
+            else:
+                for f in frames:
+                    enc.encode(f)
+            dt = time.perf_counter() - t0
+        LOGGER.info("ProcessEncoder processes=%d: %.1f frames/s", procs, len(frames) / dt)
+    if args.check and not check(frames, args.scale):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,185 @@
+"""Benchmark + check: IL dataset loader throughput (go2lab.il), samples per second.
+
+Synthesizes --episodes recordings driven by a linear teacher policy (telemetry log plus a
+--width x --height depth frame per step, a few frames marked not captured), once as
+output/<timestamp>/-style directories and once packed into shards. Reported: samples/s of
+ILLoader for observation/action windows only and with frames, per source and worker count.
+
+--check (exit 1 on failure) verifies that rebuilt observations match a per-step
+SensorManager-style reference, that an epoch yields every sample exactly once (workers and
+in-process agree), that windows with dropped frames are skipped, and that fit_linear_bc
+recovers the teacher from the data (get_policy() as used by infer_il_with_lab.py).
+Runs with numpy only, e.g. `python bench_il_loader.py --check --workers 0 1 2`.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import math
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from go2lab.core.managers import ActionSpec
+from go2lab.core.observation import DEFAULT_LAYOUT, POLICY_SPAN
+from go2lab.il.bc_policy import get_policy
+from go2lab.il.dataset import ILDataset
+from go2lab.il.loader import ILLoader
+from go2lab.sim.scripts.pack_shards import pack
+from go2lab.sim.util.async_writer import frame_file_writer
+from go2lab.sim.util.shards import ShardWriter
+from go2lab.sim.util.telemetry import TelemetryLog
+
+LOGGER = logging.getLogger("bench_il_loader")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--episodes", type=int, default=4)
+    p.add_argument("--frames", type=int, default=2000)
+    p.add_argument("--width", type=int, default=64)
+    p.add_argument("--height", type=int, default=48)
+    p.add_argument("--window", type=int, default=4)
+    p.add_argument("--horizon", type=int, default=2)
+    p.add_argument("--batch", type=int, default=256)
+    p.add_argument("--workers", type=int, nargs="+", default=[0, 2])
+    p.add_argument("--shuffle-buffer", type=int, default=4096)
+    p.add_argument("--fps", type=float, default=20.0)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--check", action="store_true")
+    return p.parse_args()
+
+
+def teacher(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    w = np.zeros((POLICY_SPAN.stop - POLICY_SPAN.start + 1, 3))
+    w[:-1] = rng.normal(0.0, 0.05, size=(w.shape[0] - 1, 3))
+    w[-1] = (0.4, 0.0, 0.1)
+    return w
+
+
+def record(out: Path, frames: int, fps: float, w: np.ndarray, args, rng) -> None:
+    """Kinematic rollout of the teacher, logged like dataset_recorder (async writer): row i holds
+    frame i, the pose it shows and the command then applied."""
+    spec, dt = ActionSpec(), 1.0 / fps
+    scale = np.array([spec.scale_lin_xy, spec.scale_lin_xy, spec.scale_yaw])
+    write = frame_file_writer(out)
+    # distinct start poses, so first rows of different episodes differ
+    pos, yaw = np.array([*rng.uniform(-2.0, 2.0, 2), 0.35]), 0.0
+    lin, wz = np.zeros(3), 0.0
+    with TelemetryLog(out, attrs={"fps": fps}) as log:
+        for i in range(frames):
+            # policy input of the previous observation -> command applied during this step
+            feat = np.concatenate([lin, (0.0, 0.0, wz), (pos[2], 1.0, yaw), (1.0,)])
+            noise = rng.normal(0.0, 0.02, 3) if i % 50 == 0 else 0.0
+            cmd = np.clip(feat @ w + noise, -1.0, 1.0) * scale
+            captured = i % 97 != 96
+            if captured:
+                depth = np.full((args.height, args.width), i, dtype=np.float32)
+                write(i, {"arrays": {"distance_to_image_plane": depth}})
+            # the rendered (pre-step) pose, like dataset_recorder
+            log.record(frame=i, sim_time=(i + 1) * dt, wall_time=i * dt, pos=pos, yaw=yaw, cmd=cmd, captured=captured)
+            c, s = math.cos(yaw), math.sin(yaw)
+            prev, prev_yaw = pos.copy(), yaw
+            pos = pos + dt * np.array([c * cmd[0] - s * cmd[1], s * cmd[0] + c * cmd[1], 0.0])
+            yaw = (yaw + dt * cmd[2] + math.pi) % (2 * math.pi) - math.pi
+            lin = (pos - prev) / dt
+            wz = ((yaw - prev_yaw + math.pi) % (2 * math.pi) - math.pi) / dt
+    write.close()
+
+
+def _reference_obs(rec, t: int, window: int) -> np.ndarray:
+    rows = []
+    for r in range(t - window + 1, t + 1):
+        r = max(r, 0)
+        p = max(r - 1, 0)
+        pos, yaw = np.asarray(rec["pos"][r], float), float(rec["yaw"][r])
+        dt = float(rec["sim_time"][r] - rec["sim_time"][p])
+        lin = (pos - np.asarray(rec["pos"][p], float)) / dt if r else np.zeros(3)
+        dyaw = (yaw - float(rec["yaw"][p]) + math.pi) % (2 * math.pi) - math.pi
+        row = np.concatenate([lin, (0.0, 0.0, dyaw / dt if r else 0.0), (pos[2], 1.0, yaw), pos,
+                              (0.0, 0.0, math.sin(yaw / 2), math.cos(yaw / 2))])
+        rows.append(row)
+    return np.asarray(rows, dtype=np.float32)
+
+
+def check(args, recs: list, shard_dir: Path, w: np.ndarray) -> bool:
+    ok = True
+    ds = ILDataset(recs, window=args.window, horizon=args.horizon)
+    rng = np.random.default_rng(1)
+    for i in rng.integers(0, len(ds), 32).tolist():
+        ep, t = int(ds.sample_episode[i]), int(ds.sample_row[i])
+        ref = _reference_obs(ds.episodes[ep].records, t, args.window)
+        if not np.allclose(ds[i]["obs"], ref, atol=1e-4):
+            LOGGER.error("sample %d (episode %d row %d): observation differs from the reference", i, ep, t)
+            ok = False
+    assert DEFAULT_LAYOUT.dim == ds.spec()["obs"][0][1]
+    # every sample exactly once per epoch, identical with and without worker processes
+    seen = {}
+    for workers in (0, 2):
+        ds_ch = ILDataset([shard_dir], window=args.window, horizon=args.horizon, channels=("distance_to_image_plane",))
+        with ILLoader(ds_ch, batch_size=100, workers=workers, prefetch=2, shuffle_buffer=500, seed=3) as loader:
+            rows = []
+            for batch in loader:
+                # depth frames hold their frame number: compare against the obs window positions
+                frames = batch["distance_to_image_plane"][:, :, 0, 0]
+                rows.append(np.concatenate([batch["obs"][:, -1, 9:12], frames[:, -1:]], axis=1).copy())
+            seen[workers] = np.concatenate(rows)
+        n_ok = len(seen[workers]) == len(ds_ch) and len(np.unique(seen[workers], axis=0)) == len(ds_ch)
+        if not n_ok:
+            LOGGER.error("workers=%d: epoch yielded %d rows for %d samples", workers, len(seen[workers]), len(ds_ch))
+        ok &= n_ok
+    ok &= bool(np.array_equal(seen[0], seen[2]))
+    # windows touching a not-captured frame (every 97th) are skipped with channels
+    expect = sum(len(e) - args.horizon + 1 for e in ds_ch.episodes)
+    ok &= len(ds_ch) < expect
+    # behaviour cloning recovers the teacher
+    policy = get_policy(dataset=ILDataset(recs, window=1))
+    obs = ILDataset(recs, window=1).batch(np.arange(0, len(ds), 37))["obs"]
+    x = np.concatenate([obs[:, 0, POLICY_SPAN], np.ones((len(obs), 1))], axis=1)
+    want = np.clip(x @ w, -1, 1)
+    got = np.array([policy(o) for o in obs])
+    err = float(np.abs(got - want).max())
+    (LOGGER.info if err < 0.05 else LOGGER.error)("linear BC: max action error %.4f vs the teacher", err)
+    ok &= err < 0.05
+    LOGGER.info("check %s", "ok" if ok else "FAILED")
+    return bool(ok)
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    rng = np.random.default_rng(args.seed)
+    w = teacher(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        recs = [tmp / "output" / f"rec_{e:03d}" for e in range(args.episodes)]
+        for rec in recs:
+            record(rec, args.frames, args.fps, w, args, rng)
+        with ShardWriter(tmp / "shards") as shards:
+            for rec in recs:
+                pack(rec, shards, verify=False)
+        sources = {"dirs": tmp / "output", "shards": tmp / "shards"}
+        LOGGER.info("%d episodes x %d frames, window %d, horizon %d, batch %d", args.episodes, args.frames, args.window,
+                    args.horizon, args.batch)
+        LOGGER.info("%8s %10s %8s %14s", "source", "channels", "workers", "samples/s")
+        for name, path in sources.items():
+            for channels in ((), ("distance_to_image_plane",)):
+                ds = ILDataset([path], window=args.window, horizon=args.horizon, channels=channels)
+                for workers in args.workers:
+                    with ILLoader(ds, batch_size=args.batch, workers=workers, shuffle_buffer=args.shuffle_buffer,
+                                  seed=args.seed) as loader:
+                        next(iter(loader))  # start the workers outside the timing
+                        t0 = time.perf_counter()
+                        n = sum(len(b["obs"]) for b in loader)
+                        dt = time.perf_counter() - t0
+                    LOGGER.info("%8s %10s %8d %14.0f", name, "frames" if channels else "-", workers, n / dt)
+        if args.check and not check(args, recs, tmp / "shards", w):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,163 @@
+"""Correctness check and throughput benchmark for go2lab.core.rotations.
+
+--check compares every kernel against scipy.spatial.transform.Rotation on random
+poses (including near-180-degree and scaled matrices) and exits non-zero on mismatch.
+The benchmark times frame_features / yaw_from_quats over 1..100k poses, against
+the scipy path previously used per robot (Rotation.from_matrix + as_euler + as_quat).
+
+Plain NumPy (torch optional via --torch), e.g. `python bench_rotations.py --check`.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from go2lab.core.rotations import (
+    frame_features,
+    projected_gravity_from_matrices,
+    projected_gravity_from_quats,
+    quat_from_matrices,
+    quat_from_yaw,
+    rotate_by_yaw,
+    up_from_matrices,
+    up_from_quats,
+    yaw_from_matrices,
+    yaw_from_quats,
+)
+
+LOGGER = logging.getLogger("bench_rotations")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--poses", type=int, nargs="+", default=[1, 100, 10000, 100000])
+    p.add_argument("--iters", type=int, default=20)
+    p.add_argument("--check", action="store_true", help="Compare against scipy and exit")
+    p.add_argument("--torch", action="store_true", help="Also time torch tensors (CPU)")
+    p.add_argument("--seed", type=int, default=0)
+    return p.parse_args()
+
+
+def _gf_matrices(rot, scale: np.ndarray | None = None) -> np.ndarray:
+    # Gf row-vector layout: rows are body axes in world, i.e. the transpose of scipy's matrix
+    n = len(rot)
+    m = np.zeros((n, 4, 4))
+    m[:, :3, :3] = np.transpose(rot.as_matrix(), (0, 2, 1))
+    if scale is not None:
+        m[:, :3, :3] *= scale[:, :, None]
+    m[:, 3, :3] = np.random.default_rng(1).normal(size=(n, 3))
+    m[:, 3, 3] = 1.0
+    return m
+
+
+def _same_quat(a: np.ndarray, b: np.ndarray) -> float:
+    # q and -q are the same rotation
+    return float(np.minimum(np.abs(a - b).max(-1), np.abs(a + b).max(-1)).max())
+
+
+def check(seed: int) -> int:
+    from scipy.spatial.transform import Rotation as R  # type: ignore
+
+    rng = np.random.default_rng(seed)
+    rot = R.concatenate([
+        R.random(2000, random_state=seed),
+        R.from_rotvec(np.pi * np.eye(3)),
+        R.from_rotvec((np.pi - 1e-7) * np.array([[0.6, 0.8, 0.0]])),
+        R.identity(1),
+    ])
+    n = len(rot)
+    m = _gf_matrices(rot, scale=rng.uniform(0.5, 2.0, size=(n, 3)))
+    ref_q = rot.as_quat()
+    ref_R = rot.as_matrix()
+    ref_yaw = rot.as_euler("ZYX")[:, 0]  # intrinsic z-y-x: heading first
+    ref_up = ref_R[:, :, 2]
+    ref_g = rot.inv().apply(np.array([0.0, 0.0, -1.0]))
+
+    def _ang(a, b):
+        return float(np.abs((a - b + np.pi) % (2 * np.pi) - np.pi).max())
+
+    yaw, quat, up, grav = frame_features(m)
+    errors = {
+        "yaw_from_matrices": _ang(yaw_from_matrices(m), ref_yaw),
+        "quat_from_matrices": _same_quat(quat_from_matrices(m), ref_q),
+        "quat_from_matrices[wxyz]": _same_quat(quat_from_matrices(m, scalar_first=True), ref_q[:, [3, 0, 1, 2]]),
+        "up_from_matrices": float(np.abs(up_from_matrices(m) - ref_up).max()),
+        "projected_gravity_from_matrices": float(np.abs(projected_gravity_from_matrices(m) - ref_g).max()),
+        "frame_features": max(_ang(yaw, ref_yaw), _same_quat(quat, ref_q),
+                              float(np.abs(up - ref_up).max()), float(np.abs(grav - ref_g).max())),
+        "yaw_from_quats": _ang(yaw_from_quats(ref_q), ref_yaw),
+        "yaw_from_quats[wxyz]": _ang(yaw_from_quats(ref_q[:, [3, 0, 1, 2]], scalar_first=True), ref_yaw),
+        "up_from_quats": float(np.abs(up_from_quats(ref_q) - ref_up).max()),
+        "projected_gravity_from_quats": float(np.abs(projected_gravity_from_quats(ref_q) - ref_g).max()),
+        "quat_from_yaw": _same_quat(quat_from_yaw(ref_yaw), R.from_euler("z", ref_yaw[:, None]).as_quat()),
+    }
+    v = rng.normal(size=(n, 3))
+    errors["rotate_by_yaw"] = float(np.abs(rotate_by_yaw(v, ref_yaw) - R.from_euler("z", ref_yaw[:, None]).apply(v)).max())
+    # non-negative w convention
+    errors["quat_w>=0"] = float(max(0.0, -quat[:, 3].min()))
+
+    try:
+        import torch  # type: ignore
+
+        t_yaw, t_quat, t_up, t_grav = frame_features(torch.from_numpy(m))
+        errors["frame_features[torch]"] = max(
+            _ang(t_yaw.numpy(), ref_yaw), _same_quat(t_quat.numpy(), ref_q),
+            float(np.abs(t_up.numpy() - ref_up).max()), float(np.abs(t_grav.numpy() - ref_g).max()),
+        )
+    except ImportError:
+        LOGGER.info("torch not available; skipping tensor check")
+
+    failed = 0
+    for name, err in errors.items():
+        ok = err < 1e-6
+        failed += not ok
+        LOGGER.info("%-34s max_err=%.2e %s", name, err, "ok" if ok else "FAIL")
+    return 1 if failed else 0
+
+
+def _time(fn, iters: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        fn()
+    return (time.perf_counter() - t0) / iters
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.check:
+        return check(args.seed)
+
+    from scipy.spatial.transform import Rotation as R  # type: ignore
+
+    torch = None
+    if args.torch:
+        import torch  # type: ignore
+
+    LOGGER.info("%8s %14s %14s %14s %14s", "poses", "scipy[us]", "features[us]", "yaw_quat[us]", "torch[us]")
+    for n in args.poses:
+        rot = R.random(n, random_state=args.seed)
+        m = _gf_matrices(rot)
+        q = rot.as_quat()
+
+        def _scipy():
+            r = R.from_matrix(np.transpose(m[:, :3, :3], (0, 2, 1)))
+            return r.as_euler("ZYX")[:, 0], r.as_quat(), r.as_matrix()[:, :, 2]
+
+        t_scipy = _time(_scipy, args.iters)
+        t_feat = _time(lambda: frame_features(m), args.iters)
+        t_yaw = _time(lambda: yaw_from_quats(q), args.iters)
+        t_torch = float("nan")
+        if torch is not None:
+            mt = torch.from_numpy(m)
+            t_torch = _time(lambda: frame_features(mt), args.iters)
+        LOGGER.info("%8d %14.1f %14.1f %14.1f %14.1f", n, t_scipy * 1e6, t_feat * 1e6, t_yaw * 1e6, t_torch * 1e6)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
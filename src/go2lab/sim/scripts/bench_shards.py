@@ -0,0 +1,192 @@
+"""Benchmark + check: loose per-frame files vs the chunked shard format (go2lab.sim.util.shards).
+
+Synthesizes --episodes recordings of --frames frames in the frame_file_writer layout
+(rgb PNG, depth .npy, semantic PNG + labels .json per frame, plus a telemetry log), then
+packs them with pack_shards. Reported: file count and bytes, directory scan time (walk +
+stat of every file vs reading the shard index), pack throughput, and random single-blob
+reads (open/read per file vs ShardReader.get_bytes on the memory-mapped chunks).
+
+--check (exit 1 on failure) verifies byte-identical round trips, decoded arrays and
+telemetry, chunk rollover (small --chunk-kb), appending through AsyncFrameWriter +
+shard_frame_writer into a reopened shard, a channel stored with two codecs, and recovery
+from a torn index record and from records naming channels the manifest does not list.
+Runs with numpy (+ PIL for PNG), e.g. `python bench_shards.py --frames 500 --check`.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from go2lab.sim.scripts.pack_shards import episode_files, pack
+from go2lab.sim.util.async_writer import AsyncFrameWriter, frame_file_writer
+from go2lab.sim.util.channel_codecs import encode
+from go2lab.sim.util.shards import INDEX_DTYPE, ShardReader, ShardWriter, add_telemetry, shard_frame_writer
+from go2lab.sim.util.telemetry import TelemetryLog
+
+LOGGER = logging.getLogger("bench_shards")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--episodes", type=int, default=2)
+    p.add_argument("--frames", type=int, default=500)
+    p.add_argument("--width", type=int, default=160)
+    p.add_argument("--height", type=int, default=120)
+    p.add_argument("--chunk-kb", type=float, default=4096.0, help="Chunk size used for the benchmark shard")
+    p.add_argument("--reads", type=int, default=2000, help="Random single-blob reads")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--check", action="store_true")
+    return p.parse_args()
+
+
+# semantic annotator "info" as the recorder captures it (NumPy values included)
+LABELS = {"semantic_segmentation": {"idToLabels": {"0": {"class": "BACKGROUND"}, "1": {"class": "floor"}},
+                                    "count": np.uint32(2)}}
+
+
+def _frame(rng, args) -> dict:
+    rgb = rng.integers(0, 255, size=(args.height, args.width, 3), dtype=np.uint8)
+    depth = rng.random((args.height, args.width), dtype=np.float32) * 10
+    sem = np.repeat(rng.integers(0, 8, size=(args.height, 1), dtype=np.uint8), args.width, axis=1)
+    return {"rgb": rgb, "distance_to_image_plane": depth, "semantic_segmentation": np.dstack([sem] * 4)}
+
+
+def make_recording(out: Path, args, rng) -> None:
+    write = frame_file_writer(out)
+    with TelemetryLog(out, attrs={"fps": 20.0}) as log:
+        for i in range(args.frames):
+            write(i, {"arrays": _frame(rng, args), "labels": LABELS})
+            log.record(frame=i, sim_time=(i + 1) / 20.0, wall_time=i / 20.0, pos=(i, 0, 0.35))
+    write.close()
+
+
+def _walk(dirs) -> tuple[int, int]:
+    n = size = 0
+    for d in dirs:
+        for root, _, files in os.walk(d):
+            for f in files:
+                n += 1
+                size += os.stat(os.path.join(root, f)).st_size
+    return n, size
+
+
+def check(args, recs: list, reader: ShardReader) -> bool:
+    ok = True
+    # byte-identical blobs and decoded arrays
+    for ep, rec in enumerate(recs):
+        frames, extras = episode_files(rec)
+        for f, c, p in frames[::7]:
+            if bytes(reader.get_bytes(ep, f, c)) != p.read_bytes():
+                LOGGER.error("episode %d frame %d %s differs", ep, f, c)
+                ok = False
+        ok &= reader.get(ep, 3, "semantic_segmentation_labels")["count"] == 2
+        depth = reader.get(ep, 3, "distance_to_image_plane")
+        ok &= bool(np.array_equal(depth, np.load(rec / "distance_to_image_plane_0003.npy")))
+        if ep == 0:
+            depth0 = np.array(depth)
+        records, attrs = reader.telemetry(ep)
+        ok &= len(records) == args.frames and attrs.get("fps") == 20.0
+        ok &= float(records["pos"][-1, 0]) == args.frames - 1
+    ok &= reader.num_frames(0) == args.frames and not reader.has(0, args.frames, "rgb")
+    # chunk rollover
+    chunks = len(list(reader.root.glob("chunk_*.bin")))
+    ok &= chunks > 1 or args.frames * args.width * args.height * 8 < args.chunk_kb * 1024
+    # append live frames through the async writer into the reopened shard
+    rng = np.random.default_rng(1)
+    frames = [_frame(rng, args) for _ in range(16)]
+    with ShardWriter(reader.root) as shards:
+        ep = shards.new_episode(name="live")
+        writer = AsyncFrameWriter(shard_frame_writer(shards, ep), workers=3, maxsize=8, policy="block")
+        for i, fr in enumerate(frames):
+            writer.submit(i, {"arrays": fr, "labels": LABELS})
+        writer.close()
+        add_telemetry(shards, ep, recs[0])
+    live = ShardReader(reader.root)
+    for i, fr in enumerate(frames):
+        got = live.frame(ep, i)
+        ok &= all(np.array_equal(got[k], v) for k, v in fr.items())
+        ok &= got["semantic_segmentation_labels"]["idToLabels"]["1"] == {"class": "floor"}
+    ok &= len(live.telemetry(ep)[0]) == args.frames
+    # a channel recorded with another codec later on (REC_CODECS changed between runs)
+    with ShardWriter(reader.root) as shards:
+        ep_g2c = shards.new_episode(name="g2c")
+        shards.add(ep_g2c, 0, "distance_to_image_plane", encode(frames[0]["distance_to_image_plane"], "zlib"),
+                   codec="g2c")
+    mixed = ShardReader(reader.root)
+    name = "distance_to_image_plane"
+    ok &= mixed.codec(0, 3, name) == "npy" and mixed.codec(ep_g2c, 0, name) == "g2c"
+    ok &= bool(np.array_equal(mixed.get(ep_g2c, 0, name), frames[0][name]))
+    ok &= bool(np.array_equal(mixed.get(0, 3, name), depth0))
+    # torn index record (crash mid-append): readers ignore it, the writer truncates and continues
+    with (reader.root / "index.bin").open("ab") as f:
+        f.write(b"\1" * (INDEX_DTYPE.itemsize // 2))
+    ok &= len(ShardReader(reader.root)) == len(mixed)
+    with ShardWriter(reader.root) as shards:
+        shards.add(ep, 16, "rgb", frames[0]["rgb"])
+    ok &= bool(np.array_equal(ShardReader(reader.root).get(ep, 16, "rgb"), frames[0]["rgb"]))
+    # a record naming a channel shards.json does not list: readers skip it, the writer drops it
+    # instead of handing its id to the next new channel
+    n_before = len(ShardReader(reader.root))
+    orphan = np.zeros(1, dtype=INDEX_DTYPE)
+    orphan[["episode", "frame", "channel"]] = (ep, 17, len(ShardReader(reader.root).channels))
+    with (reader.root / "index.bin").open("ab") as f:
+        f.write(orphan.tobytes())
+    ok &= not ShardReader(reader.root).has(ep, 17, "rgb")
+    with ShardWriter(reader.root) as shards:
+        shards.add(ep, 17, "new_channel", {"x": 1})
+    after = ShardReader(reader.root)
+    ok &= len(after) == n_before + 1 and after.get(ep, 17, "new_channel") == {"x": 1}
+    LOGGER.info("check %s (%d chunks)", "ok" if ok else "FAILED", chunks)
+    return bool(ok)
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        recs = [tmp / f"rec_{e:03d}" for e in range(args.episodes)]
+        for rec in recs:
+            make_recording(rec, args, rng)
+        t0 = time.perf_counter()
+        n_files, n_bytes = _walk(recs)
+        scan_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        with ShardWriter(tmp / "shards", chunk_bytes=int(args.chunk_kb * 1024)) as shards:
+            for rec in recs:
+                pack(rec, shards, verify=False)
+        pack_s = time.perf_counter() - t0
+        shard_files, shard_bytes = _walk([tmp / "shards"])
+        t0 = time.perf_counter()
+        reader = ShardReader(tmp / "shards")
+        open_s = time.perf_counter() - t0
+        LOGGER.info("loose:  %7d files %8.1f MB, walk+stat %.1f ms", n_files, n_bytes / 1e6, scan_s * 1e3)
+        LOGGER.info("shards: %7d files %8.1f MB, open (index %d entries) %.1f ms, pack %.0f MB/s", shard_files,
+                    shard_bytes / 1e6, len(reader), open_s * 1e3, n_bytes / 1e6 / pack_s)
+
+        keys = [(int(e), int(f)) for e, f in zip(rng.integers(0, args.episodes, args.reads),
+                                                   rng.integers(0, args.frames, args.reads))]
+        t0 = time.perf_counter()
+        for e, f in keys:
+            (recs[e] / f"distance_to_image_plane_{f:04d}.npy").read_bytes()
+        file_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for e, f in keys:
+            bytes(reader.get_bytes(e, f, "distance_to_image_plane"))
+        shard_s = time.perf_counter() - t0
+        LOGGER.info("random reads: files %.1f us, shards %.1f us per blob (%.1fx)", file_s / args.reads * 1e6,
+                    shard_s / args.reads * 1e6, file_s / shard_s)
+        if args.check and not check(args, recs, reader):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
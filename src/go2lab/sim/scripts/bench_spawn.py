@@ -0,0 +1,107 @@
+"""Benchmark: spawn time and stage memory for N GO2 copies, instanced vs plain references.
+
+For each N, a fresh in-memory stage is populated with
+- plain: one `def Xform` + plain reference per robot (what N calls to spawn_go2 would author)
+- instanced: spawn_go2_batch (grid layout, instanceable references, one Sdf.ChangeBlock)
+and fully composed (prims traversed). Reported: wall time, composed prim count, prototype
+count and the process RSS growth while the stage is alive.
+
+By default the referenced asset is a synthetic layer with --asset-prims prims written to a
+temp dir, so the run needs no network; pass --usd to benchmark the real GO2 asset.
+Runs with plain pxr, e.g. `python.bat bench_spawn.py --robots 1 16 256 1024`.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from pxr import Usd, UsdGeom, Gf  # type: ignore
+
+from go2lab.sim.scripts.spawn_go2 import GO2_ENVS_ROOT, grid_origins, spawn_go2_batch
+
+LOGGER = logging.getLogger("bench_spawn")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--robots", type=int, nargs="+", default=[1, 16, 256, 1024])
+    p.add_argument("--usd", type=str, default=None, help="Asset to reference (default: synthetic layer)")
+    p.add_argument("--asset-prims", type=int, default=200, help="Prims in the synthetic asset")
+    p.add_argument("--spacing", type=float, default=2.0)
+    return p.parse_args()
+
+
+def _rss_bytes() -> int:
+    try:
+        import psutil  # type: ignore
+
+        return int(psutil.Process().memory_info().rss)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", "r", encoding="utf-8") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _write_synthetic_asset(path: Path, prims: int) -> str:
+    stage = Usd.Stage.CreateNew(str(path))
+    root = UsdGeom.Xform.Define(stage, "/go2")
+    stage.SetDefaultPrim(root.GetPrim())
+    for i in range(prims):
+        cube = UsdGeom.Cube.Define(stage, f"/go2/link_{i // 20}/geom_{i}")
+        cube.AddTranslateOp().Set(Gf.Vec3d(0.01 * i, 0.0, 0.0))
+        cube.AddScaleOp().Set(Gf.Vec3f(0.05, 0.05, 0.05))
+    stage.GetRootLayer().Save()
+    return str(path)
+
+
+def _spawn_plain(stage: Usd.Stage, n: int, spacing: float, usd: str) -> None:
+    for i, origin in enumerate(grid_origins(n, spacing).tolist()):
+        env = UsdGeom.Xform.Define(stage, f"{GO2_ENVS_ROOT}/env_{i}")
+        env.AddTranslateOp().Set(Gf.Vec3d(*origin))
+        prim = stage.DefinePrim(f"{GO2_ENVS_ROOT}/env_{i}/go2", "Xform")
+        prim.GetReferences().AddReference(usd)
+
+
+def _measure(n: int, spacing: float, usd: str, instanced: bool) -> tuple[float, int, int, float]:
+    gc.collect()
+    rss0 = _rss_bytes()
+    t0 = time.perf_counter()
+    stage = Usd.Stage.CreateInMemory()
+    if instanced:
+        spawn_go2_batch(stage, Path("."), n, spacing=spacing, usd=usd)
+    else:
+        _spawn_plain(stage, n, spacing, usd)
+    count = sum(1 for _ in Usd.PrimRange.Stage(stage, Usd.TraverseInstanceProxies()))
+    dt = time.perf_counter() - t0
+    mem = (_rss_bytes() - rss0) / 2**20
+    protos = len(stage.GetPrototypes())
+    del stage
+    return dt, count, protos, mem
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    with tempfile.TemporaryDirectory() as tmp:
+        usd = args.usd or _write_synthetic_asset(Path(tmp) / "go2_synthetic.usda", args.asset_prims)
+        # warm the layer registry so the first row does not pay for opening the asset
+        Usd.Stage.Open(usd)
+        LOGGER.info("%8s %10s %12s %10s %8s %10s", "robots", "mode", "spawn[ms]", "prims", "protos", "rss[MiB]")
+        for n in args.robots:
+            for instanced in (False, True):
+                dt, count, protos, mem = _measure(n, args.spacing, usd, instanced)
+                mode = "instanced" if instanced else "plain"
+                LOGGER.info("%8d %10s %12.1f %10d %8d %10.1f", n, mode, dt * 1e3, count, protos, mem)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
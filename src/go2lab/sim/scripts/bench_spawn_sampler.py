@@ -0,0 +1,123 @@
+"""Benchmark + check: vectorized spawn sampling (go2lab.core.spawn) vs a Python rejection loop.
+
+A seeded warehouse_gen variant is rasterized (occupancy_for_params, not cached); for each
+--robots count the bench times one SpawnSampler.sample(n) draw against the usual per-robot
+rejection loop (random point in the region, retried until the distance field allows it).
+
+--check verifies against the exact geometry: every sampled point is at least --clearance
+from every box footprint (blocking boxes, exact point-to-rectangle distance), inside the
+region, and with --separation > 0 pairwise at least that far apart.
+Runs with plain pxr + numpy, e.g. `python bench_spawn_sampler.py --check --robots 1 1024 16384`.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import math
+import time
+
+import numpy as np
+
+from go2lab.core.occupancy import GridSpec
+from go2lab.core.spawn import SpawnSampler
+from go2lab.sim.scripts.warehouse_gen import sample_variant
+from go2lab.sim.util.static_geometry import boxes_from_params, occupancy_for_params
+
+LOGGER = logging.getLogger("bench_spawn_sampler")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--robots", type=int, nargs="+", default=[1, 1024, 16384])
+    p.add_argument("--seed", type=int, default=0, help="warehouse_gen variant seed")
+    p.add_argument("--clearance", type=float, default=0.4)
+    p.add_argument("--separation", type=float, default=0.0, help="Minimum distance between sampled robots")
+    p.add_argument("--resolution", type=float, default=0.05)
+    p.add_argument("--check", action="store_true", help="Verify samples against the exact boxes (exit 1 on failure)")
+    return p.parse_args()
+
+
+def _rejection(grid, region, clearance: float, n: int, rng: np.random.Generator) -> np.ndarray:
+    xmin, ymin, xmax, ymax = region
+    out = np.empty((n, 2))
+    for i in range(n):
+        while True:
+            xy = (rng.uniform(xmin, xmax), rng.uniform(ymin, ymax))
+            if grid.is_free(xy, clearance):
+                out[i] = xy
+                break
+    return out
+
+
+def _box_distance(xy: np.ndarray, boxes: np.ndarray, chunk: int = 2048) -> np.ndarray:
+    # exact distance from each point to the nearest box footprint (0 inside)
+    out = np.empty(len(xy))
+    for s in range(0, len(xy), chunk):
+        p = xy[s:s + chunk, None, :]
+        dx = np.maximum(np.maximum(boxes[None, :, 0] - p[..., 0], p[..., 0] - boxes[None, :, 3]), 0.0)
+        dy = np.maximum(np.maximum(boxes[None, :, 1] - p[..., 1], p[..., 1] - boxes[None, :, 4]), 0.0)
+        out[s:s + chunk] = np.sqrt(dx * dx + dy * dy).min(axis=1)
+    return out
+
+
+def check(sampler: SpawnSampler, boxes: np.ndarray, spec: GridSpec, n: int) -> bool:
+    pos, yaw = sampler.sample(n)
+    blocking = boxes[(boxes[:, 2] < spec.max_z) & (boxes[:, 5] > spec.floor_z + spec.min_height)].astype(np.float64)
+    dist = _box_distance(pos[:, :2], blocking)
+    xmin, ymin, xmax, ymax = sampler.region
+    ok = True
+    if dist.min() < sampler.clearance:
+        LOGGER.error("check: %d of %d samples closer than %.2f m (min %.3f m)", int((dist < sampler.clearance).sum()),
+                     n, sampler.clearance, dist.min())
+        ok = False
+    inside = (pos[:, 0] >= xmin) & (pos[:, 0] <= xmax) & (pos[:, 1] >= ymin) & (pos[:, 1] <= ymax)
+    if not inside.all():
+        LOGGER.error("check: %d samples outside the region", int((~inside).sum()))
+        ok = False
+    if not ((yaw >= -math.pi) & (yaw < math.pi)).all():
+        LOGGER.error("check: yaw out of range")
+        ok = False
+    if sampler.separation > 0.0 and n > 1:
+        d = np.linalg.norm(pos[:, None, :2] - pos[None, :, :2], axis=-1)
+        d[np.diag_indices(n)] = np.inf
+        if d.min() < sampler.separation:
+            LOGGER.error("check: robots %.3f m apart (separation %.2f m)", d.min(), sampler.separation)
+            ok = False
+    if ok:
+        LOGGER.info("check ok: %d samples, min obstacle distance %.3f m (clearance %.2f m)", n, dist.min(),
+                    sampler.clearance)
+    return ok
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    params = sample_variant(args.seed)
+    spec = GridSpec(resolution=args.resolution)
+    t0 = time.perf_counter()
+    grid = occupancy_for_params(params, spec)
+    grid_s = time.perf_counter() - t0
+    sx, sy = params.floor_size
+    region = (-sx / 2 + params.margin, -sy / 2 + params.margin, sx / 2 - params.margin, sy / 2 - params.margin)
+    t0 = time.perf_counter()
+    sampler = SpawnSampler(grid, clearance=args.clearance, region=region, separation=args.separation, seed=args.seed)
+    init_s = time.perf_counter() - t0
+    LOGGER.info("floor %.0fx%.0f m, grid %dx%d built in %.1f ms, sampler init %.2f ms, %d candidate cells (%.1f m^2)",
+                sx, sy, grid.shape[1], grid.shape[0], grid_s * 1e3, init_s * 1e3, len(sampler), sampler.free_area)
+    if args.check and not check(sampler, boxes_from_params(params), spec, min(max(args.robots), 4096)):
+        return 1
+    rng = np.random.default_rng(args.seed)
+    LOGGER.info("%8s %14s %16s %10s", "robots", "sampler[ms]", "rejection[ms]", "speedup")
+    for n in args.robots:
+        t0 = time.perf_counter()
+        sampler.sample(n)
+        vec_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        _rejection(grid, region, args.clearance + grid.resolution, n, rng)
+        rej_s = time.perf_counter() - t0
+        LOGGER.info("%8d %14.3f %16.3f %9.1fx", n, vec_s * 1e3, rej_s * 1e3, rej_s / vec_s if vec_s > 0 else float("inf"))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,137 @@
+"""Benchmark: cold (compose from source layers) vs warm (flattened snapshot) stage open time.
+
+cold: Usd.Stage.Open(source, LoadAll) + full traversal -- what every startup pays today
+build: the one-time snapshot build (compose, optional GO2 spawn, flatten, export .usdc)
+warm: snapshot lookup (stat + index) + Usd.Stage.Open(snapshot) + full traversal
+
+By default the source is a synthetic multi-layer warehouse written to a temp dir: the
+warehouse_gen layout as a sublayer plus --racks racks referencing --rack-assets distinct
+ASCII asset layers, so the run needs no network; pass --spec to benchmark a real local stage.
+The win grows with the number of source layers (a flattened snapshot is one layer, while
+composition opens, parses and indexes every asset layer); with very few shared assets a
+large flattened layer can even open slower than the composed source.
+--check verifies that the snapshot composes to the same prims and world transforms as
+the source (exit code 1 on mismatch). Runs with plain pxr.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from pxr import Gf, Usd, UsdGeom  # type: ignore
+
+from go2lab.sim.scripts.warehouse_gen import build_warehouse
+from go2lab.sim.util.stage_snapshot import StageSnapshotCache
+
+LOGGER = logging.getLogger("bench_stage_snapshot")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--spec", type=str, default=None, help="Local stage to benchmark (default: synthetic warehouse)")
+    p.add_argument("--racks", type=int, default=400, help="Referenced rack assets in the synthetic warehouse")
+    p.add_argument("--rack-assets", type=int, default=200, help="Distinct rack asset layers")
+    p.add_argument("--rack-prims", type=int, default=40, help="Prims per synthetic rack asset")
+    p.add_argument("--reps", type=int, default=5)
+    p.add_argument("--check", action="store_true", help="Compare snapshot and source composition")
+    return p.parse_args()
+
+
+def _write_synthetic(root: Path, racks: int, kinds: int, rack_prims: int) -> str:
+    layout = Usd.Stage.CreateNew(str(root / "layout.usda"))
+    build_warehouse(layout)
+    layout.GetRootLayer().Save()
+    kinds = max(1, min(kinds, racks))
+    for k in range(kinds):
+        asset = Usd.Stage.CreateNew(str(root / f"rack_{k}.usda"))
+        top = UsdGeom.Xform.Define(asset, "/Rack")
+        asset.SetDefaultPrim(top.GetPrim())
+        for i in range(rack_prims):
+            shelf = UsdGeom.Cube.Define(asset, f"/Rack/level_{i // 8}/item_{i}")
+            shelf.AddTranslateOp().Set(Gf.Vec3d(0.1 * (i % 8), 0.0, 0.3 * (i // 8) + 0.01 * k))
+            shelf.AddScaleOp().Set(Gf.Vec3f(0.05, 0.4, 0.02))
+        asset.GetRootLayer().Save()
+    stage = Usd.Stage.CreateNew(str(root / "warehouse.usda"))
+    stage.GetRootLayer().subLayerPaths.append("./layout.usda")
+    side = max(1, int(racks ** 0.5))
+    for r in range(racks):
+        prim = UsdGeom.Xform.Define(stage, f"/World/Storage/Rack_{r}")
+        prim.AddTranslateOp().Set(Gf.Vec3d(1.5 * (r % side), 3.0 * (r // side), 0.0))
+        prim.GetPrim().GetReferences().AddReference(f"./rack_{r % kinds}.usda")
+    stage.SetDefaultPrim(stage.GetPrimAtPath("/World"))
+    stage.GetRootLayer().Save()
+    return str(root / "warehouse.usda")
+
+
+def _open_and_traverse(path: str) -> tuple[Usd.Stage, int]:
+    stage = Usd.Stage.Open(path, Usd.Stage.LoadAll)
+    return stage, sum(1 for _ in stage.Traverse())
+
+
+def _time(fn, reps: int) -> tuple[float, int]:
+    times, count = [], 0
+    for _ in range(reps):
+        gc.collect()  # release the previous stage so its layers leave the registry
+        t0 = time.perf_counter()
+        stage, count = fn()
+        times.append(time.perf_counter() - t0)
+        del stage
+    return statistics.median(times), count
+
+
+def _world_xforms(stage: Usd.Stage) -> dict[str, Gf.Matrix4d]:
+    cache = UsdGeom.XformCache()
+    return {p.GetPath().pathString: cache.GetLocalToWorldTransform(p)
+            for p in stage.Traverse() if p.IsA(UsdGeom.Xformable)}
+
+
+def _check(source: str, snapshot: str) -> bool:
+    a = _world_xforms(Usd.Stage.Open(source, Usd.Stage.LoadAll))
+    b = _world_xforms(Usd.Stage.Open(snapshot, Usd.Stage.LoadAll))
+    if a.keys() != b.keys():
+        LOGGER.error("prim sets differ: %d source vs %d snapshot (%d only in source)", len(a), len(b), len(a.keys() - b.keys()))
+        return False
+    bad = [p for p in a if not Gf.IsClose(a[p], b[p], 1e-9)]
+    if bad:
+        LOGGER.error("%d world transforms differ, e.g. %s", len(bad), bad[0])
+        return False
+    LOGGER.info("check ok: %d xformable prims match", len(a))
+    return True
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    with tempfile.TemporaryDirectory() as tmp:
+        source = args.spec or _write_synthetic(Path(tmp), args.racks, args.rack_assets, args.rack_prims)
+        cache = StageSnapshotCache(root=Path(tmp) / "stage_cache", max_bytes=0, max_age_s=0)
+        gc.collect()
+
+        cold, n_cold = _time(lambda: _open_and_traverse(source), args.reps)
+        t0 = time.perf_counter()
+        snapshot = cache.build(source)
+        build = time.perf_counter() - t0
+        gc.collect()
+        warm, n_warm = _time(lambda: _open_and_traverse(cache.get(source)[0]), args.reps)
+        lookup, _ = _time(lambda: (None, cache.lookup(source)), args.reps)
+
+        LOGGER.info("source:   %s", source)
+        LOGGER.info("snapshot: %s (%.1f MiB)", snapshot, Path(snapshot).stat().st_size / 2**20)
+        LOGGER.info("%10s %12s %10s", "phase", "time[ms]", "prims")
+        LOGGER.info("%10s %12.1f %10d", "cold", cold * 1e3, n_cold)
+        LOGGER.info("%10s %12.1f %10s", "build", build * 1e3, "-")
+        LOGGER.info("%10s %12.1f %10d", "warm", warm * 1e3, n_warm)
+        LOGGER.info("%10s %12.2f %10s", "lookup", lookup * 1e3, "-")
+        LOGGER.info("speedup: %.1fx", cold / warm if warm > 0 else float("inf"))
+        if args.check and not _check(source, snapshot):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
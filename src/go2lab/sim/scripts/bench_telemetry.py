@@ -0,0 +1,123 @@
+"""Benchmark: columnar telemetry (go2lab.sim.util.telemetry) vs a per-frame JSONL meta file.
+
+--frames synthetic recorder frames (pose random walk, commands, key bits, render latency,
+a few injected stalls) are written both ways; then a typical analysis (mean speed from the
+poses, per-key duty cycle, frame-drop detection from the timestamps) is timed on each:
+one np.memmap + vectorized NumPy vs json.loads per line.
+
+--check verifies that the columnar log round-trips exactly and that frame_drops() finds
+the injected stalls.
+Runs with numpy only, e.g. `python bench_telemetry.py --frames 1000000 --check`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from go2lab.sim.util.telemetry import TelemetryLog, frame_drops, load_telemetry
+
+LOGGER = logging.getLogger("bench_telemetry")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--frames", type=int, default=200_000)
+    p.add_argument("--fps", type=float, default=20.0)
+    p.add_argument("--stalls", type=int, default=10, help="Injected stalls of 3 periods each")
+    p.add_argument("--check", action="store_true")
+    return p.parse_args()
+
+
+def _synthetic(n: int, fps: float, stalls: int, rng: np.random.Generator) -> dict:
+    period = 1.0 / fps
+    gaps = np.full(n, period)
+    stall_at = np.sort(rng.choice(np.arange(1, n), size=min(stalls, n - 1), replace=False))
+    gaps[stall_at] += 3 * period
+    wall = 1.7e9 + np.cumsum(gaps)
+    cmd = rng.uniform(-1, 1, size=(n, 3)).astype(np.float32)
+    pos = np.cumsum(cmd * period, axis=0).astype(np.float32)
+    pos[:, 2] = 0.45
+    return {"frame": np.arange(n), "sim_time": (np.arange(n) + 1) * period, "wall_time": wall, "pos": pos,
+            "yaw": rng.uniform(-np.pi, np.pi, n).astype(np.float32), "cmd": cmd,
+            "keys": rng.integers(0, 256, n).astype(np.uint16), "render_ms": rng.gamma(4.0, 5.0, n).astype(np.float32),
+            "captured": np.ones(n, dtype=np.uint8), "stall_at": stall_at}
+
+
+def _analyze_columnar(path: Path, fps: float) -> dict:
+    rec, _ = load_telemetry(path)
+    step = np.linalg.norm(np.diff(rec["pos"][:, :2], axis=0), axis=1)
+    duty = [float(((rec["keys"] >> b) & 1).mean()) for b in range(8)]
+    return {"speed": float(step.sum() / (rec["sim_time"][-1] - rec["sim_time"][0])), "duty": duty,
+            "drops": frame_drops(rec, fps)}
+
+
+def _analyze_jsonl(path: Path, fps: float) -> dict:
+    pos, keys, wall, sim = [], [], [], []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            m = json.loads(line)
+            pos.append(m["pos"][:2])
+            keys.append(m["keys"])
+            wall.append(m["wall_time"])
+            sim.append(m["sim_time"])
+    pos, keys, wall = np.asarray(pos), np.asarray(keys), np.asarray(wall)
+    step = np.linalg.norm(np.diff(pos, axis=0), axis=1)
+    late = np.diff(wall) > 1.5 / fps
+    return {"speed": float(step.sum() / (sim[-1] - sim[0])), "duty": [float(((keys >> b) & 1).mean()) for b in range(8)],
+            "late": int(late.sum())}
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    data = _synthetic(args.frames, args.fps, args.stalls, np.random.default_rng(0))
+    names = ("frame", "sim_time", "wall_time", "pos", "yaw", "cmd", "keys", "render_ms", "captured")
+    rows = [{k: data[k][i] for k in names} for i in range(args.frames)]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        t0 = time.perf_counter()
+        with TelemetryLog(tmp / "col", attrs={"fps": args.fps}) as log:
+            for r in rows:
+                log.record(**r)
+        col_w = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        with (tmp / "meta.jsonl").open("w", encoding="utf-8") as f:
+            for r in rows:
+                f.write(json.dumps({k: (v.tolist() if hasattr(v, "tolist") else v) for k, v in r.items()}) + "\n")
+        js_w = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        col = _analyze_columnar(tmp / "col", args.fps)
+        col_a = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        js = _analyze_jsonl(tmp / "meta.jsonl", args.fps)
+        js_a = time.perf_counter() - t0
+        col_mb = (tmp / "col" / "telemetry.bin").stat().st_size / 2 ** 20
+        js_mb = (tmp / "meta.jsonl").stat().st_size / 2 ** 20
+        LOGGER.info("%d frames", args.frames)
+        LOGGER.info("%10s %10s %12s %12s", "format", "size[MB]", "write[us/fr]", "analysis[s]")
+        LOGGER.info("%10s %10.1f %12.2f %12.3f", "columnar", col_mb, col_w / args.frames * 1e6, col_a)
+        LOGGER.info("%10s %10.1f %12.2f %12.3f", "jsonl", js_mb, js_w / args.frames * 1e6, js_a)
+        LOGGER.info("analysis speedup: %.0fx", js_a / col_a if col_a > 0 else float("inf"))
+        if args.check:
+            rec, attrs = load_telemetry(tmp / "col")
+            ok = len(rec) == args.frames and attrs.get("fps") == args.fps
+            ok &= all(np.array_equal(np.asarray(rec[k]), data[k].astype(rec.dtype[k].base)) for k in names)
+            drops = col["drops"]
+            ok &= drops["late_frames"] == len(data["stall_at"]) and drops["missed_frames"] == 3 * len(data["stall_at"])
+            ok &= np.array_equal(drops["late_at"], data["stall_at"]) and js["late"] == drops["late_frames"]
+            ok &= np.isclose(col["speed"], js["speed"], rtol=1e-4)
+            LOGGER.info("check %s: %d late frames, %d missed", "ok" if ok else "FAILED", drops["late_frames"],
+                        drops["missed_frames"])
+            if not ok:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
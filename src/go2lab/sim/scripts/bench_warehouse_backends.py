@@ -0,0 +1,91 @@
+"""Benchmark + regression check: warehouse_gen's UsdGeom backend vs the Sdf bulk backend.
+
+--check builds a range of layouts (default and varied floor size / aisle width / rack
+spacing / wall height) through both backends and diffs the exported layers text-for-text;
+any difference is printed as a unified diff and the exit code is 1.
+
+The benchmark generates --variants layouts per backend and exports each to .usdc:
+- usd: Usd.Stage.CreateInMemory + build_warehouse (UsdGeom *.Define / AddXformOp per object)
+- sdf: export_warehouse (prim and attribute specs authored in one Sdf.ChangeBlock)
+Runs with plain pxr, e.g. `python bench_warehouse_backends.py --check --variants 1000`.
+"""
+from __future__ import annotations
+
+import argparse
+import difflib
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from pxr import Usd  # type: ignore
+
+from go2lab.sim.scripts.warehouse_gen import build_warehouse, export_warehouse
+
+LOGGER = logging.getLogger("bench_warehouse_backends")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--variants", type=int, default=200, help="Layouts generated per backend")
+    p.add_argument("--check", action="store_true", help="Diff both backends (exit 1 on mismatch)")
+    return p.parse_args()
+
+
+def _variant(i: int) -> dict:
+    return {
+        "floor_size": (16.0 + (i % 8) * 2.0, 16.0 + (i // 8 % 8) * 2.0),
+        "aisle_width": 1.5 + 0.25 * (i % 3),
+        "rack_spacing": 3.0 + 0.1 * (i % 11),
+        "wall_height": 3.0 + 0.5 * (i % 2),
+    }
+
+
+def _usd_text(**layout) -> str:
+    stage = Usd.Stage.CreateInMemory()
+    build_warehouse(stage, **layout)
+    return stage.GetRootLayer().ExportToString()
+
+
+def _sdf_text(**layout) -> str:
+    stage = Usd.Stage.CreateInMemory()
+    build_warehouse(stage, backend="sdf", **layout)
+    return stage.GetRootLayer().ExportToString()
+
+
+def check(n: int = 16) -> bool:
+    cases = [{}] + [_variant(i) for i in range(n)]
+    for layout in cases:
+        a, b = _usd_text(**layout), _sdf_text(**layout)
+        if a != b:
+            diff = difflib.unified_diff(a.splitlines(True), b.splitlines(True), "usd", "sdf")
+            LOGGER.error("backends differ for %s:\n%s", layout or "defaults", "".join(list(diff)[:80]))
+            return False
+    LOGGER.info("check ok: %d layouts identical across backends", len(cases))
+    return True
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.check and not check():
+        return 1
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+        t0 = time.perf_counter()
+        for i in range(args.variants):
+            build_warehouse(Usd.Stage.CreateInMemory(), out / f"usd_{i}.usdc", **_variant(i))
+        usd_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for i in range(args.variants):
+            export_warehouse(out / f"sdf_{i}.usdc", **_variant(i))
+        sdf_s = time.perf_counter() - t0
+    LOGGER.info("%8s %12s %14s", "backend", "total[s]", "per-variant[ms]")
+    LOGGER.info("%8s %12.2f %14.2f", "usd", usd_s, usd_s / max(1, args.variants) * 1e3)
+    LOGGER.info("%8s %12.2f %14.2f", "sdf", sdf_s, sdf_s / max(1, args.variants) * 1e3)
+    LOGGER.info("speedup: %.1fx", usd_s / sdf_s if sdf_s > 0 else float("inf"))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+"""Benchmark: parametric warehouse generation, PointInstancer vs one prim per prop.
+
+For each target prop count the floor is grown (one aisle per --row-pitch meters) until the
+seeded layout holds at least that many props; both modes then author the same layout:
+- prims: one UsdGeom.Cube per rack/shelf/box with translate + scale ops
+- instanced: one UsdGeom.PointInstancer with Rack/Shelf/Box prototypes
+Reported: authoring time (in-memory stage), exported .usdc size and stage-open time
+(Usd.Stage.Open + traversal). Runs with plain pxr, e.g. `python bench_warehouse_gen.py --props 1000 10000`.
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import gc
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from pxr import Usd  # type: ignore
+
+from go2lab.sim.scripts.warehouse_gen import GENERATOR_MODES, WarehouseParams, build_warehouse_from_params, warehouse_layout
+
+LOGGER = logging.getLogger("bench_warehouse_gen")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--props", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    p.add_argument("--modes", nargs="+", choices=GENERATOR_MODES, default=list(GENERATOR_MODES))
+    p.add_argument("--row-pitch", type=float, default=4.0, help="Meters of floor width per aisle")
+    p.add_argument("--rack-density", type=float, default=0.8)
+    p.add_argument("--box-fill", type=float, default=0.5)
+    p.add_argument("--seed", type=int, default=0)
+    return p.parse_args()
+
+
+def params_for_props(target: int, base: WarehouseParams, row_pitch: float = 4.0) -> WarehouseParams:
+    """Smallest square floor (in 2 m steps) whose layout holds at least target props."""
+    side = 2 * base.margin + base.rack_length
+    while True:
+        aisles = max(1, round((side - 2 * base.margin) / row_pitch))
+        params = dataclasses.replace(base, floor_size=(side, side), aisle_count=aisles)
+        if len(warehouse_layout(params)["positions"]) >= target:
+            return params
+        side += 2.0
+
+
+def _measure(params: WarehouseParams, mode: str, out: Path) -> tuple[int, float, int, float, int]:
+    gc.collect()
+    t0 = time.perf_counter()
+    stage = Usd.Stage.CreateInMemory()
+    props = build_warehouse_from_params(stage, params, mode=mode)
+    author = time.perf_counter() - t0
+    stage.GetRootLayer().Export(str(out))
+    del stage
+    gc.collect()
+    t0 = time.perf_counter()
+    stage = Usd.Stage.Open(str(out))
+    prims = sum(1 for _ in stage.Traverse())
+    open_s = time.perf_counter() - t0
+    del stage
+    return props, author, out.stat().st_size, open_s, prims
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    base = WarehouseParams(rack_density=args.rack_density, box_fill=args.box_fill, seed=args.seed)
+    LOGGER.info("%8s %10s %8s %10s %12s %10s %10s %8s", "target", "mode", "props", "floor[m]", "author[ms]",
+                "file[KiB]", "open[ms]", "prims")
+    with tempfile.TemporaryDirectory() as tmp:
+        for target in args.props:
+            params = params_for_props(target, base, args.row_pitch)
+            for mode in args.modes:
+                out = Path(tmp) / f"warehouse_{target}_{mode}.usdc"
+                props, author, size, open_s, prims = _measure(params, mode, out)
+                LOGGER.info("%8d %10s %8d %10.0f %12.1f %10.1f %10.1f %8d", target, mode, props, params.floor_size[0],
+                            author * 1e3, size / 1024, open_s * 1e3, prims)
+                out.unlink()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
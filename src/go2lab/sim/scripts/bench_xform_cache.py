@@ -0,0 +1,91 @@
+"""Micro-benchmark: cached transform reads vs the per-call GetOrderedXformOps path.
+
+Builds an in-memory stage with N robots nested under a few parent Xforms plus static
+clutter, then times one observation pass over all robots for:
+- per_call: UsdGeom.Xformable(prim).GetOrderedXformOps()[0].GetOpTransform (previous path)
+- cache_local / cache_world: XformCache.local_matrices / world_matrices
+A robot xform is edited between passes so invalidation cost is included.
+
+Runs with plain pxr (no SimulationApp), e.g. `python.bat bench_xform_cache.py --robots 1 64 1024`.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+
+import numpy as np
+from pxr import Usd, UsdGeom, Sdf, Gf  # type: ignore
+
+from go2lab.sim.util.xform_cache import XformCache
+
+LOGGER = logging.getLogger("bench_xform_cache")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--robots", type=int, nargs="+", default=[1, 16, 256, 1024])
+    p.add_argument("--clutter", type=int, nargs="+", default=[0, 10000], help="Static prims added to the stage")
+    p.add_argument("--depth", type=int, default=3, help="Parent Xform nesting above each robot")
+    p.add_argument("--iters", type=int, default=50)
+    return p.parse_args()
+
+
+def _build_stage(robots: int, clutter: int, depth: int) -> tuple[Usd.Stage, list[Sdf.Path]]:
+    stage = Usd.Stage.CreateInMemory()
+    root = "/World"
+    for d in range(depth):
+        root = f"{root}/L{d}"
+        UsdGeom.Xform.Define(stage, root).AddTranslateOp().Set(Gf.Vec3d(0.1 * (d + 1), 0.0, 0.0))
+    paths = []
+    for i in range(robots):
+        xf = UsdGeom.Xform.Define(stage, f"{root}/env_{i}/go2")
+        xf.AddTranslateOp().Set(Gf.Vec3d(float(i), 0.0, 0.4))
+        xf.AddRotateZOp().Set(float(i % 360))
+        paths.append(xf.GetPath())
+    for i in range(clutter):
+        UsdGeom.Cube.Define(stage, f"/World/Clutter/G{i // 1000}/Box_{i}").AddTranslateOp().Set(Gf.Vec3d(i, i, 0))
+    return stage, paths
+
+
+def _time_per_call(stage: Usd.Stage, paths: list[Sdf.Path], iters: int) -> float:
+    prims = [stage.GetPrimAtPath(p) for p in paths]
+    out = np.empty((len(prims), 4, 4))
+    t0 = time.perf_counter()
+    for k in range(iters):
+        UsdGeom.Xformable(prims[0]).GetOrderedXformOps()[0].Set(Gf.Vec3d(k, 0.0, 0.4))
+        for i, prim in enumerate(prims):
+            ops = UsdGeom.Xformable(prim).GetOrderedXformOps()
+            out[i] = ops[0].GetOpTransform(0.0) if ops else Gf.Matrix4d(1.0)
+    return (time.perf_counter() - t0) / iters
+
+
+def _time_cache(stage: Usd.Stage, paths: list[Sdf.Path], iters: int, world: bool) -> float:
+    cache = XformCache(stage)
+    out = np.empty((len(paths), 4, 4))
+    read = cache.world_matrices if world else cache.local_matrices
+    read(paths, out=out)  # warm handles
+    op = UsdGeom.Xformable(stage.GetPrimAtPath(paths[0])).GetOrderedXformOps()[0]
+    t0 = time.perf_counter()
+    for k in range(iters):
+        op.Set(Gf.Vec3d(k, 0.0, 0.4))
+        read(paths, out=out)
+    return (time.perf_counter() - t0) / iters
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    LOGGER.info("%8s %8s %14s %14s %14s", "robots", "clutter", "per_call[us]", "cache_loc[us]", "cache_wld[us]")
+    for clutter in args.clutter:
+        for n in args.robots:
+            stage, paths = _build_stage(n, clutter, args.depth)
+            per_call = _time_per_call(stage, paths, args.iters)
+            local = _time_cache(stage, paths, args.iters, world=False)
+            world = _time_cache(stage, paths, args.iters, world=True)
+            LOGGER.info("%8d %8d %14.1f %14.1f %14.1f", n, clutter, per_call * 1e6, local * 1e6, world * 1e6)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
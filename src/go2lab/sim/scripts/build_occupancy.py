@@ -0,0 +1,76 @@
+"""Precompute occupancy grids / distance fields for registry environments or USD files.
+
+Each environment is resolved like the runners do (registry name, path or URL through the
+asset cache), composed with plain pxr and rasterized by
+go2lab.sim.util.static_geometry.occupancy_for_stage; the grid is cached next to the USD
+(<usd>.occupancy/<key>/*.npy) and later loaded memory-mapped. warehouse_gen variants are
+rasterized from their params.json without traversing the stage.
+
+omniverse:// specs need Kit's client library: pass --kit to start a headless SimulationApp.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from pathlib import Path
+
+LOGGER = logging.getLogger("build_occupancy")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--kit", action="store_true", help="Start a headless SimulationApp (needed for omniverse:// specs)")
+    p.add_argument("--resolution", type=float, default=0.05, help="Meters per cell")
+    p.add_argument("--max-z", type=float, default=1.0, help="Boxes starting at or above this height do not block")
+    p.add_argument("envs", nargs="*", help="Registry names, paths or URLs (default: every registry entry)")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    app = None
+    if args.kit:
+        try:
+            from isaacsim import SimulationApp  # type: ignore
+        except Exception:
+            from isaacsim.simulation_app import SimulationApp  # type: ignore
+        app = SimulationApp({"headless": True})
+    try:
+        from pxr import Usd  # type: ignore
+
+        from go2lab.core.occupancy import GridSpec
+        from go2lab.env_registry import default_registry
+        from go2lab.sim.util.static_geometry import occupancy_for_stage
+
+        repo_root = Path(__file__).resolve().parents[4]
+        reg = default_registry()
+        spec = GridSpec(resolution=args.resolution, max_z=args.max_z)
+        failed = 0
+        for name in args.envs or reg.names():
+            kind, target, ok = reg.resolve(name, repo_root)
+            if kind != "path" or not ok:
+                failed += 1
+                LOGGER.error("%-28s unresolved  %s", name, target)
+                continue
+            t0 = time.perf_counter()
+            try:
+                stage = Usd.Stage.Open(target, Usd.Stage.LoadAll)
+                grid = occupancy_for_stage(stage, spec)
+            except Exception as exc:
+                failed += 1
+                LOGGER.error("%-28s FAILED      %s (%s)", name, target, exc)
+                continue
+            h, w = grid.shape
+            LOGGER.info("%-28s %5dx%-5d free %5.1f%%  max clearance %.2f m  [%.2fs] %s", name, w, h,
+                        100.0 * float((grid.occupied == 0).mean()), float(grid.distance.max()),
+                        time.perf_counter() - t0, grid.key[:16])
+        return 1 if failed else 0
+    finally:
+        if app is not None:
+            app.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,12 +1,41 @@
-"""Dataset recording using isaacsim.replicator.writers (no legacy omni.replicator.isaac)."""
+"""Dataset recording using isaacsim.replicator.writers (no legacy omni.replicator.isaac).
+
+REC_WRITER=async (default) reads the render product's annotators each frame and hands the
+arrays (and the segmentation id -> label maps, as <name>_labels_XXXX.json like BasicWriter)
+to go2lab.sim.util.async_writer.AsyncFrameWriter, so PNG/NPY writes happen on writer
+threads and slow disks do not stall app.update():
+- REC_WRITER_WORKERS: writer threads (default 2)
+- REC_QUEUE: max queued frames (default 32)
+- REC_BACKPRESSURE: block | drop_oldest (default) | downsample
+Queue depth and write latency are logged every REC_STATS_SEC seconds and at the end.
+REC_WRITER=basic keeps the synchronous BasicWriter path.
+
+REC_OUTPUT=shards (async writer only) appends the frames as one episode of a
+go2lab.sim.util.shards directory (REC_SHARD_DIR, default output/shards) instead of loose
+per-frame files; the telemetry log is packed into the episode at the end. Existing
+output/<timestamp>/ directories convert with sim/scripts/pack_shards.py.
+
+REC_CODECS (async writer only) picks compact go2lab.sim.util.channel_codecs encodings per
+REC_CHANNELS entry, e.g. "depth=depth16,semantic=rle,instance=rle" (16-bit quantized depth,
+lossless run-length masks; default: none, i.e. BasicWriter's formats). Encoding runs on
+REC_ENCODE_PROCS worker processes (default 2, started before the SimulationApp; 0 encodes
+on the writer threads).
+
+Per-frame telemetry (sim/wall time, base pose, command, key state, render latency, whether
+the frame was captured) goes to a columnar go2lab.sim.util.telemetry log
+(telemetry.bin + telemetry.json) instead of meta.jsonl; load it with
+load_telemetry(out_dir) and check frame_drops(records, REC_FPS).
+"""
 from __future__ import annotations
 
 import os
-import json
+import time
 from datetime import datetime
 from pathlib import Path
 import logging
 
+import numpy as np
+
 try:
     from isaacsim import SimulationApp  # type: ignore
 except Exception:
@@ -18,7 +47,11 @@ from isaacsim.replicator import core as rep_core
 
 from go2lab.sim.scripts.spawn_go2 import spawn_go2, SimpleBaseController
 from go2lab.sim.util.usd_path import resolve_usd_spec, isaaclab_asset_path
+from go2lab.sim.util.async_writer import AsyncFrameWriter, frame_file_writer
+from go2lab.sim.util.channel_codecs import ProcessEncoder, parse_codecs
 from go2lab.sim.util.kit import get_stage_and_backends
+from go2lab.sim.util.shards import ShardWriter, add_telemetry, shard_frame_writer
+from go2lab.sim.util.telemetry import TelemetryLog, frame_drops, load_telemetry
 import carb
 
 LOGGER = logging.getLogger("recorder")
@@ -30,6 +63,23 @@ HEIGHT = int(os.environ.get("REC_HEIGHT", "480"))
 ATTACH_TO_GO2 = os.environ.get("REC_ATTACH_TO_GO2", "1") == "1"
 CHANNELS = os.environ.get("REC_CHANNELS", "rgb,depth,semantic,instance").split(",")
 DURATION_SEC = float(os.environ.get("REC_DURATION_SEC", "30"))
+WRITER = os.environ.get("REC_WRITER", "async").strip().lower()
+WRITER_WORKERS = int(os.environ.get("REC_WRITER_WORKERS", "2"))
+QUEUE_SIZE = int(os.environ.get("REC_QUEUE", "32"))
+BACKPRESSURE = os.environ.get("REC_BACKPRESSURE", "drop_oldest").strip().lower()
+STATS_SEC = float(os.environ.get("REC_STATS_SEC", "5"))
+OUTPUT = os.environ.get("REC_OUTPUT", "files").strip().lower()
+SHARD_DIR = Path(os.environ.get("REC_SHARD_DIR", "") or OUT_ROOT / "shards")
+CODECS = os.environ.get("REC_CODECS", "")
+ENCODE_PROCS = int(os.environ.get("REC_ENCODE_PROCS", "2"))
+
+# REC_CHANNELS entry -> replicator annotator (BasicWriter's names for the files)
+ANNOTATORS = {
+    "rgb": "rgb",
+    "depth": "distance_to_image_plane",
+    "semantic": "semantic_segmentation",
+    "instance": "instance_segmentation",
+}
 
 KEY_MAP = {
     "forward": carb.input.KeyboardInput.W,
@@ -57,12 +107,58 @@ def setup_camera(stage: Usd.Stage, target_prim: Usd.Prim | None) -> Usd.Prim:
     return cam.GetPrim()
 
 
+def attach_annotators(rp) -> dict:
+    """Annotators for REC_CHANNELS on the render product, keyed by annotator name."""
+    anns = {}
+    for ch in CHANNELS:
+        name = ANNOTATORS.get(ch.strip())
+        if name is None:
+            continue
+        ann = rep_core.AnnotatorRegistry.get_annotator(name)
+        ann.attach([rp])
+        anns[name] = ann
+    return anns
+
+
+def capture(anns: dict) -> dict:
+    """Copy the current annotator outputs (the buffers are reused by the next render) into a
+    frame {"arrays": {name: ndarray}, "labels": {name: info}}."""
+    arrays, labels = {}, {}
+    for name, ann in anns.items():
+        data = ann.get_data()
+        if isinstance(data, dict):
+            # segmentation annotators return {"data": ids, "info": {"idToLabels": ..., ...}}
+            if data.get("info"):
+                labels[name] = data["info"]
+            data = data.get("data")
+        if data is not None:
+            arrays[name] = np.array(data, copy=True)
+    return {"arrays": arrays, "labels": labels}
+
+
+def _log_stats(writer: AsyncFrameWriter, loop_ms) -> None:
+    st = writer.stats()
+    loop = np.asarray(loop_ms, dtype=np.float64)
+    LOGGER.info("writer queue %d (max %d/%d), latency mean %.1f / p95 %.1f / max %.1f ms, written %d, dropped %d, "
+                "skipped %d (stride %d); loop %.1f fps, p95 %.1f ms", st["depth"], st["max_depth"], writer.maxsize,
+                st["latency_ms_mean"], st["latency_ms_p95"], st["latency_ms_max"], st["written"], st["dropped"],
+                st["skipped"], st["stride"], 1e3 / loop.mean() if loop.size else 0.0,
+                float(np.percentile(loop, 95)) if loop.size else 0.0)
+
+
 def main() -> int:
     logging.basicConfig(level=logging.INFO)
     timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
     out_dir = OUT_ROOT / timestamp
     out_dir.mkdir(parents=True, exist_ok=True)
 
+    encoder = None
+    if WRITER != "basic" and CODECS.strip():
+        # fork the encoder processes before Kit starts its threads
+        encoder = ProcessEncoder(parse_codecs(CODECS, aliases=ANNOTATORS), processes=ENCODE_PROCS)
+        encoder.start()
+        LOGGER.info("Channel codecs: %s (%d processes)", encoder.codecs, ENCODE_PROCS)
+
     renderer = os.environ.get("ISAAC_RENDERER", "RayTracedLighting")
     app = SimulationApp({"headless": False, "renderer": renderer})
     try:
@@ -92,24 +188,59 @@ def main() -> int:
             pass
 
         rp = rep_core.create_render_product(str(cam_prim.GetPath()), resolution=(WIDTH, HEIGHT))
-        writer = rep_writers.get("BasicWriter")
         out_dir_str = str(out_dir.resolve())
-        writer.initialize(output_dir=out_dir_str, rgb="rgb" in CHANNELS, depth="depth" in CHANNELS,
-                          semantic_segmentation="semantic" in CHANNELS, instance_segmentation="instance" in CHANNELS)
-        writer.attach([rp])
+        async_writer = None
+        shards = None
+        episode = -1
+        anns: dict = {}
+        if WRITER == "basic":
+            writer = rep_writers.get("BasicWriter")
+            writer.initialize(output_dir=out_dir_str, rgb="rgb" in CHANNELS, depth="depth" in CHANNELS,
+                              semantic_segmentation="semantic" in CHANNELS, instance_segmentation="instance" in CHANNELS)
+            writer.attach([rp])
+        else:
+            anns = attach_annotators(rp)
+            if OUTPUT == "shards":
+                shards = ShardWriter(SHARD_DIR)
+                episode = shards.new_episode(name=timestamp, fps=FPS, channels=sorted(anns))
+                write_fn = shard_frame_writer(shards, episode, encode=encoder.encode if encoder else None)
+                LOGGER.info("Recording episode %d into shards %s", episode, SHARD_DIR)
+            else:
+                write_fn = frame_file_writer(out_dir, encode=encoder.encode if encoder else None)
+            async_writer = AsyncFrameWriter(write_fn, workers=WRITER_WORKERS, maxsize=QUEUE_SIZE,
+                                            policy=BACKPRESSURE)
+            LOGGER.info("Async writer: %s, %d workers, queue %d, policy %s", sorted(anns), WRITER_WORKERS, QUEUE_SIZE,
+                        BACKPRESSURE)
 
         inp = carb.input.acquire_input_interface()
         kb = None  # Isaac Sim 5.0: use deviceId 0 and KeyboardInput enums directly
 
-        meta_path = out_dir / "meta.jsonl"
-        with meta_path.open("w", encoding="utf-8") as meta_file:
+        # constant run info goes into the telemetry schema once instead of every frame
+        telemetry = TelemetryLog(out_dir, attrs={
+            "fps": FPS,
+            "camera": cam_prim.GetPath().pathString,
+            "go2": go2_prim.GetPath().pathString,
+            "channels": CHANNELS,
+            "writer": WRITER,
+            "codecs": CODECS,
+            "keys": list(KEY_MAP),
+            "resolution": [WIDTH, HEIGHT],
+        })
+        key_codes = list(KEY_MAP.values())
+        loop_ms: list[float] = []
+        try:
             frames = int(DURATION_SEC * FPS)
+            t_stats = t_prev = time.perf_counter()
             for i in range(frames):
                 def _down(code):
                     try:
                         return inp.is_key_down(0, code)  # deviceId 0 = system keyboard
                     except Exception:
                         return False
+                keys = 0
+                for bit, code in enumerate(key_codes):
+                    if _down(code):
+                        keys |= 1 << bit
                 boost = _down(KEY_MAP["boost"]) if inp else False
                 spd = 1.5 if boost else 1.0
                 vx = (1.0 if _down(KEY_MAP["forward"]) else 0.0) - (1.0 if _down(KEY_MAP["back"]) else 0.0)
@@ -117,21 +248,48 @@ def main() -> int:
                 wz = (1.0 if _down(KEY_MAP["yaw_left"]) else 0.0) - (1.0 if _down(KEY_MAP["yaw_right"]) else 0.0)
                 ctrl.set_cmd(vx * MAX_VX * spd, vy * MAX_VY * spd, wz * MAX_WZ * spd)
 
+                t_render = time.perf_counter()
                 app.update()
+                render_ms = (time.perf_counter() - t_render) * 1e3
+                # the frame shows the pose before this step moves the base: log that one
+                pos, yaw = tuple(ctrl.pos), ctrl.yaw
                 ctrl.step(dt=1.0 / FPS)
 
-                meta = {
-                    "frame": i,
-                    "camera": cam_prim.GetPath().pathString,
-                    "go2": go2_prim.GetPath().pathString,
-                }
-                meta_file.write(json.dumps(meta) + "\n")
+                captured = True
+                if async_writer is not None:
+                    captured = async_writer.submit(i, capture(anns))
+                telemetry.record(frame=i, sim_time=(i + 1) / FPS, wall_time=time.time(), pos=pos,
+                                 yaw=yaw, cmd=(ctrl.cmd.vx, ctrl.cmd.vy, ctrl.cmd.wz), keys=keys,
+                                 render_ms=render_ms, captured=captured)
+
+                now = time.perf_counter()
+                loop_ms.append((now - t_prev) * 1e3)
+                t_prev = now
+                if async_writer is not None and now - t_stats >= STATS_SEC:
+                    _log_stats(async_writer, loop_ms[-int(STATS_SEC * FPS) - 1:])
+                    t_stats = now
+        finally:
+            telemetry.close()
+            if async_writer is not None:
+                async_writer.close()
+                async_writer.write_fn.close()
+                _log_stats(async_writer, loop_ms)
+            if shards is not None:
+                add_telemetry(shards, episode, out_dir)
+                shards.close()
+        drops = frame_drops(load_telemetry(out_dir)[0], FPS)
+        dest = out_dir if shards is None else f"{SHARD_DIR} episode {episode}"
+        LOGGER.info("Recorded %d frames in %.1fs: %d late (%d missed), %d not captured, render p95 %.1f ms -> %s",
+                    drops["frames"], drops["duration_s"], drops["late_frames"], drops["missed_frames"],
+                    drops.get("not_captured", 0), drops.get("render_ms_p95", 0.0), dest)
         return 0
     except Exception as e:
         LOGGER.exception("Recorder failed: %s", e)
         return 1
     finally:
         app.close()
+        if encoder is not None:
+            encoder.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,131 @@
+"""Generate seeded warehouse layout variants in a process pool and register them as environments.
+
+Variant i uses seed --seed + i (warehouse_gen.sample_variant) and is written to a
+content-addressed directory
+    <out>/<variant_key[:16]>/warehouse.usdc   (+ params.json)
+so re-running skips variants that already exist. Every variant is registered in the
+generated overlay registry env/variants.yaml as `<prefix><seed>` (e.g. warehouse_var_00042),
+usable with --env / WAREHOUSE_USD like any registry entry.
+
+Runs with plain pxr, e.g. `python generate_variants.py --count 1000 --workers 8`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+
+LOGGER = logging.getLogger("generate_variants")
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+DEFAULT_OUT = REPO_ROOT / "env/variants"
+VARIANT_USD = "warehouse.usdc"
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--count", type=int, default=100, help="Number of variants (K)")
+    p.add_argument("--seed", type=int, default=0, help="First seed; variant i uses seed + i")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    p.add_argument("--mode", choices=("instanced", "prims"), default="instanced")
+    p.add_argument("--out", type=str, default=str(DEFAULT_OUT), help="Content-addressed output directory")
+    p.add_argument("--prefix", type=str, default="warehouse_var_", help="Registry name prefix")
+    p.add_argument("--no-register", action="store_true", help="Do not write env/variants.yaml")
+    p.add_argument("--occupancy", action="store_true", help="Also precompute each variant's occupancy grid")
+    return p.parse_args()
+
+
+def build_variant(seed: int, out: str, mode: str = "instanced", occupancy: bool = False) -> dict:
+    """Generate one variant unless its content-addressed directory exists; returns its record.
+    With occupancy, its occupancy grid (go2lab.sim.util.static_geometry) is cached next to it."""
+    from pxr import Usd  # type: ignore
+
+    from go2lab.sim.scripts.warehouse_gen import build_warehouse_from_params, sample_variant, variant_key
+
+    params = sample_variant(seed)
+    key = variant_key(params, mode)[:16]
+    target = Path(out) / key
+    record = {"seed": seed, "key": key, "usd": str(target / VARIANT_USD), "params": asdict(params), "built": False}
+    if (target / VARIANT_USD).exists():
+        if occupancy:
+            _occupancy(params, target / VARIANT_USD)
+        return record
+    t0 = time.perf_counter()
+    stage = Usd.Stage.CreateInMemory()
+    props = build_warehouse_from_params(stage, params, mode=mode)
+    # write into a private temp dir and rename it into place, so concurrent runs never see partial output
+    tmp = Path(tempfile.mkdtemp(prefix=f".tmp-{key}-", dir=out))
+    try:
+        stage.GetRootLayer().Export(str(tmp / VARIANT_USD))
+        (tmp / "params.json").write_text(json.dumps({"mode": mode, **record["params"]}, indent=2), encoding="utf-8")
+        try:
+            os.rename(tmp, target)
+        except OSError:
+            if not (target / VARIANT_USD).exists():
+                raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    if occupancy:
+        _occupancy(params, target / VARIANT_USD)
+    record.update(built=True, props=props, seconds=time.perf_counter() - t0)
+    return record
+
+
+def _occupancy(params, usd_path: Path) -> None:
+    from go2lab.sim.util.static_geometry import occupancy_for_params
+
+    occupancy_for_params(params, usd_path=usd_path)
+
+
+def _registry_entry(record: dict) -> dict:
+    size_x, size_y = record["params"]["floor_size"]
+    margin = record["params"]["margin"]
+    usd = Path(record["usd"])
+    try:
+        usd = usd.relative_to(REPO_ROOT)
+    except ValueError:
+        pass
+    return {
+        "usd": usd.as_posix(),
+        "spawn_region": [-size_x / 2 + margin, -size_y / 2 + margin, size_x / 2 - margin, size_y / 2 - margin],
+        "stage_opts": {"prefetch": False},
+        "seed": record["seed"],
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    out = Path(args.out).resolve()
+    out.mkdir(parents=True, exist_ok=True)
+    seeds = range(args.seed, args.seed + args.count)
+    t0 = time.perf_counter()
+    records = []
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = [pool.submit(build_variant, s, str(out), args.mode, args.occupancy) for s in seeds]
+        for fut in futures:
+            records.append(fut.result())
+    built = [r for r in records if r["built"]]
+    wall = time.perf_counter() - t0
+    LOGGER.info("%d variants in %.1fs (%d built, %d already present) -> %s", len(records), wall, len(built),
+                len(records) - len(built), out)
+    if built:
+        LOGGER.info("per variant: %.1f ms build, %.0f props on average",
+                    1e3 * sum(r["seconds"] for r in built) / len(built), sum(r["props"] for r in built) / len(built))
+    if not args.no_register:
+        from go2lab.env_registry import VARIANTS_PATH, register_entries
+
+        total = register_entries({f"{args.prefix}{r['seed']:05d}": _registry_entry(r) for r in records})
+        LOGGER.info("Registered %d variants in %s (%d entries)", len(records), VARIANTS_PATH, total)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
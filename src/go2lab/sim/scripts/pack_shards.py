@@ -0,0 +1,99 @@
+"""Convert recorder output directories (output/<timestamp>/) into a shard directory.
+
+Every directory becomes one episode of go2lab.sim.util.shards: per-frame files named
+<channel>_<frame>.<ext> (BasicWriter / frame_file_writer layout, also in subfolders) are
+stored byte for byte (PNGs stay compressed, .npy stays .npy), every other file
+(telemetry.bin / telemetry.json, legacy meta.jsonl, ...) as an episode-level blob under its
+relative path. Directories already packed into --out (same episode name, marked complete)
+are skipped, so the converter can be rerun as new recordings arrive. The sources are not
+deleted; --verify reads every blob back and compares it with its file before reporting
+success.
+
+e.g. `python pack_shards.py output/2025* --out output/shards --verify`
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import re
+import time
+from pathlib import Path
+
+LOGGER = logging.getLogger("pack_shards")
+
+_FRAME_FILE = re.compile(r"^(?P<channel>.+?)_(?P<frame>\d+)$")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("dirs", nargs="+", type=Path, help="Recorder output directories (one episode each)")
+    p.add_argument("--out", type=Path, default=Path("output/shards"), help="Shard directory (created or appended)")
+    p.add_argument("--chunk-mb", type=float, default=256.0, help="Target chunk file size")
+    p.add_argument("--verify", action="store_true", help="Read every blob back and compare with its source file")
+    return p.parse_args()
+
+
+def episode_files(directory: Path) -> tuple[list, list]:
+    """([(frame, channel, path)] sorted by frame, [(name, path)]) for one recording directory."""
+    frames, extras = [], []
+    for path in sorted(p for p in directory.rglob("*") if p.is_file()):
+        if path.name.startswith("."):
+            continue
+        m = _FRAME_FILE.match(path.stem)
+        if m is not None:
+            frames.append((int(m["frame"]), m["channel"], path))
+        else:
+            extras.append((path.relative_to(directory).as_posix(), path))
+    frames.sort(key=lambda f: (f[0], f[1]))
+    return frames, extras
+
+
+def pack(directory: Path, shards, verify: bool) -> int:
+    from go2lab.sim.util.shards import ShardReader
+
+    frames, extras = episode_files(directory)
+    ep = shards.new_episode(name=directory.name, source=str(directory.resolve()))
+    for frame, channel, path in frames:
+        shards.add_file(ep, frame, channel, path)
+    for name, path in extras:
+        shards.add_file(ep, -1, name, path)
+    shards.flush()
+    if verify:
+        reader = ShardReader(shards.root)
+        items = [(f, c, p) for f, c, p in frames] + [(-1, n, p) for n, p in extras]
+        bad = [p for f, c, p in items if bytes(reader.get_bytes(ep, f, c)) != p.read_bytes()]
+        if bad:
+            raise RuntimeError(f"{len(bad)} blobs differ from their files, e.g. {bad[0]}")
+    shards.episodes[str(ep)]["complete"] = True
+    shards.flush()
+    return len(frames) + len(extras)
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    from go2lab.sim.util.shards import ShardWriter
+
+    failed = 0
+    with ShardWriter(args.out, chunk_bytes=int(args.chunk_mb * (1 << 20))) as shards:
+        packed = {ep.get("name") for ep in shards.episodes.values() if ep.get("complete")}
+        for directory in args.dirs:
+            if not directory.is_dir():
+                continue
+            if directory.resolve() == args.out.resolve() or directory.name in packed:
+                LOGGER.info("%-24s skipped (already packed)", directory.name)
+                continue
+            t0 = time.perf_counter()
+            try:
+                n = pack(directory, shards, args.verify)
+            except Exception as exc:
+                failed += 1
+                LOGGER.error("%-24s FAILED %s", directory.name, exc)
+                continue
+            LOGGER.info("%-24s %7d files [%.2fs]%s", directory.name, n, time.perf_counter() - t0,
+                        " verified" if args.verify else "")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
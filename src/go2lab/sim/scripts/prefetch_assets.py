@@ -0,0 +1,110 @@
+"""Prefetch every remote USD used by the project into the local asset cache.
+
+Walks env/registry.yaml, the default/WAREHOUSE_USD warehouse spec and the GO2 asset URL,
+and pulls each layer and its dependency closure once (go2lab.sim.util.asset_cache),
+fetching each dependency graph concurrently (go2lab.sim.util.stage_prefetch).
+After a successful run, GO2LAB_OFFLINE=1 startups resolve everything from the cache.
+
+omniverse:// specs (including isaaclab:// registry entries) need Kit's client library:
+pass --kit to start a headless SimulationApp first. --verify only checks the cache and
+never touches the network (exit code 1 if anything is missing).
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import time
+from pathlib import Path
+
+LOGGER = logging.getLogger("prefetch_assets")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--kit", action="store_true", help="Start a headless SimulationApp (needed for omniverse:// specs)")
+    p.add_argument("--refresh", action="store_true", help="Re-download even if cached")
+    p.add_argument("--verify", action="store_true", help="Only check that every spec is cached (no network)")
+    p.add_argument("--workers", type=int, default=8, help="Concurrent downloads per stage")
+    p.add_argument("--cache-dir", type=str, default=None, help="Override GO2LAB_ASSET_CACHE_DIR")
+    p.add_argument("specs", nargs="*", help="Extra specs to prefetch")
+    return p.parse_args()
+
+
+def _collect_specs(extra: list[str]) -> dict[str, str]:
+    from go2lab.config import get_warehouse_spec
+    from go2lab.env_registry import registry_specs
+    from go2lab.sim.scripts.spawn_go2 import DEFAULT_GO2_URL, GO2_USD_ENV
+    from go2lab.sim.util.usd_path import normalize_spec
+
+    specs: dict[str, str] = {}
+    for name, spec in registry_specs().items():
+        specs.setdefault(normalize_spec(spec), f"registry:{name}")
+    specs.setdefault(normalize_spec(get_warehouse_spec()), "warehouse")
+    if os.environ.get(GO2_USD_ENV):
+        specs.setdefault(normalize_spec(os.environ[GO2_USD_ENV]), GO2_USD_ENV)
+    specs.setdefault(DEFAULT_GO2_URL, "go2")
+    for s in extra:
+        specs.setdefault(normalize_spec(s), "cli")
+    return specs
+
+
+def _closure_size(cache, spec: str) -> tuple[int, int]:
+    # (files, bytes) reachable from spec through recorded dependencies
+    seen, stack, total = set(), [spec], 0
+    while stack:
+        s = stack.pop()
+        if s in seen or s not in cache.manifest:
+            continue
+        seen.add(s)
+        entry = cache.manifest[s]
+        total += int(entry.get("size", 0))
+        stack.extend(entry.get("deps", ()))
+    return len(seen), total
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    app = None
+    if args.kit:
+        try:
+            from isaacsim import SimulationApp  # type: ignore
+        except Exception:
+            from isaacsim.simulation_app import SimulationApp  # type: ignore
+        app = SimulationApp({"headless": True})
+    try:
+        from go2lab.sim.util.asset_cache import AssetCache, is_remote
+        from go2lab.sim.util.stage_prefetch import prefetch_stage
+
+        cache = AssetCache(root=args.cache_dir, offline=True if args.verify else None)
+        specs = _collect_specs(args.specs)
+        failed = 0
+        for spec, origin in specs.items():
+            if not is_remote(spec):
+                LOGGER.info("%-22s local   %s", origin, spec)
+                continue
+            t0 = time.perf_counter()
+            try:
+                if args.verify:
+                    local = cache.lookup(spec)
+                    if local is None:
+                        raise FileNotFoundError("not cached")
+                else:
+                    local = cache.fetch(spec, refresh=True) if args.refresh else prefetch_stage(spec, cache, args.workers)[0]
+            except Exception as exc:
+                failed += 1
+                LOGGER.error("%-22s FAILED  %s (%s)", origin, spec, exc)
+                continue
+            files, size = _closure_size(cache, spec)
+            LOGGER.info("%-22s ok      %s -> %s [%d files, %.1f MiB, %.1fs]", origin, spec, Path(local).name,
+                        files, size / 2**20, time.perf_counter() - t0)
+        LOGGER.info("Asset cache: %s (%d entries)", cache.root, len(cache.manifest))
+        return 1 if failed else 0
+    finally:
+        if app is not None:
+            app.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -13,6 +13,7 @@ except Exception:
 from go2lab.config import get_warehouse_spec
 from go2lab.sim.util.usd_path import resolve_usd_spec
 from go2lab.sim.util.kit import get_stage_and_backends
+from go2lab.world import SNAPSHOT_ENV, open_warehouse
 
 DEFAULT_STEPS = int(os.environ.get("SIM_MIN_STEPS", "240"))
 logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
@@ -24,11 +25,13 @@ def main() -> int:
     spec = get_warehouse_spec()
     kind, target, ok = resolve_usd_spec(spec, repo_root)
     stage_path = Path(target) if kind == "path" else None
+    # flattened snapshots are built with pxr, which is only importable once the app is up
+    use_snapshot = os.environ.get(SNAPSHOT_ENV, "0") not in ("", "0")
 
     # Renderer selection from env (set by tools/isaac_unitree_go2.py)
     renderer = os.environ.get("ISAAC_RENDERER", "RayTracedLighting")
     app_args = {"headless": False, "renderer": renderer}
-    if stage_path is not None and stage_path.exists():
+    if stage_path is not None and stage_path.exists() and not use_snapshot:
         app_args["open_usd"] = str(stage_path)
     sim_app = SimulationApp(app_args)
 
@@ -50,6 +53,9 @@ def main() -> int:
             LOGGER.error("Warehouse USD not found at local path: %s.", stage_path)
             return 2
 
+        if kind == "path" and use_snapshot:
+            open_warehouse(open_stage, repo_root, spec=spec, logger=LOGGER, snapshot=True)
+
         steps = max(DEFAULT_STEPS, 1)
         try:
             for _ in range(steps):
@@ -1,21 +1,33 @@
 """GO2 spawn/reset and simple velocity control utilities for Isaac Sim 5.0.
 If no GO2 USD is found, spawn a placeholder multi-body box.
+spawn_go2_batch lays out N instanceable copies on a grid under per-env namespaces;
+spawn_go2_batch_from_env does so for the launcher's per-env GO2_NUM_ROBOTS / GO2LAB_INSTANCEABLE.
+sample_spawn_pose draws a collision-free start pose from the stage's occupancy grid.
 """
 from __future__ import annotations
 
+import math
 import os
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Sequence
 import logging
 
-from pxr import Usd, UsdGeom, Sdf, Gf
+import numpy as np
+from pxr import Usd, UsdGeom, Sdf, Gf, Vt
+
+from go2lab.core.rotations import yaw_from_matrices
+from go2lab.sim.util.xform_cache import shared_xform_cache
 
 LOGGER = logging.getLogger("spawn_go2")
 
 # Default prim path aligned with user's preference
 GO2_DEFAULT_PATH = "/go2"
+GO2_ENVS_ROOT = "/World/envs"
+GO2_PROTOTYPE_PATH = "/__go2_prototype"
 GO2_USD_ENV = "GO2_USD"
+NUM_ROBOTS_ENV = "GO2_NUM_ROBOTS"
+INSTANCEABLE_ENV = "GO2LAB_INSTANCEABLE"
 GO2_LOCAL_USD = "go2.usd"
 DEFAULT_GO2_URL = (
     "https://omniverse-content-production.s3-us-west-2.amazonaws.com/Assets/Isaac/5.0/Isaac/Robots/Unitree/Go2/go2.usd"
@@ -24,6 +36,8 @@ DEFAULT_GO2_URL = (
 MAX_LIN = 1.2
 MAX_ANG = 1.5
 DAMPING = 0.9
+# default collision radius [m] of the GO2 base footprint (half its diagonal is ~0.37 m)
+GO2_RADIUS = 0.3
 
 
 @dataclass
@@ -48,8 +62,12 @@ def _resolve_go2_usd(repo_root: Path) -> tuple[str, str | None]:
     local = repo_root / GO2_LOCAL_USD
     if local.exists():
         return ("path", str(local))
-    # Fallback to the public Omniverse asset URL if nothing else is found
-    return ("url", DEFAULT_GO2_URL)
+    # Fallback to the public Omniverse asset URL (through the local asset cache) if nothing else is found
+    from go2lab.sim.util.usd_path import resolve_usd_spec
+    kind, target, ok = resolve_usd_spec(DEFAULT_GO2_URL, repo_root)
+    if kind == "path":
+        return ("path", target if ok else None)
+    return (kind, target)
 
 
 def spawn_placeholder(stage: Usd.Stage, path: str = GO2_DEFAULT_PATH) -> Usd.Prim:
@@ -60,6 +78,10 @@ def spawn_placeholder(stage: Usd.Stage, path: str = GO2_DEFAULT_PATH) -> Usd.Pri
 
 
 def spawn_go2(stage: Usd.Stage, repo_root: Path, path: str = GO2_DEFAULT_PATH) -> Usd.Prim:
+    existing = stage.GetPrimAtPath(path)
+    if existing and existing.IsDefined() and (existing.GetChildren() or existing.IsA(UsdGeom.Capsule)):
+        # already composed into the stage (e.g. opened from a stage snapshot with GO2 spawned)
+        return existing
     mode, target = _resolve_go2_usd(repo_root)
     if target is None:
         return spawn_placeholder(stage, path)
@@ -68,23 +90,156 @@ def spawn_go2(stage: Usd.Stage, repo_root: Path, path: str = GO2_DEFAULT_PATH) -
     return prim
 
 
+def grid_origins(n: int, spacing: float = 2.0) -> np.ndarray:
+    """(n, 3) env origins on a square grid centered at the world origin, row-major in env order."""
+    cols = max(1, math.ceil(math.sqrt(n)))
+    rows = max(1, math.ceil(n / cols))
+    idx = np.arange(n)
+    origins = np.zeros((n, 3), dtype=np.float64)
+    origins[:, 0] = (idx % cols - (cols - 1) / 2.0) * spacing
+    origins[:, 1] = (idx // cols - (rows - 1) / 2.0) * spacing
+    return origins
+
+
+def _def_xform(layer: Sdf.Layer, path: str) -> Sdf.PrimSpec:
+    spec = Sdf.CreatePrimInLayer(layer, path)
+    spec.specifier = Sdf.SpecifierDef
+    if not spec.typeName:
+        spec.typeName = "Xform"
+    return spec
+
+
+def _set_attr(spec: Sdf.PrimSpec, name: str, type_name, value, uniform: bool = False) -> None:
+    attr = spec.attributes.get(name)
+    if attr is None:
+        variability = Sdf.VariabilityUniform if uniform else Sdf.VariabilityVarying
+        attr = Sdf.AttributeSpec(spec, name, type_name, variability)
+    attr.default = value
+
+
+def _set_translate(spec: Sdf.PrimSpec, xyz) -> None:
+    _set_attr(spec, "xformOp:translate", Sdf.ValueTypeNames.Double3, Gf.Vec3d(*xyz))
+    _set_attr(spec, "xformOpOrder", Sdf.ValueTypeNames.TokenArray, Vt.TokenArray(["xformOp:translate"]), uniform=True)
+
+
+def _define_placeholder_prototype(layer: Sdf.Layer) -> Sdf.Path:
+    # class prim (not traversed/rendered itself) holding the placeholder body, referenced by every copy
+    proto = Sdf.CreatePrimInLayer(layer, GO2_PROTOTYPE_PATH)
+    proto.specifier = Sdf.SpecifierClass
+    proto.typeName = "Xform"
+    body = layer.GetPrimAtPath(proto.path.AppendChild("body"))
+    if body is None:
+        body = Sdf.PrimSpec(proto, "body", Sdf.SpecifierDef, "Capsule")
+    _set_attr(body, "xformOp:scale", Sdf.ValueTypeNames.Float3, Gf.Vec3f(0.2, 0.2, 0.4))
+    _set_attr(body, "xformOpOrder", Sdf.ValueTypeNames.TokenArray, Vt.TokenArray(["xformOp:scale"]), uniform=True)
+    return proto.path
+
+
+def spawn_go2_batch(
+    stage: Usd.Stage,
+    repo_root: Path,
+    n: int,
+    spacing: float = 2.0,
+    root: str = GO2_ENVS_ROOT,
+    height: float = 0.4,
+    usd: str | None = None,
+    instanceable: bool = True,
+) -> list[str]:
+    """Spawn n GO2 copies as {root}/env_i/go2 and return their prim paths (index i == env i).
+
+    Env origins come from grid_origins() and are authored on env_i; each robot sits at
+    (0, 0, height) in its env. Robots are instanceable references to one asset (usd, or the
+    GO2 USD resolved like spawn_go2, or a placeholder prototype), so the asset is composed
+    once and shared (instanceable=False composes a full copy per robot); pass usd="" to force
+    the placeholder. Everything is authored on the edit
+    target layer in one Sdf.ChangeBlock.
+    """
+    if usd is None:
+        _, usd = _resolve_go2_usd(repo_root)
+    layer = stage.GetEditTarget().GetLayer()
+    origins = grid_origins(n, spacing).tolist()
+    paths: list[str] = []
+    with Sdf.ChangeBlock():
+        ref = Sdf.Reference(usd) if usd else Sdf.Reference(primPath=_define_placeholder_prototype(layer))
+        for prefix in Sdf.Path(root).GetPrefixes():
+            _def_xform(layer, prefix)
+        for i in range(n):
+            env = _def_xform(layer, f"{root}/env_{i}")
+            _set_translate(env, origins[i])
+            robot = _def_xform(layer, f"{root}/env_{i}/go2")
+            robot.referenceList.ClearEdits()
+            robot.referenceList.Prepend(ref)
+            robot.instanceable = instanceable
+            _set_translate(robot, (0.0, 0.0, height))
+            paths.append(robot.path.pathString)
+    return paths
+
+
 def reset_pose(stage: Usd.Stage, prim_path: str = GO2_DEFAULT_PATH, pos=(0.0, 0.0, 0.5), yaw: float = 0.0) -> None:
     prim = stage.GetPrimAtPath(prim_path)
     if not prim:
         return
     xform = UsdGeom.Xformable(prim)
+    # yaw in degrees (Gf.Rotation convention)
     rot = Gf.Rotation(Gf.Vec3d(0, 0, 1), yaw)
     xf = Gf.Matrix4d().SetRotate(rot)
-    xf.SetTranslate(Gf.Vec3d(*pos))
+    xf.SetTranslateOnly(Gf.Vec3d(*pos))
     xform.MakeMatrixXform().Set(xf)
 
 
+def sample_spawn_pose(stage: Usd.Stage, clearance: float = 0.4, height: float = 0.45,
+                      seed: Optional[int] = None) -> Optional[tuple[tuple[float, float, float], float]]:
+    """One collision-free ((x, y, z), yaw degrees) pose for reset_pose, drawn from the stage's
+    cached occupancy grid (GO2_SPAWN_REGION applies); None when no free pose is available."""
+    from go2lab.sim.util.static_geometry import spawn_sampler_for_stage
+
+    try:
+        sampler = spawn_sampler_for_stage(stage, clearance=clearance, height=height, seed=seed)
+        pos, yaw = sampler.sample(1)
+    except Exception as exc:
+        LOGGER.warning("Spawn sampling failed (%s); keeping the configured pose", exc)
+        return None
+    return tuple(pos[0].tolist()), math.degrees(float(yaw[0]))
+
+
+def _swept_fraction(collider, radius: float, start, delta) -> tuple[np.ndarray, np.ndarray]:
+    """Fraction (k,) of each planar step delta (k, 2) that is collision free from start (k, 2),
+    backed off by 1 um so robots never rest exactly on a surface, and whether it hit (k,)."""
+    t, box = collider.sweep(start, start + delta, radius)
+    hit = box >= 0
+    length = np.maximum(np.linalg.norm(delta, axis=1), 1e-12)
+    return np.where(hit, np.maximum(t - 1e-6 / length, 0.0), 1.0), hit
+
+
 class SimpleBaseController:
+    """Kinematic velocity controller for one robot.
+
+    The controller owns the base pose (position and yaw in radians) and only reads it back from
+    USD when the prim's transform was edited by someone else (e.g. reset_pose), detected through
+    the xform cache's change counter. The pose is written as one matrix op, only when it changes.
+    With set_collider(index), each step is swept against a go2lab.core.spatial.BoxIndex and the
+    robot stops at the first contact (its pose is taken as world space, i.e. the prim has an
+    untransformed parent).
+    """
+
     def __init__(self, stage: Usd.Stage, prim_path: str = GO2_DEFAULT_PATH):
         self.stage = stage
         self.prim_path = prim_path
+        self._xf = shared_xform_cache(stage)
         self.cmd = VelocityCmd()
         self._vel = VelocityCmd()
+        self.pos = Gf.Vec3d(0.0, 0.0, 0.0)
+        self.yaw = 0.0
+        self._attr: Usd.Attribute | None = None
+        self._seen: int | None = None
+        self.collider = None
+        self.radius = GO2_RADIUS
+        self.collided = False
+
+    def set_collider(self, index, radius: float = GO2_RADIUS) -> None:
+        """Stop at static geometry in index (a BoxIndex, e.g. static_geometry.index_for_stage); None disables."""
+        self.collider = index
+        self.radius = float(radius)
 
     def set_cmd(self, vx: float, vy: float, wz: float) -> None:
         self.cmd.vx = max(min(vx, MAX_LIN), -MAX_LIN)
@@ -95,25 +250,223 @@ class SimpleBaseController:
         self.cmd = VelocityCmd(0.0, 0.0, 0.0)
         self._vel = VelocityCmd(self._vel.vx * 0.5, self._vel.vy * 0.5, self._vel.wz * 0.5)
 
-    def step(self, dt: float = 1.0 / 60.0) -> None:
+    def _sync_from_stage(self) -> bool:
         prim = self.stage.GetPrimAtPath(self.prim_path)
         if not prim:
+            return False
+        mat = self._xf.local_matrix(self.prim_path)
+        self.pos = Gf.Vec3d(mat.ExtractTranslation())
+        self.yaw = math.atan2(mat[0][1], mat[0][0])
+        # op stack may have been re-authored: convert to a single matrix op again on the next write
+        self._attr = None
+        self._seen = self._xf.version(self.prim_path)
+        return True
+
+    def step(self, dt: float = 1.0 / 60.0) -> None:
+        if self._seen != self._xf.version(self.prim_path) and not self._sync_from_stage():
+            return
+        vel, cmd = self._vel, self.cmd
+        vel.vx = DAMPING * vel.vx + (1 - DAMPING) * cmd.vx
+        vel.vy = DAMPING * vel.vy + (1 - DAMPING) * cmd.vy
+        vel.wz = DAMPING * vel.wz + (1 - DAMPING) * cmd.wz
+        # settle to exactly zero once braked so an idle robot stops producing writes
+        if cmd.vx == 0.0 and cmd.vy == 0.0 and cmd.wz == 0.0 and max(abs(vel.vx), abs(vel.vy), abs(vel.wz)) < 1e-6:
+            vel.vx = vel.vy = vel.wz = 0.0
             return
-        xform = UsdGeom.Xformable(prim)
-        self._vel.vx = DAMPING * self._vel.vx + (1 - DAMPING) * self.cmd.vx
-        self._vel.vy = DAMPING * self._vel.vy + (1 - DAMPING) * self.cmd.vy
-        self._vel.wz = DAMPING * self._vel.wz + (1 - DAMPING) * self.cmd.wz
-
-        ops = xform.GetOrderedXformOps()
-        mat = ops[0].GetOpTransform(0.0) if ops else Gf.Matrix4d(1.0)
-        pos = Gf.Vec3d(mat.ExtractTranslation())
-        yaw = 0.0
-        yaw += self._vel.wz * dt
-        pos += Gf.Vec3d(self._vel.vx * dt, self._vel.vy * dt, 0.0)
-        rot = Gf.Rotation(Gf.Vec3d(0, 0, 1), yaw)
-        new = Gf.Matrix4d().SetRotate(rot)
-        new.SetTranslate(pos)
-        xform.MakeMatrixXform().Set(new)
-
-
-__all__ = ["spawn_go2", "reset_pose", "SimpleBaseController", "GO2_DEFAULT_PATH"]
+
+        # body-frame velocities integrated about the current heading
+        c, s = math.cos(self.yaw), math.sin(self.yaw)
+        dx, dy = (c * vel.vx - s * vel.vy) * dt, (s * vel.vx + c * vel.vy) * dt
+        self.collided = False
+        if self.collider is not None and (dx or dy):
+            frac, hit = _swept_fraction(self.collider, self.radius, np.array([[self.pos[0], self.pos[1]]]),
+                                        np.array([[dx, dy]]))
+            if hit[0]:
+                self.collided = True
+                dx, dy = dx * frac[0], dy * frac[0]
+                vel.vx = vel.vy = 0.0
+        self.pos += Gf.Vec3d(dx, dy, 0.0)
+        self.yaw += vel.wz * dt
+        self._write()
+
+    def _write(self) -> None:
+        if self._attr is None:
+            prim = self.stage.GetPrimAtPath(self.prim_path)
+            self._attr = UsdGeom.Xformable(prim).MakeMatrixXform().GetAttr()
+        c, s = math.cos(self.yaw), math.sin(self.yaw)
+        p = self.pos
+        self._attr.Set(Gf.Matrix4d(c, s, 0.0, 0.0, -s, c, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, p[0], p[1], p[2], 1.0))
+        self._seen = self._xf.version(self.prim_path)
+
+
+class BatchedBaseController:
+    """Kinematic base controller for N robots with array state and one batched USD write per step.
+
+    Pose (pos, yaw in radians) and filtered velocity live in (N, ...) arrays; step() applies the
+    damping filter and body-frame integration for all robots at once, then authors the new
+    xformOp:transform defaults through cached Sdf attribute specs inside a single Sdf.ChangeBlock.
+    Each prim is converted to a single matrix op once at construction, so the op order is not
+    re-authored per frame. Robots whose pose did not change are not written.
+    With set_collider(index, origins=...), the steps of all moving robots are swept against a
+    go2lab.core.spatial.BoxIndex in one batched query; robots stop at the first contact and
+    `collided` flags them for the step.
+    """
+
+    def __init__(self, stage: Usd.Stage, prim_paths: Sequence[str]):
+        self.stage = stage
+        self.prim_paths = [str(p) for p in prim_paths]
+        n = self.num_envs = len(self.prim_paths)
+        self.cmd = np.zeros((n, 3), dtype=np.float64)
+        self.vel = np.zeros((n, 3), dtype=np.float64)
+        self.pos = np.zeros((n, 3), dtype=np.float64)
+        self.yaw = np.zeros(n, dtype=np.float64)
+        self._limits = np.array([MAX_LIN, MAX_LIN, MAX_ANG])
+        self._mats = np.zeros((n, 4, 4), dtype=np.float64)
+        self._mats[:, 2, 2] = 1.0
+        self._mats[:, 3, 3] = 1.0
+        self._dirty = np.zeros(n, dtype=bool)
+        self._specs: list[Sdf.AttributeSpec | None] = []
+        self.collider = None
+        self.radius = GO2_RADIUS
+        self._origins = np.zeros((n, 2), dtype=np.float64)
+        self.collided = np.zeros(n, dtype=bool)
+
+        # start from the current local transforms, then switch every prim to one matrix op
+        xf_cache = shared_xform_cache(stage)
+        layer = stage.GetEditTarget().GetLayer()
+        for i, path in enumerate(self.prim_paths):
+            prim = stage.GetPrimAtPath(path)
+            if not prim or not prim.IsA(UsdGeom.Xformable):
+                LOGGER.warning("BatchedBaseController: no xformable prim at %s", path)
+                self._specs.append(None)
+                continue
+            m = np.array(xf_cache.local_matrix(path))
+            self.pos[i] = m[3, :3]
+            self.yaw[i] = yaw_from_matrices(m)
+            op = UsdGeom.Xformable(prim).MakeMatrixXform()
+            spec_path = stage.GetEditTarget().MapToSpecPath(op.GetAttr().GetPath())
+            self._specs.append(layer.GetAttributeAtPath(spec_path))
+        self._dirty[:] = True
+        self._write()
+
+    def set_collider(self, index, radius: float = GO2_RADIUS, origins=None) -> None:
+        """Collide with the boxes of index (None disables). origins (N, 2|3) are the world
+        positions of each robot's parent (spawn_go2_batch env origins); default: all zero."""
+        self.collider = index
+        self.radius = float(radius)
+        self._origins[:] = 0.0 if origins is None else np.asarray(origins, dtype=np.float64).reshape(self.num_envs, -1)[:, :2]
+
+    def set_cmds(self, cmds) -> None:
+        """Set (N, 3) [vx, vy, wz] body-frame commands (clamped to MAX_LIN/MAX_ANG)."""
+        np.clip(np.asarray(cmds, dtype=np.float64), -self._limits, self._limits, out=self.cmd)
+
+    def set_cmd(self, vx: float, vy: float, wz: float) -> None:
+        """Same command for every robot (SimpleBaseController.set_cmd interface)."""
+        self.set_cmds((vx, vy, wz))
+
+    def brake(self, env_ids=None) -> None:
+        ids = slice(None) if env_ids is None else env_ids
+        self.cmd[ids] = 0.0
+        self.vel[ids] *= 0.5
+
+    def set_poses(self, pos, yaw, env_ids=None) -> None:
+        """Teleport robots to pos (k, 3) / yaw (k,) radians; written on the next step()."""
+        ids = slice(None) if env_ids is None else env_ids
+        self.pos[ids] = pos
+        self.yaw[ids] = yaw
+        self._dirty[ids] = True
+
+    def reset(self, env_ids=None) -> None:
+        ids = slice(None) if env_ids is None else env_ids
+        self.cmd[ids] = 0.0
+        self.vel[ids] = 0.0
+
+    def step(self, dt: float = 1.0 / 60.0) -> None:
+        vel, cmd = self.vel, self.cmd
+        vel *= DAMPING
+        vel += (1 - DAMPING) * cmd
+        # settle to exactly zero once braked so idle robots stop producing writes
+        vel[(np.abs(vel) < 1e-6) & (cmd == 0.0)] = 0.0
+        moving = vel.any(axis=1)
+        self.collided[:] = False
+        if moving.any():
+            c, s = np.cos(self.yaw), np.sin(self.yaw)
+            delta = np.stack([(c * vel[:, 0] - s * vel[:, 1]) * dt, (s * vel[:, 0] + c * vel[:, 1]) * dt], axis=1)
+            if self.collider is not None:
+                ids = np.flatnonzero(moving & delta.any(axis=1))
+                if ids.size:
+                    frac, hit = _swept_fraction(self.collider, self.radius, self.pos[ids, :2] + self._origins[ids],
+                                                delta[ids])
+                    delta[ids] *= frac[:, None]
+                    self.collided[ids] = hit
+                    vel[ids[hit], :2] = 0.0
+            self.pos[:, :2] += delta
+            self.yaw += vel[:, 2] * dt
+            self._dirty |= moving
+        self._write()
+
+    def _write(self) -> None:
+        ids = np.flatnonzero(self._dirty)
+        if ids.size == 0:
+            return
+        # Gf row-vector layout: rows 0/1 are the body x/y axes, translation in the last row
+        m = self._mats
+        c, s = np.cos(self.yaw[ids]), np.sin(self.yaw[ids])
+        m[ids, 0, 0] = c
+        m[ids, 0, 1] = s
+        m[ids, 1, 0] = -s
+        m[ids, 1, 1] = c
+        m[ids, 3, :3] = self.pos[ids]
+        rows = m[ids].reshape(-1, 16).tolist()
+        specs = self._specs
+        with Sdf.ChangeBlock():
+            for i, row in zip(ids.tolist(), rows):
+                spec = specs[i]
+                if spec is not None:
+                    spec.default = Gf.Matrix4d(*row)
+        self._dirty[:] = False
+
+
+def spawn_go2_batch_from_env(stage: Usd.Stage, repo_root: Path, height: float = 0.45, sample: bool = False,
+                             seed: Optional[int] = None) -> Optional[BatchedBaseController]:
+    """Registry-driven team spawn for the runners: with GO2_NUM_ROBOTS > 1 (set by the launcher
+    from env/registry.yaml num_robots), spawn that many robots with spawn_go2_batch (instanceable
+    unless GO2LAB_INSTANCEABLE=0) and return their BatchedBaseController. sample draws
+    separated collision-free start poses from the stage's free-space map (GO2_SPAWN_REGION
+    applies), else robots start on the grid. None for a single robot (use spawn_go2)."""
+    try:
+        n = int(os.environ.get(NUM_ROBOTS_ENV, "1"))
+    except ValueError:
+        LOGGER.warning("Ignoring %s=%r (not an integer)", NUM_ROBOTS_ENV, os.environ.get(NUM_ROBOTS_ENV))
+        n = 1
+    if n <= 1:
+        return None
+    instanceable = os.environ.get(INSTANCEABLE_ENV, "1") != "0"
+    paths = spawn_go2_batch(stage, repo_root, n, height=height, instanceable=instanceable)
+    ctrl = BatchedBaseController(stage, paths)
+    if sample:
+        from go2lab.sim.util.static_geometry import spawn_sampler_for_stage
+
+        try:
+            sampler = spawn_sampler_for_stage(stage, height=height, separation=2 * GO2_RADIUS, seed=seed)
+            pos, yaw = sampler.sample_local(grid_origins(n))
+            ctrl.set_poses(pos, yaw)
+        except Exception as exc:
+            LOGGER.warning("Spawn sampling failed (%s); robots start on the grid", exc)
+    LOGGER.info("Spawned %d GO2 robots under %s (instanceable=%s)", n, GO2_ENVS_ROOT, instanceable)
+    return ctrl
+
+
+__all__ = [
+    "spawn_go2",
+    "spawn_go2_batch",
+    "spawn_go2_batch_from_env",
+    "grid_origins",
+    "reset_pose",
+    "sample_spawn_pose",
+    "SimpleBaseController",
+    "BatchedBaseController",
+    "GO2_DEFAULT_PATH",
+    "GO2_ENVS_ROOT",
+    "GO2_RADIUS",
+]
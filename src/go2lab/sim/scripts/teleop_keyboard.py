@@ -57,7 +57,9 @@ def main() -> int:
         import carb  # import after SimulationApp is initialized
         # Import modules that bring in pxr only after SimulationApp has started
         from go2lab.sim.util.kit import get_stage_and_backends
-        from go2lab.sim.scripts.spawn_go2 import spawn_go2, SimpleBaseController, reset_pose
+        from go2lab.sim.scripts.spawn_go2 import (
+            spawn_go2, spawn_go2_batch_from_env, SimpleBaseController, reset_pose, sample_spawn_pose,
+        )
 
         stage, open_stage, set_on_demand = get_stage_and_backends()
         try:
@@ -74,25 +76,38 @@ def main() -> int:
                 ctx = ou.get_context()
                 ctx.new_stage()
                 stage = ctx.get_stage()
-            else:
-                open_warehouse(open_stage, repo_root, strict_missing=False, logger=LOGGER)
+            elif open_warehouse(open_stage, repo_root, strict_missing=False, logger=LOGGER):
+                # opening (a snapshot or the source) replaces the context's stage
+                stage = get_stage_and_backends()[0]
         except Exception:
             LOGGER.exception("Failed to open environment; continuing with current stage")
 
-        # Always spawn GO2; input may be disabled separately
-        go2_prim = spawn_go2(stage, repo_root)
-        # Apply initial pose (env-configurable)
         def _getf(name: str, default: float) -> float:
             try:
                 return float(os.environ.get(name, str(default)))
             except Exception:
                 return default
-        ix = _getf("GO2_INIT_X", 0.0)
-        iy = _getf("GO2_INIT_Y", 0.0)
-        iz = _getf("GO2_INIT_Z", 0.45)
-        iyaw = _getf("GO2_INIT_YAW", 0.0)
-        reset_pose(stage, prim_path=go2_prim.GetPath().pathString, pos=(ix, iy, iz), yaw=iyaw)
-        ctrl = SimpleBaseController(stage, prim_path=go2_prim.GetPath().pathString)
+        spawn_sample = os.environ.get("GO2_SPAWN_SAMPLE", "0") == "1"
+        # GO2_NUM_ROBOTS > 1 (registry num_robots): every robot follows the keyboard command
+        ctrl = spawn_go2_batch_from_env(stage, repo_root, height=_getf("GO2_INIT_Z", 0.45), sample=spawn_sample)
+        if ctrl is not None:
+            spawned = f"{ctrl.num_envs} robots under {ctrl.prim_paths[0].rsplit('/', 2)[0]}"
+        else:
+            # Always spawn GO2; input may be disabled separately
+            go2_prim = spawn_go2(stage, repo_root)
+            # Apply initial pose (env-configurable)
+            ix = _getf("GO2_INIT_X", 0.0)
+            iy = _getf("GO2_INIT_Y", 0.0)
+            iz = _getf("GO2_INIT_Z", 0.45)
+            iyaw = _getf("GO2_INIT_YAW", 0.0)
+            if spawn_sample:
+                # random collision-free start pose from the stage's free-space map
+                sampled = sample_spawn_pose(stage, height=iz)
+                if sampled is not None:
+                    (ix, iy, iz), iyaw = sampled
+            reset_pose(stage, prim_path=go2_prim.GetPath().pathString, pos=(ix, iy, iz), yaw=iyaw)
+            ctrl = SimpleBaseController(stage, prim_path=go2_prim.GetPath().pathString)
+            spawned = go2_prim.GetPath().pathString
 
         # setup keyboard map now that carb is available
         global KEY_MAP
@@ -124,7 +139,7 @@ def main() -> int:
         if not skip_input and KEY_MAP is not None and inp is not None:
             LOGGER.info("WASD move, arrows yaw, Space brake, Shift boost")
         else:
-            LOGGER.info("Input disabled: rendering only. GO2 spawned at %s", go2_prim.GetPath().pathString)
+            LOGGER.info("Input disabled: rendering only. GO2 spawned at %s", spawned)
         for _ in range(100000):
             if not skip_input and kb is not None and KEY_MAP is not None and inp is not None:
                 # Isaac Sim 5.0 uses virtual keys state via input interface
@@ -20,7 +20,9 @@ def main() -> int:
     app = SimulationApp({"headless": headless, "renderer": renderer})
     try:
         from go2lab.sim.util.kit import get_stage_and_backends
-        from go2lab.sim.scripts.spawn_go2 import spawn_go2, SimpleBaseController, reset_pose
+        from go2lab.sim.scripts.spawn_go2 import (
+            spawn_go2, spawn_go2_batch_from_env, SimpleBaseController, reset_pose, sample_spawn_pose,
+        )
 
         stage, open_stage, set_on_demand = get_stage_and_backends()
         try:
@@ -30,27 +32,38 @@ def main() -> int:
 
         repo_root = Path(__file__).resolve().parents[4]
         try:
-            open_warehouse(open_stage, repo_root, strict_missing=False, logger=LOGGER)
+            if open_warehouse(open_stage, repo_root, strict_missing=False, logger=LOGGER):
+                # opening replaces the context's stage (sampled spawn poses must see the warehouse)
+                stage = get_stage_and_backends()[0]
         except Exception:
             LOGGER.exception("Failed to open environment; continuing with current stage")
 
-        # Always spawn GO2
-        go2_prim = spawn_go2(stage, repo_root)
-
-        # Apply initial pose
         def _getf(name: str, default: float) -> float:
             try:
                 return float(os.environ.get(name, str(default)))
             except Exception:
                 return default
 
-        ix = _getf("GO2_INIT_X", 0.0)
-        iy = _getf("GO2_INIT_Y", 0.0)
-        iz = _getf("GO2_INIT_Z", 0.45)
-        iyaw = _getf("GO2_INIT_YAW", 0.0)
-        reset_pose(stage, prim_path=go2_prim.GetPath().pathString, pos=(ix, iy, iz), yaw=iyaw)
+        spawn_sample = os.environ.get("GO2_SPAWN_SAMPLE", "0") == "1"
+        # GO2_NUM_ROBOTS > 1 (registry num_robots): a team of robots driven by one batched controller
+        ctrl = spawn_go2_batch_from_env(stage, repo_root, height=_getf("GO2_INIT_Z", 0.45), sample=spawn_sample)
+        if ctrl is None:
+            # Always spawn GO2
+            go2_prim = spawn_go2(stage, repo_root)
+
+            # Apply initial pose
+            ix = _getf("GO2_INIT_X", 0.0)
+            iy = _getf("GO2_INIT_Y", 0.0)
+            iz = _getf("GO2_INIT_Z", 0.45)
+            iyaw = _getf("GO2_INIT_YAW", 0.0)
+            if spawn_sample:
+                # random collision-free start pose from the stage's free-space map
+                sampled = sample_spawn_pose(stage, height=iz)
+                if sampled is not None:
+                    (ix, iy, iz), iyaw = sampled
+            reset_pose(stage, prim_path=go2_prim.GetPath().pathString, pos=(ix, iy, iz), yaw=iyaw)
 
-        ctrl = SimpleBaseController(stage, prim_path=go2_prim.GetPath().pathString)
+            ctrl = SimpleBaseController(stage, prim_path=go2_prim.GetPath().pathString)
         algo = os.environ.get("ALGORITHM")
         task = os.environ.get("TASK_NAME")
         LOGGER.info("[TRAIN] algorithm=%s, task=%s", algo, task)
@@ -1,11 +1,15 @@
 """Procedural warehouse generator (Isaac Sim 5.0 namespaces)."""
 from __future__ import annotations
 
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
+import hashlib
+import json
 import logging
 
-from pxr import Usd, UsdGeom, UsdPhysics, Sdf, Gf
+import numpy as np
+from pxr import Usd, UsdGeom, UsdPhysics, Sdf, Gf, Vt
 
 LOGGER = logging.getLogger("warehouse_gen")
 
@@ -19,63 +23,150 @@ def _add_physics_scene(stage: Usd.Stage) -> None:
     UsdPhysics.Scene.Define(stage, Sdf.Path("/World/PhysicsScene"))
 
 
-def _add_ground(stage: Usd.Stage) -> None:
+def _add_ground(stage: Usd.Stage, floor_size: Tuple[float, float] = FLOOR_SIZE) -> None:
     ground = UsdGeom.Mesh.Define(stage, Sdf.Path("/World/Ground"))
-    size_x, size_y = FLOOR_SIZE
-    vertices = [
+    ground.CreatePointsAttr(_ground_points(floor_size))
+    ground.CreateFaceVertexCountsAttr([4])
+    ground.CreateFaceVertexIndicesAttr([0, 1, 2, 3])
+
+
+CubeSpec = Tuple[str, Gf.Vec3f, Gf.Vec3f]  # (prim path, translate, scale)
+BACKENDS = ("usd", "sdf")
+
+
+def _wall(path: str, p0: Gf.Vec3f, p1: Gf.Vec3f, height: float = WALL_HEIGHT) -> CubeSpec:
+    length = (p1 - p0).GetLength()
+    return path, (p0 + p1) * 0.5 + Gf.Vec3f(0, 0, height / 2), Gf.Vec3f(length, 0.1, height)
+
+
+def _rack(path: str, center: Gf.Vec3f) -> CubeSpec:
+    return path, center + Gf.Vec3f(0, 0, 1.0), Gf.Vec3f(0.6, 2.0, 2.0)
+
+
+def _box(path: str, center: Gf.Vec3f) -> CubeSpec:
+    return path, center + Gf.Vec3f(0, 0, 0.25), Gf.Vec3f(0.5, 0.5, 0.5)
+
+
+def _add_cube(stage: Usd.Stage, path: str, translate: Gf.Vec3f, scale: Gf.Vec3f) -> None:
+    cube = UsdGeom.Cube.Define(stage, Sdf.Path(path))
+    cube.AddTranslateOp().Set(translate)
+    cube.AddScaleOp().Set(scale)
+
+
+def warehouse_cubes(
+    floor_size: Tuple[float, float] = FLOOR_SIZE,
+    aisle_width: float = AISLE_WIDTH,
+    rack_spacing: float = RACK_SPACING,
+    wall_height: float = WALL_HEIGHT,
+) -> list[CubeSpec]:
+    """Walls, racks and boxes of the fixed-layout warehouse in authoring order."""
+    size_x, size_y = floor_size
+    cubes = [
+        _wall("/World/Walls/West", Gf.Vec3f(-size_x/2, -size_y/2, 0), Gf.Vec3f(-size_x/2, size_y/2, 0), wall_height),
+        _wall("/World/Walls/East", Gf.Vec3f(size_x/2, -size_y/2, 0), Gf.Vec3f(size_x/2, size_y/2, 0), wall_height),
+        _wall("/World/Walls/South", Gf.Vec3f(-size_x/2, -size_y/2, 0), Gf.Vec3f(size_x/2, -size_y/2, 0), wall_height),
+        _wall("/World/Walls/North", Gf.Vec3f(-size_x/2, size_y/2, 0), Gf.Vec3f(size_x/2, size_y/2, 0), wall_height),
+    ]
+    y = -size_y/2 + rack_spacing
+    idx = 0
+    while y < size_y/2 - rack_spacing:
+        cubes.append(_rack(f"/World/Racks/Rack_{idx}_L", Gf.Vec3f(-aisle_width, y, 0)))
+        cubes.append(_rack(f"/World/Racks/Rack_{idx}_R", Gf.Vec3f(aisle_width, y, 0)))
+        y += rack_spacing
+        idx += 1
+    cubes.append(_box("/World/Boxes/Box_0", Gf.Vec3f(0.0, 0.0, 0.0)))
+    cubes.append(_box("/World/Boxes/Box_1", Gf.Vec3f(1.0, 1.0, 0.0)))
+    return cubes
+
+
+def _ground_points(floor_size: Tuple[float, float]) -> list[Gf.Vec3f]:
+    size_x, size_y = floor_size
+    return [
         Gf.Vec3f(-size_x / 2, -size_y / 2, 0.0),
         Gf.Vec3f(size_x / 2, -size_y / 2, 0.0),
         Gf.Vec3f(size_x / 2, size_y / 2, 0.0),
         Gf.Vec3f(-size_x / 2, size_y / 2, 0.0),
     ]
-    ground.CreatePointsAttr(vertices)
-    ground.CreateFaceVertexCountsAttr([4])
-    ground.CreateFaceVertexIndicesAttr([0, 1, 2, 3])
 
 
-def _add_wall(stage: Usd.Stage, path: str, p0: Gf.Vec3f, p1: Gf.Vec3f) -> None:
-    wall = UsdGeom.Cube.Define(stage, Sdf.Path(path))
-    length = (p1 - p0).GetLength()
-    wall_size = Gf.Vec3f(length, 0.1, WALL_HEIGHT)
-    wall.AddTranslateOp().Set((p0 + p1) * 0.5 + Gf.Vec3f(0, 0, WALL_HEIGHT / 2))
-    wall.AddScaleOp().Set(wall_size)
+# Sdf bulk backend: the same specs UsdGeom/UsdPhysics *.Define + AddXformOp author, written
+# straight into the layer inside one Sdf.ChangeBlock (no per-call composition/notification).
 
+def _sdf_prim(layer: Sdf.Layer, path: str, type_name: str = "") -> Sdf.PrimSpec:
+    spec = layer.GetPrimAtPath(path)
+    if spec is None:
+        parent = Sdf.Path(path).GetParentPath()
+        if parent == Sdf.Path.absoluteRootPath:
+            owner = layer.pseudoRoot
+        else:
+            # like UsdStage.DefinePrim, missing ancestors become typeless defs
+            owner = _sdf_prim(layer, parent.pathString)
+        spec = Sdf.PrimSpec(owner, Sdf.Path(path).name, Sdf.SpecifierDef, type_name)
+    else:
+        spec.specifier = Sdf.SpecifierDef
+        if type_name:
+            spec.typeName = type_name
+    return spec
 
-def _add_rack(stage: Usd.Stage, path: str, center: Gf.Vec3f) -> None:
-    rack = UsdGeom.Cube.Define(stage, Sdf.Path(path))
-    rack.AddTranslateOp().Set(center + Gf.Vec3f(0, 0, 1.0))
-    rack.AddScaleOp().Set(Gf.Vec3f(0.6, 2.0, 2.0))
 
+def _sdf_attr(prim: Sdf.PrimSpec, name: str, type_name, value, uniform: bool = False) -> None:
+    variability = Sdf.VariabilityUniform if uniform else Sdf.VariabilityVarying
+    attr = Sdf.AttributeSpec(prim, name, type_name, variability)
+    if value is not None:
+        attr.default = value
 
-def _add_box(stage: Usd.Stage, path: str, center: Gf.Vec3f) -> None:
-    box = UsdGeom.Cube.Define(stage, Sdf.Path(path))
-    box.AddTranslateOp().Set(center + Gf.Vec3f(0, 0, 0.25))
-    box.AddScaleOp().Set(Gf.Vec3f(0.5, 0.5, 0.5))
 
+_XFORM_ORDER = Vt.TokenArray(["xformOp:translate", "xformOp:scale"])
 
-def build_warehouse(stage: Usd.Stage, save_usd_path: Optional[Path] = None) -> Optional[Path]:
-    world = stage.DefinePrim("/World", "Xform")
-    stage.SetDefaultPrim(world)
 
-    _add_physics_scene(stage)
-    _add_ground(stage)
+def author_warehouse_layer(
+    layer: Sdf.Layer,
+    floor_size: Tuple[float, float] = FLOOR_SIZE,
+    aisle_width: float = AISLE_WIDTH,
+    rack_spacing: float = RACK_SPACING,
+    wall_height: float = WALL_HEIGHT,
+) -> Sdf.Layer:
+    """Author build_warehouse's prims directly into an (empty) layer in one change block."""
+    vt = Sdf.ValueTypeNames
+    with Sdf.ChangeBlock():
+        _sdf_prim(layer, "/World", "Xform")
+        layer.defaultPrim = "World"
+        _sdf_prim(layer, "/World/PhysicsScene", "PhysicsScene")
+        ground = _sdf_prim(layer, "/World/Ground", "Mesh")
+        _sdf_attr(ground, "points", vt.Point3fArray, Vt.Vec3fArray(_ground_points(floor_size)))
+        _sdf_attr(ground, "faceVertexCounts", vt.IntArray, Vt.IntArray([4]))
+        _sdf_attr(ground, "faceVertexIndices", vt.IntArray, Vt.IntArray([0, 1, 2, 3]))
+        for path, translate, scale in warehouse_cubes(floor_size, aisle_width, rack_spacing, wall_height):
+            cube = _sdf_prim(layer, path, "Cube")
+            _sdf_attr(cube, "xformOp:translate", vt.Double3, Gf.Vec3d(translate))
+            _sdf_attr(cube, "xformOpOrder", vt.TokenArray, _XFORM_ORDER, uniform=True)
+            _sdf_attr(cube, "xformOp:scale", vt.Float3, scale)
+    return layer
 
-    size_x, size_y = FLOOR_SIZE
-    _add_wall(stage, "/World/Walls/West", Gf.Vec3f(-size_x/2, -size_y/2, 0), Gf.Vec3f(-size_x/2, size_y/2, 0))
-    _add_wall(stage, "/World/Walls/East", Gf.Vec3f(size_x/2, -size_y/2, 0), Gf.Vec3f(size_x/2, size_y/2, 0))
-    _add_wall(stage, "/World/Walls/South", Gf.Vec3f(-size_x/2, -size_y/2, 0), Gf.Vec3f(size_x/2, -size_y/2, 0))
-    _add_wall(stage, "/World/Walls/North", Gf.Vec3f(-size_x/2, size_y/2, 0), Gf.Vec3f(size_x/2, size_y/2, 0))
 
-    y = -size_y/2 + RACK_SPACING
-    idx = 0
-    while y < size_y/2 - RACK_SPACING:
-        _add_rack(stage, f"/World/Racks/Rack_{idx}_L", Gf.Vec3f(-AISLE_WIDTH, y, 0))
-        _add_rack(stage, f"/World/Racks/Rack_{idx}_R", Gf.Vec3f(AISLE_WIDTH, y, 0))
-        y += RACK_SPACING
-        idx += 1
+def build_warehouse(
+    stage: Usd.Stage,
+    save_usd_path: Optional[Path] = None,
+    backend: str = "usd",
+    floor_size: Tuple[float, float] = FLOOR_SIZE,
+    aisle_width: float = AISLE_WIDTH,
+    rack_spacing: float = RACK_SPACING,
+    wall_height: float = WALL_HEIGHT,
+) -> Optional[Path]:
+    """Author the fixed-layout warehouse on stage. backend="sdf" writes the identical specs into
+    the root layer through author_warehouse_layer (much cheaper for many variants)."""
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown warehouse backend '{backend}' (expected one of {BACKENDS})")
+    if backend == "sdf":
+        author_warehouse_layer(stage.GetRootLayer(), floor_size, aisle_width, rack_spacing, wall_height)
+    else:
+        world = stage.DefinePrim("/World", "Xform")
+        stage.SetDefaultPrim(world)
 
-    _add_box(stage, "/World/Boxes/Box_0", Gf.Vec3f(0.0, 0.0, 0.0))
-    _add_box(stage, "/World/Boxes/Box_1", Gf.Vec3f(1.0, 1.0, 0.0))
+        _add_physics_scene(stage)
+        _add_ground(stage, floor_size)
+        for cube in warehouse_cubes(floor_size, aisle_width, rack_spacing, wall_height):
+            _add_cube(stage, *cube)
 
     if save_usd_path:
         save_usd_path.parent.mkdir(parents=True, exist_ok=True)
@@ -83,3 +174,210 @@ def build_warehouse(stage: Usd.Stage, save_usd_path: Optional[Path] = None) -> O
         LOGGER.info("Warehouse saved: %s", save_usd_path)
         return save_usd_path
     return None
+
+
+def export_warehouse(save_usd_path: Path, **layout) -> Path:
+    """Bulk path without a stage: author into an anonymous layer and export it (format from
+    the extension). layout takes build_warehouse's floor_size/aisle_width/rack_spacing/wall_height."""
+    layer = author_warehouse_layer(Sdf.Layer.CreateAnonymous(".usda"), **layout)
+    save_usd_path.parent.mkdir(parents=True, exist_ok=True)
+    if not layer.Export(str(save_usd_path)):
+        raise OSError(f"could not export warehouse to {save_usd_path}")
+    return save_usd_path
+
+
+# Parametric generator ---------------------------------------------------------
+# Props are racks (upright back frame), shelves (planks, shelf_levels per rack) and boxes
+# (box_slots per shelf, filled with probability box_fill). Two authoring modes share one
+# layout: "instanced" emits a single UsdGeom.PointInstancer with one prototype per prop kind,
+# "prims" defines one Cube prim per prop (the build_warehouse style).
+
+PROP_KINDS = ("Rack", "Shelf", "Box")
+WALL_THICKNESS = 0.1
+GENERATOR_MODES = ("instanced", "prims")
+
+
+@dataclass(frozen=True)
+class WarehouseParams:
+    floor_size: Tuple[float, float] = FLOOR_SIZE
+    aisle_count: int = 4          # aisles between rack rows (aisle_count + 1 rows along y)
+    rack_density: float = 0.8     # fraction of rack slots along each row that hold a rack
+    box_fill: float = 0.5         # fraction of shelf box slots that hold a box
+    shelf_levels: int = 4
+    box_slots: int = 4            # box slots per shelf
+    rack_length: float = 2.0
+    rack_depth: float = 0.8
+    rack_height: float = 2.4
+    wall_height: float = WALL_HEIGHT
+    margin: float = 1.5           # free border between the walls and the rack rows
+    seed: int = 0
+
+    @property
+    def prop_dims(self) -> Dict[str, Tuple[float, float, float]]:
+        """Full extents (x, y, z) of each prototype before per-instance scaling."""
+        box = 0.8 * min(self.rack_depth, self.rack_length / max(1, self.box_slots))
+        return {
+            "Rack": (0.05, self.rack_length, self.rack_height),
+            "Shelf": (self.rack_depth, self.rack_length, 0.04),
+            "Box": (box, box, box),
+        }
+
+
+def warehouse_layout(params: WarehouseParams) -> Dict[str, np.ndarray]:
+    """Prop placement for params: positions (N, 3) float32 (prop centers), proto_indices (N,)
+    int32 into PROP_KINDS and scales (N, 3) float32 applied to the prototype dims."""
+    rng = np.random.default_rng(params.seed)
+    size_x, size_y = params.floor_size
+    rows = max(1, int(params.aisle_count) + 1)
+    half_x = max(0.0, size_x / 2 - params.margin - params.rack_depth / 2)
+    row_x = np.linspace(-half_x, half_x, rows) if rows > 1 else np.zeros(1)
+    slots = max(0, int((size_y - 2 * params.margin) // params.rack_length))
+    slot_y = (np.arange(slots) - (slots - 1) / 2.0) * params.rack_length
+    gx, gy = np.meshgrid(row_x, slot_y, indexing="ij")
+    keep = rng.random(gx.shape) < params.rack_density
+    rack_xy = np.stack([gx[keep], gy[keep]], axis=1)
+    n_racks = len(rack_xy)
+
+    dims = params.prop_dims
+    levels = max(0, int(params.shelf_levels))
+    level_z = (np.arange(levels) + 1) * (params.rack_height / (levels + 1))
+    racks = np.column_stack([rack_xy[:, 0] - params.rack_depth / 2, rack_xy[:, 1],
+                             np.full(n_racks, params.rack_height / 2)])
+    shelves = np.column_stack([np.repeat(rack_xy, levels, axis=0), np.tile(level_z, n_racks)])
+
+    slots_per_shelf = max(0, int(params.box_slots))
+    pitch = params.rack_length / max(1, slots_per_shelf)
+    offs = (np.arange(slots_per_shelf) - (slots_per_shelf - 1) / 2.0) * pitch
+    box_all = np.repeat(shelves, slots_per_shelf, axis=0)
+    box_all[:, 1] += np.tile(offs, len(shelves))
+    filled = rng.random(len(box_all)) < params.box_fill
+    box_scale = rng.uniform(0.7, 1.0, size=(int(filled.sum()), 1)).repeat(3, axis=1)
+    boxes = box_all[filled]
+    boxes[:, 2] += dims["Shelf"][2] / 2 + box_scale[:, 2] * dims["Box"][2] / 2
+
+    positions = np.concatenate([racks, shelves, boxes]).astype(np.float32)
+    proto_indices = np.concatenate([
+        np.full(len(racks), 0), np.full(len(shelves), 1), np.full(len(boxes), 2)]).astype(np.int32)
+    scales = np.ones_like(positions)
+    scales[len(racks) + len(shelves):] = box_scale
+    return {"positions": positions, "proto_indices": proto_indices, "scales": scales}
+
+
+def _add_shell(stage: Usd.Stage, params: WarehouseParams) -> None:
+    world = stage.DefinePrim("/World", "Xform")
+    stage.SetDefaultPrim(world)
+    _add_physics_scene(stage)
+    _add_ground(stage, params.floor_size)
+    size_x, size_y = params.floor_size
+    h, t = params.wall_height, WALL_THICKNESS
+    # Cube prims have size 2, so the scale op holds half extents
+    walls = {
+        "West": ((-size_x / 2, 0.0), (t / 2, size_y / 2)),
+        "East": ((size_x / 2, 0.0), (t / 2, size_y / 2)),
+        "South": ((0.0, -size_y / 2), (size_x / 2, t / 2)),
+        "North": ((0.0, size_y / 2), (size_x / 2, t / 2)),
+    }
+    for name, ((cx, cy), (hx, hy)) in walls.items():
+        _add_cube(stage, f"/World/Walls/{name}", Gf.Vec3f(cx, cy, h / 2), Gf.Vec3f(hx, hy, h / 2))
+
+
+def _author_instanced(stage: Usd.Stage, params: WarehouseParams, layout: Dict[str, np.ndarray]) -> None:
+    inst = UsdGeom.PointInstancer.Define(stage, Sdf.Path("/World/Props"))
+    rel = inst.CreatePrototypesRel()
+    dims = params.prop_dims
+    for kind in PROP_KINDS:
+        proto = UsdGeom.Cube.Define(stage, Sdf.Path(f"/World/Props/Prototypes/{kind}"))
+        proto.CreateSizeAttr(1.0)
+        proto.AddScaleOp().Set(Gf.Vec3f(*dims[kind]))
+        rel.AddTarget(proto.GetPath())
+    pos = layout["positions"]
+    inst.CreatePositionsAttr(Vt.Vec3fArray.FromNumpy(pos))
+    inst.CreateProtoIndicesAttr(Vt.IntArray.FromNumpy(layout["proto_indices"]))
+    inst.CreateScalesAttr(Vt.Vec3fArray.FromNumpy(layout["scales"]))
+    if len(pos):
+        # conservative bound: every prop center padded by the largest prototype half-extent
+        pad = 0.5 * max(max(d) for d in dims.values())
+        lo, hi = pos.min(axis=0) - pad, pos.max(axis=0) + pad
+        inst.CreateExtentAttr(Vt.Vec3fArray([Gf.Vec3f(*lo.tolist()), Gf.Vec3f(*hi.tolist())]))
+
+
+def _author_prims(stage: Usd.Stage, params: WarehouseParams, layout: Dict[str, np.ndarray]) -> None:
+    dims = {k: np.asarray(v, dtype=np.float32) for k, v in params.prop_dims.items()}
+    counts = {kind: 0 for kind in PROP_KINDS}
+    for p, k, s in zip(layout["positions"].tolist(), layout["proto_indices"].tolist(), layout["scales"]):
+        kind = PROP_KINDS[k]
+        cube = UsdGeom.Cube.Define(stage, Sdf.Path(f"/World/Props/{kind}s/{kind}_{counts[kind]}"))
+        counts[kind] += 1
+        cube.CreateSizeAttr(1.0)
+        cube.AddTranslateOp().Set(Gf.Vec3d(*p))
+        cube.AddScaleOp().Set(Gf.Vec3f(*(dims[kind] * s).tolist()))
+
+
+def build_warehouse_from_params(
+    stage: Usd.Stage,
+    params: WarehouseParams = WarehouseParams(),
+    mode: str = "instanced",
+    save_usd_path: Optional[Path] = None,
+) -> int:
+    """Author a parametric warehouse (floor, walls, racks, shelves, boxes) and return the prop
+    count. mode="instanced" emits all props through one PointInstancer (three prototypes);
+    mode="prims" defines one Cube prim per prop."""
+    if mode not in GENERATOR_MODES:
+        raise ValueError(f"unknown generator mode '{mode}' (expected one of {GENERATOR_MODES})")
+    layout = warehouse_layout(params)
+    _add_shell(stage, params)
+    if mode == "instanced":
+        _author_instanced(stage, params, layout)
+    else:
+        _author_prims(stage, params, layout)
+    if save_usd_path:
+        save_usd_path.parent.mkdir(parents=True, exist_ok=True)
+        stage.GetRootLayer().Export(str(save_usd_path))
+        LOGGER.info("Warehouse saved: %s (%d props, %s)", save_usd_path, len(layout["positions"]), mode)
+    return len(layout["positions"])
+
+
+# Seeded layout variants ---------------------------------------------------------
+# Bump VARIANT_FORMAT whenever warehouse_layout/authoring changes so cached variants rebuild.
+VARIANT_FORMAT = 2
+
+
+def sample_variant(seed: int, base: WarehouseParams = WarehouseParams()) -> WarehouseParams:
+    """Deterministic layout variant for seed: floor size, aisle count, rack density, box fill
+    and shelf levels are drawn around base; seed also drives rack/box placement."""
+    rng = np.random.default_rng([VARIANT_FORMAT, int(seed)])
+    size_x = float(np.round(rng.uniform(0.8, 2.5) * base.floor_size[0] * 2) / 2)
+    size_y = float(np.round(rng.uniform(0.8, 2.5) * base.floor_size[1] * 2) / 2)
+    max_aisles = max(1, int((size_x - 2 * base.margin) // (base.rack_depth + AISLE_WIDTH)))
+    return replace(
+        base,
+        floor_size=(size_x, size_y),
+        aisle_count=int(rng.integers(1, max_aisles + 1)),
+        rack_density=float(np.round(rng.uniform(0.4, 1.0), 3)),
+        box_fill=float(np.round(rng.uniform(0.1, 0.9), 3)),
+        shelf_levels=int(rng.integers(2, 6)),
+        seed=int(seed),
+    )
+
+
+def variant_key(params: WarehouseParams, mode: str = "instanced") -> str:
+    """Content address of a generated variant (params, authoring mode, generator format)."""
+    blob = json.dumps({"params": asdict(params), "mode": mode, "format": VARIANT_FORMAT}, sort_keys=True)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+__all__ = [
+    "BACKENDS",
+    "WarehouseParams",
+    "author_warehouse_layer",
+    "export_warehouse",
+    "warehouse_cubes",
+    "sample_variant",
+    "variant_key",
+    "VARIANT_FORMAT",
+    "warehouse_layout",
+    "build_warehouse",
+    "build_warehouse_from_params",
+    "PROP_KINDS",
+    "GENERATOR_MODES",
+]
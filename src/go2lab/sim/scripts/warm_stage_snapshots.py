@@ -0,0 +1,118 @@
+"""Build flattened stage snapshots for every environment in env/registry.yaml.
+
+Each registry entry (plus the default/WAREHOUSE_USD warehouse) is resolved like the runners
+do -- remote specs through the asset cache -- then composed and flattened into the snapshot
+cache (go2lab.sim.util.stage_snapshot). Afterwards GO2LAB_STAGE_SNAPSHOT=1 startups open the
+snapshot directly; pass --with-go2 to bake the spawned GO2 in (GO2LAB_SNAPSHOT_GO2=1).
+
+omniverse:// specs need Kit's client library: pass --kit to start a headless SimulationApp.
+--list prints the cached snapshots, --prune applies size/age eviction, --clear drops all.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from pathlib import Path
+
+LOGGER = logging.getLogger("warm_stage_snapshots")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--kit", action="store_true", help="Start a headless SimulationApp (needed for omniverse:// specs)")
+    p.add_argument("--with-go2", action="store_true", default=None, help="Include the spawned GO2 (default: GO2LAB_SNAPSHOT_GO2)")
+    p.add_argument("--rebuild", action="store_true", help="Rebuild even if a valid snapshot exists")
+    p.add_argument("--list", action="store_true", help="List cached snapshots and exit")
+    p.add_argument("--prune", action="store_true", help="Apply size/age eviction and exit")
+    p.add_argument("--clear", action="store_true", help="Remove every snapshot and exit")
+    p.add_argument("--max-mb", type=float, default=None, help="Override GO2LAB_SNAPSHOT_MAX_MB")
+    p.add_argument("--max-age-days", type=float, default=None, help="Override GO2LAB_SNAPSHOT_MAX_AGE_DAYS")
+    p.add_argument("--cache-dir", type=str, default=None, help="Override GO2LAB_SNAPSHOT_DIR")
+    p.add_argument("envs", nargs="*", help="Registry names or USD specs (default: all registry entries)")
+    return p.parse_args()
+
+
+def _collect(envs: list[str]) -> dict[str, str]:
+    from go2lab.config import get_warehouse_spec
+    from go2lab.env_registry import default_registry
+
+    reg = default_registry()
+    if envs:
+        return {name: reg.expanded_usd(name) for name in envs}
+    specs = {name: reg.expanded_usd(name) for name in reg.names()}
+    specs.setdefault("warehouse", get_warehouse_spec())
+    return specs
+
+
+def _list(cache) -> None:
+    entries = cache.index["entries"]
+    now = time.time()
+    for key, e in sorted(entries.items(), key=lambda kv: -kv[1]["last_used"]):
+        LOGGER.info("%s  %7.1f MiB  %3d layers  used %5.1fh ago  %s%s", key[:12], e["size"] / 2**20,
+                    len(e["deps"]), (now - e["last_used"]) / 3600.0, e["spec"], " +go2" if "go2" in e["params"] else "")
+    LOGGER.info("Stage snapshots: %s (%d entries, %.1f MiB)", cache.root, len(entries), cache.total_bytes / 2**20)
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    app = None
+    if args.kit:
+        try:
+            from isaacsim import SimulationApp  # type: ignore
+        except Exception:
+            from isaacsim.simulation_app import SimulationApp  # type: ignore
+        app = SimulationApp({"headless": True})
+    try:
+        from go2lab.sim.util.stage_snapshot import StageSnapshotCache, go2_populator, snapshot_go2
+        from go2lab.sim.util.usd_path import resolve_usd_spec
+
+        cache = StageSnapshotCache(
+            root=args.cache_dir,
+            max_bytes=args.max_mb * 2**20 if args.max_mb is not None else None,
+            max_age_s=args.max_age_days * 86400.0 if args.max_age_days is not None else None,
+        )
+        if args.clear:
+            cache.clear()
+            LOGGER.info("Cleared %s", cache.root)
+            return 0
+        if args.prune:
+            LOGGER.info("Evicted %d snapshots", len(cache.prune()))
+            _list(cache)
+            return 0
+        if args.list:
+            _list(cache)
+            return 0
+
+        repo_root = Path(__file__).resolve().parents[4]
+        with_go2 = snapshot_go2() if args.with_go2 is None else args.with_go2
+        params, populate = go2_populator(repo_root) if with_go2 else ({}, None)
+        failed = 0
+        for name, spec in _collect(args.envs).items():
+            kind, target, ok = resolve_usd_spec(spec, repo_root)
+            if kind != "path" or not ok:
+                failed += 1
+                LOGGER.error("%-28s unresolved  %s (%s)", name, spec, "asset cache disabled" if kind == "url" else "not found")
+                continue
+            t0 = time.perf_counter()
+            try:
+                if args.rebuild:
+                    path, hit = cache.build(target, params, populate), False
+                else:
+                    path, hit = cache.get(target, params, populate)
+            except Exception as exc:
+                failed += 1
+                LOGGER.error("%-28s FAILED      %s (%s)", name, spec, exc)
+                continue
+            LOGGER.info("%-28s %-11s %s -> %s [%.1f MiB, %.2fs]", name, "cached" if hit else "built", spec,
+                        Path(path).name, Path(path).stat().st_size / 2**20, time.perf_counter() - t0)
+        _list(cache)
+        return 1 if failed else 0
+    finally:
+        if app is not None:
+            app.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,270 @@
+"""Local content-addressed cache for remote USD assets (GO2, Isaac Lab warehouse, ...).
+
+Remote specs (omniverse://, http(s)://) are downloaded once into
+    <cache>/objects/<sha256[:16]>/<basename>
+and recorded in <cache>/manifest.json (spec -> content hash, local path, dependencies).
+USD layers are localized recursively: every sublayer/reference/payload/asset path they
+contain is fetched the same way and rewritten to a relative path inside the cache, so a
+cached layer opens without the network.
+
+Environment:
+- GO2LAB_ASSET_CACHE_DIR: cache location (default <repo>/.asset_cache)
+- GO2LAB_ASSET_CACHE=0: disable the cache (remote specs are returned unchanged)
+- GO2LAB_OFFLINE=1: never fetch; a spec missing from the cache is reported as not found
+
+Populate the cache ahead of time with sim/scripts/prefetch_assets.py.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+LOGGER = logging.getLogger("go2lab.asset_cache")
+
+CACHE_DIR_ENV = "GO2LAB_ASSET_CACHE_DIR"
+CACHE_ENABLE_ENV = "GO2LAB_ASSET_CACHE"
+OFFLINE_ENV = "GO2LAB_OFFLINE"
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[4] / ".asset_cache"
+REMOTE_PREFIXES = ("omniverse://", "omni://", "http://", "https://")
+LAYER_EXTS = (".usd", ".usda", ".usdc")
+MANIFEST_NAME = "manifest.json"
+_FETCH_TIMEOUT_S = 60.0
+
+
+class AssetCacheMiss(FileNotFoundError):
+    """Raised in offline mode when a remote spec has no cached copy."""
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    v = os.environ.get(name)
+    if v is None or not v.strip():
+        return default
+    return v.strip().lower() not in ("0", "false", "no", "off")
+
+
+def is_offline() -> bool:
+    return _env_flag(OFFLINE_ENV, False)
+
+
+def cache_enabled() -> bool:
+    return _env_flag(CACHE_ENABLE_ENV, True)
+
+
+def is_remote(spec: str) -> bool:
+    return spec.startswith(REMOTE_PREFIXES)
+
+
+def _anchor(spec: str, path: str) -> str:
+    """Resolve an asset path found in the layer at spec (relative paths are anchored to it)."""
+    if is_remote(path) or os.path.isabs(path) or "://" in path:
+        return path
+    u = urlparse(spec)
+    base = path if path.startswith("/") else posixpath.join(posixpath.dirname(u.path), path)
+    return f"{u.scheme}://{u.netloc}{posixpath.normpath(base)}"
+
+
+def _read_remote(url: str) -> bytes:
+    if url.startswith(("http://", "https://")):
+        from urllib.request import urlopen
+
+        with urlopen(url, timeout=_FETCH_TIMEOUT_S) as resp:
+            return resp.read()
+    # omniverse:// needs the Kit client library (available inside Isaac Sim)
+    import omni.client  # type: ignore
+
+    result, _version, content = omni.client.read_file(url)
+    if result != omni.client.Result.OK:
+        raise OSError(f"omni.client.read_file({url}) failed: {result}")
+    return memoryview(content).tobytes()
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class AssetCache:
+    def __init__(self, root: Path | str | None = None, offline: bool | None = None):
+        self.root = Path(root or os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR)
+        self.offline = is_offline() if offline is None else bool(offline)
+        self._manifest_path = self.root / MANIFEST_NAME
+        self._manifest: Optional[Dict[str, dict]] = None
+
+    # manifest -------------------------------------------------------------
+    @property
+    def manifest(self) -> Dict[str, dict]:
+        if self._manifest is None:
+            try:
+                self._manifest = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._manifest = {}
+        return self._manifest
+
+    def _save_manifest(self) -> None:
+        data = json.dumps(self.manifest, indent=2, sort_keys=True).encode("utf-8")
+        _atomic_write(self._manifest_path, data)
+
+    # lookup / fetch -------------------------------------------------------
+    def lookup(self, spec: str) -> Optional[str]:
+        """Local path of a cached spec (and all its recorded dependencies), or None."""
+        entry = self.manifest.get(spec)
+        if not entry:
+            return None
+        path = self.root / entry["path"]
+        if not path.exists():
+            return None
+        for dep in entry.get("deps", ()):
+            dep_entry = self.manifest.get(dep)
+            if not dep_entry or not (self.root / dep_entry["path"]).exists():
+                return None
+        return str(path)
+
+    def get(self, spec: str) -> str:
+        """Local path for spec, fetching it (and its dependencies) unless offline."""
+        if not is_remote(spec):
+            return spec
+        local = self.lookup(spec)
+        if local is not None:
+            return local
+        if self.offline:
+            raise AssetCacheMiss(f"offline mode: '{spec}' is not in the asset cache {self.root} (run prefetch_assets)")
+        return self.fetch(spec)
+
+    def fetch(self, spec: str, refresh: bool = False, reader: Callable[[str], bytes] | None = None) -> str:
+        """Download spec and its dependency closure into the cache and return the local path.
+
+        reader(url) -> bytes replaces the network read (e.g. with blobs already downloaded by
+        go2lab.sim.util.stage_prefetch)."""
+        if self.offline:
+            raise AssetCacheMiss(f"offline mode: refusing to fetch '{spec}'")
+        t0 = time.perf_counter()
+        local = self._fetch(spec, {}, refresh, reader or _read_remote)
+        self._save_manifest()
+        LOGGER.info("Cached %s -> %s (%.1fs)", spec, local, time.perf_counter() - t0)
+        return str(local)
+
+    def _fetch(self, spec: str, visiting: Dict[str, Path], refresh: bool, reader: Callable[[str], bytes]) -> Path:
+        if spec in visiting:
+            return visiting[spec]
+        if not refresh:
+            hit = self.lookup(spec)
+            if hit is not None:
+                visiting[spec] = Path(hit)
+                return visiting[spec]
+
+        data = reader(spec)
+        digest = hashlib.sha256(data).hexdigest()
+        name = posixpath.basename(urlparse(spec).path) or "asset"
+        rel = Path("objects") / digest[:16] / name
+        local = self.root / rel
+        visiting[spec] = local
+        if not local.exists() or refresh:
+            _atomic_write(local, data)
+
+        deps: List[str] = []
+        if name.lower().endswith(LAYER_EXTS):
+            deps = self._localize_layer(spec, local, visiting, refresh, reader)
+        self.manifest[spec] = {
+            "sha256": digest,
+            "path": rel.as_posix(),
+            "size": len(data),
+            "deps": deps,
+            "fetched": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        return local
+
+    def _localize_layer(self, spec: str, local: Path, visiting: Dict[str, Path], refresh: bool,
+                        reader: Callable[[str], bytes]) -> List[str]:
+        # rewrite every asset path in the layer to the cached copy of its anchored remote target
+        from pxr import Sdf, UsdUtils  # type: ignore
+
+        try:
+            layer = Sdf.Layer.FindOrOpen(str(local))
+        except Exception as exc:
+            LOGGER.warning("Cached file %s could not be parsed as a USD layer: %s", local, exc)
+            layer = None
+        if layer is None:
+            LOGGER.warning("Cached file is not a readable USD layer: %s", local)
+            return []
+        if refresh:
+            layer.Reload(force=True)
+        deps: List[str] = []
+
+        def _rewrite(path: str) -> str:
+            if not path or "<UDIM>" in path:
+                return path
+            target = _anchor(spec, path)
+            if not is_remote(target):
+                return path
+            try:
+                dep_local = self._fetch(target, visiting, refresh, reader)
+            except Exception as exc:
+                LOGGER.warning("Could not cache dependency %s of %s: %s", target, spec, exc)
+                return path
+            if target not in deps:
+                deps.append(target)
+            return Path(os.path.relpath(dep_local, local.parent)).as_posix()
+
+        UsdUtils.ModifyAssetPaths(layer, _rewrite)
+        if layer.dirty:
+            layer.Save()
+        return deps
+
+
+_DEFAULT: Optional[AssetCache] = None
+_FAILED: set = set()
+
+
+def default_cache() -> AssetCache:
+    """Process-wide cache configured from the environment."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = AssetCache()
+    return _DEFAULT
+
+
+def cached_asset(spec: str) -> str:
+    """Local cached path for a remote spec, or the spec unchanged when the cache is disabled
+    or the asset cannot be fetched online. Raises AssetCacheMiss in offline mode."""
+    if not is_remote(spec) or not cache_enabled():
+        return spec
+    if spec in _FAILED:
+        return spec
+    cache = default_cache()
+    try:
+        return cache.get(spec)
+    except AssetCacheMiss:
+        raise
+    except Exception as exc:
+        # remember the failure so repeated resolves in one process do not retry the fetch
+        _FAILED.add(spec)
+        LOGGER.warning("Asset cache fetch failed for %s (%s); using the remote spec", spec, exc)
+        return spec
+
+
+__all__ = [
+    "AssetCache",
+    "AssetCacheMiss",
+    "cached_asset",
+    "default_cache",
+    "is_offline",
+    "cache_enabled",
+]
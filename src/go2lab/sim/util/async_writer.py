@@ -0,0 +1,242 @@
+"""Asynchronous frame writer: a bounded queue drained by a pool of writer threads.
+
+The sim loop hands each captured frame to AsyncFrameWriter.submit(), which only enqueues it;
+writer threads run the (blocking) write function, so disk stalls no longer stall
+app.update(). File writes, PNG/zlib compression and np.save release the GIL, so threads
+are enough to overlap them with the sim loop.
+
+When the queue is full, the backpressure policy decides:
+- "block": submit() waits for a free slot (nothing is lost, the loop slows down)
+- "drop_oldest": the oldest queued frame is discarded to make room
+- "downsample": only every stride-th frame is accepted; the stride doubles each time the
+  queue fills up and halves again once it drains below a quarter
+
+stats() reports queue depth (current / max), write latency (mean / p50 / p95 / max) and the
+number of frames written, dropped and skipped. frame_file_writer() is the write function used
+by dataset_recorder: BasicWriter-style per-frame files (or .g2c blobs for channels with a
+go2lab.sim.util.channel_codecs codec), segmentation id -> label maps as <name>_labels_XXXX.json,
+plus a meta.jsonl line for frames that carry a "meta" dict.
+"""
+from __future__ import annotations
+
+import collections
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+LOGGER = logging.getLogger("go2lab.async_writer")
+
+BACKPRESSURE_POLICIES = ("block", "drop_oldest", "downsample")
+_LATENCY_WINDOW = 1024
+
+
+class AsyncFrameWriter:
+    """write_fn(index, frame) runs on `workers` threads; at most `maxsize` frames wait in the queue."""
+
+    def __init__(self, write_fn: Callable[[int, Any], None], workers: int = 2, maxsize: int = 64,
+                 policy: str = "drop_oldest", name: str = "frame-writer"):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"unknown backpressure policy {policy!r} (expected one of {BACKPRESSURE_POLICIES})")
+        self.write_fn = write_fn
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self.stride = 1
+        self._queue: collections.deque = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._busy = 0
+        self._latency: collections.deque = collections.deque(maxlen=_LATENCY_WINDOW)
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+        self.submitted = self.written = self.dropped = self.skipped = self.failed = 0
+        self.max_depth = 0
+        self._threads = [threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+                         for i in range(max(1, int(workers)))]
+        for t in self._threads:
+            t.start()
+
+    # producer side -------------------------------------------------------
+    def submit(self, index: int, frame: Any) -> bool:
+        """Queue a frame; False when the policy skipped or had to drop it (never raises on a full queue)."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("AsyncFrameWriter is closed")
+            self.submitted += 1
+            if self.policy == "downsample":
+                if len(self._queue) < self.maxsize // 4 and self.stride > 1:
+                    self.stride //= 2
+                if index % self.stride:
+                    self.skipped += 1
+                    return False
+                if len(self._queue) >= self.maxsize:
+                    self.stride *= 2
+                    self.skipped += 1
+                    return False
+            elif self.policy == "drop_oldest":
+                if len(self._queue) >= self.maxsize:
+                    self._queue.popleft()
+                    self.dropped += 1
+            else:
+                while len(self._queue) >= self.maxsize and not self._closed:
+                    self._cond.wait()
+            self._queue.append((index, frame, time.perf_counter()))
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._cond.notify_all()
+            return True
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    # consumer side -------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                index, frame, _ = self._queue.popleft()
+                self._busy += 1
+                self._cond.notify_all()
+            t0 = time.perf_counter()
+            ok = True
+            try:
+                self.write_fn(index, frame)
+            except Exception:
+                ok = False
+                LOGGER.exception("Writing frame %d failed", index)
+            dt = time.perf_counter() - t0
+            with self._cond:
+                self._busy -= 1
+                if ok:
+                    self.written += 1
+                else:
+                    self.failed += 1
+                self._latency.append(dt)
+                self._latency_sum += dt
+                self._latency_max = max(self._latency_max, dt)
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued frame is written; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Drain the queue, stop the workers and return the final stats()."""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+        return self.stats()
+
+    def __enter__(self) -> "AsyncFrameWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            lat = np.asarray(self._latency, dtype=np.float64)
+            done = self.written + self.failed
+            return {
+                "policy": self.policy,
+                "depth": len(self._queue),
+                "max_depth": self.max_depth,
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "skipped": self.skipped,
+                "failed": self.failed,
+                "stride": self.stride,
+                "latency_ms_mean": 1e3 * self._latency_sum / done if done else 0.0,
+                "latency_ms_p50": 1e3 * float(np.percentile(lat, 50)) if lat.size else 0.0,
+                "latency_ms_p95": 1e3 * float(np.percentile(lat, 95)) if lat.size else 0.0,
+                "latency_ms_max": 1e3 * self._latency_max,
+            }
+
+
+def _save_png(path: Path, image: np.ndarray) -> bool:
+    try:
+        from PIL import Image  # type: ignore
+    except ImportError:
+        return False
+    Image.fromarray(image).save(path, compress_level=1)
+    return True
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps default= for annotator info dicts (NumPy scalars / arrays)."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def frame_file_writer(out_dir: Path | str, meta_name: str = "meta.jsonl",
+                      encode: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+                      ) -> Callable[[int, Dict[str, Any]], None]:
+    """Write function for frames {"arrays": {name: ndarray}, "labels": {name: dict}, "meta": dict}.
+
+    uint8 RGB(A) images become <name>_<index:04d>.png (when PIL is available), every other array
+    <name>_<index:04d>.npy, like BasicWriter's layout; "labels" (segmentation annotator "info",
+    e.g. idToLabels) go to <name>_labels_<index:04d>.json next to the mask; "meta" is appended to meta.jsonl as one
+    line (with "frame": index), in completion order under a lock. `encode` (e.g.
+    channel_codecs.ProcessEncoder.encode) may turn arrays into blobs, written as <name>_<index:04d>.g2c.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    lock = threading.Lock()
+    meta_file = []  # opened on the first meta line
+
+    def write(index: int, frame: Dict[str, Any]) -> None:
+        arrays = frame.get("arrays", {})
+        for name, arr in (encode(arrays) if encode is not None else arrays).items():
+            stem = out / f"{name}_{index:04d}"
+            if isinstance(arr, bytes):
+                stem.with_suffix(".g2c").write_bytes(arr)
+                continue
+            arr = np.asarray(arr)
+            is_image = arr.dtype == np.uint8 and arr.ndim == 3 and arr.shape[2] in (3, 4)
+            if not (is_image and _save_png(stem.with_suffix(".png"), arr)):
+                np.save(stem.with_suffix(".npy"), arr)
+        for name, info in frame.get("labels", {}).items():
+            (out / f"{name}_labels_{index:04d}.json").write_text(json.dumps(info, default=json_default),
+                                                                  encoding="utf-8")
+        meta = frame.get("meta")
+        if meta is not None:
+            line = json.dumps({"frame": index, **meta}) + "\n"
+            with lock:
+                if not meta_file:
+                    meta_file.append((out / meta_name).open("a", encoding="utf-8"))
+                meta_file[0].write(line)
+                meta_file[0].flush()
+
+    def close() -> None:
+        with lock:
+            while meta_file:
+                meta_file.pop().close()
+
+    write.close = close  # type: ignore[attr-defined]
+    return write
+
+
+__all__ = ["AsyncFrameWriter", "BACKPRESSURE_POLICIES", "frame_file_writer", "json_default"]
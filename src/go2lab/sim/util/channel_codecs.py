@@ -0,0 +1,306 @@
+"""Compact per-channel encodings for recorded frames.
+
+Every encoded frame is one self-describing blob:
+    b"G2C\\x01" | u32 header length | JSON header {codec, shape, dtype, params} | payload
+so decode() needs nothing but the bytes (files get the .g2c suffix, shards the "g2c" codec).
+
+Codecs:
+- "depth16": float depth [m] quantized to uint16 steps of `scale` (default 1 mm, so up to
+  65.5 m with at most scale / 2 error); non-finite / non-positive values map to 0 and decode
+  back to `invalid` (default inf, what distance_to_image_plane reports for empty pixels),
+  values beyond the range saturate at 65535. Rows are delta coded, split into byte planes
+  and zlib-compressed.
+- "rle": lossless run-length coding for segmentation ids / colorized masks: runs of the
+  flattened (pixel) stream with their lengths, values replaced by indices into a palette.
+- "palette": lossless palette coding: per-pixel indices (uint8 / uint16) into the sorted
+  unique values, zlib-compressed; better than "rle" for fragmented masks.
+- "png" / "jpeg": uint8 images through PIL (jpeg is lossy, `quality` default 90).
+- "zlib": any array, lossless.
+
+parse_codecs() reads REC_CODECS-style specs ("depth=depth16:scale=0.0005,semantic=rle").
+ProcessEncoder runs encode_arrays() on a process pool, so compression does not compete with
+the sim loop for the GIL; frame_file_writer / shard_frame_writer take its encode() callable.
+"""
+from __future__ import annotations
+
+import functools
+import io
+import json
+import logging
+import multiprocessing as mp
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+LOGGER = logging.getLogger("go2lab.codecs")
+
+MAGIC = b"G2C\x01"
+SUFFIX = ".g2c"
+_HEAD = struct.Struct("<I")
+
+CodecSpec = Tuple[str, Dict[str, Any]]
+
+
+def _pack(codec: str, array: np.ndarray, payload: bytes, **params: Any) -> bytes:
+    header = json.dumps({"codec": codec, "shape": list(array.shape), "dtype": array.dtype.str, **params},
+                        separators=(",", ":")).encode("utf-8")
+    return b"".join((MAGIC, _HEAD.pack(len(header)), header, payload))
+
+
+def _unpack(blob) -> Tuple[Dict[str, Any], memoryview]:
+    blob = memoryview(blob).cast("B")
+    if bytes(blob[:4]) != MAGIC:
+        raise ValueError("not a G2C blob")
+    (n,) = _HEAD.unpack(blob[4:8])
+    return json.loads(bytes(blob[8:8 + n])), blob[8 + n:]
+
+
+def _index_dtype(n: int) -> np.dtype:
+    return np.dtype(np.uint8 if n <= 1 << 8 else np.uint16 if n <= 1 << 16 else np.uint32)
+
+
+def _pixels(array: np.ndarray) -> np.ndarray:
+    """(H*W,) stream of per-pixel values; multi-channel pixels (e.g. RGBA masks) become one void item."""
+    a = np.ascontiguousarray(array)
+    if a.ndim == 3:
+        return a.reshape(-1, a.shape[2]).view(np.dtype((np.void, a.dtype.itemsize * a.shape[2]))).ravel()
+    return a.ravel()
+
+
+def _from_pixels(values: np.ndarray, header: Dict[str, Any]) -> np.ndarray:
+    dtype, shape = np.dtype(header["dtype"]), tuple(header["shape"])
+    return np.frombuffer(values.tobytes(), dtype=dtype).reshape(shape)
+
+
+# codecs -------------------------------------------------------------------
+def _encode_depth16(array: np.ndarray, scale: float = 0.001, invalid: float = float("inf"), level: int = 1) -> bytes:
+    d = np.asarray(array, dtype=np.float32)
+    valid = np.isfinite(d) & (d > 0)
+    q = np.where(valid, np.rint(np.where(valid, d, 0) / scale), 0)
+    q = np.where(valid, np.clip(q, 1, 65535), 0).astype(np.uint16)
+    rows = q.reshape(q.shape[0], -1) if q.ndim > 1 else q[None]
+    delta = np.diff(rows, axis=1, prepend=np.uint16(0))  # wraps mod 2^16, undone by cumsum
+    planes = delta.astype("<u2").view(np.uint8).reshape(*delta.shape, 2).transpose(2, 0, 1)
+    return _pack("depth16", d, zlib.compress(np.ascontiguousarray(planes).tobytes(), level), scale=scale,
+                 invalid=None if np.isinf(invalid) else invalid, level=level)
+
+
+def _decode_depth16(h: Dict[str, Any], payload) -> np.ndarray:
+    shape = tuple(h["shape"])
+    rows = (shape[0], int(np.prod(shape[1:], dtype=np.int64))) if len(shape) > 1 else (1, shape[0])
+    planes = np.frombuffer(zlib.decompress(payload), dtype=np.uint8).reshape(2, *rows)
+    delta = np.ascontiguousarray(planes.transpose(1, 2, 0)).view("<u2")[..., 0]
+    q = np.cumsum(delta, axis=1, dtype=np.uint16)
+    invalid = np.float32(np.inf if h.get("invalid") is None else h["invalid"])
+    d = np.where(q == 0, invalid, q.astype(np.float32) * np.float32(h["scale"]))
+    return d.astype(np.dtype(h["dtype"]), copy=False).reshape(shape)
+
+
+def _encode_rle(array: np.ndarray, level: int = 6) -> bytes:
+    a = np.asarray(array)
+    v = _pixels(a)
+    if v.size == 0:
+        return _pack("rle", a, b"", runs=0, palette=0, index="|u1", length="|u1", level=level)
+    starts = np.concatenate(([0], np.flatnonzero(v[1:] != v[:-1]) + 1))
+    lengths = np.diff(np.append(starts, v.size))
+    palette, idx = np.unique(v[starts], return_inverse=True)
+    idx_dt, len_dt = _index_dtype(len(palette)), _index_dtype(int(lengths.max()) + 1)
+    payload = zlib.compress(b"".join((palette.tobytes(), idx.astype(idx_dt).tobytes(),
+                                      lengths.astype(len_dt).tobytes())), level)
+    return _pack("rle", a, payload, runs=len(starts), palette=len(palette), index=idx_dt.str, length=len_dt.str,
+                 level=level)
+
+
+def _decode_rle(h: Dict[str, Any], payload) -> np.ndarray:
+    dtype, shape = np.dtype(h["dtype"]), tuple(h["shape"])
+    if h["runs"] == 0:
+        return np.zeros(shape, dtype=dtype)
+    item = dtype.itemsize * (shape[2] if len(shape) == 3 else 1)
+    raw = zlib.decompress(payload)
+    n_pal, n_runs = h["palette"], h["runs"]
+    idx_dt, len_dt = np.dtype(h["index"]), np.dtype(h["length"])
+    palette = np.frombuffer(raw, dtype=np.dtype((np.void, item)), count=n_pal)
+    off = n_pal * item
+    idx = np.frombuffer(raw, dtype=idx_dt, count=n_runs, offset=off)
+    lengths = np.frombuffer(raw, dtype=len_dt, count=n_runs, offset=off + n_runs * idx_dt.itemsize)
+    return _from_pixels(np.repeat(palette[idx], lengths.astype(np.int64)), h)
+
+
+def _encode_palette(array: np.ndarray, level: int = 6) -> bytes:
+    a = np.asarray(array)
+    palette, idx = np.unique(_pixels(a), return_inverse=True)
+    idx_dt = _index_dtype(len(palette))
+    payload = zlib.compress(palette.tobytes() + idx.astype(idx_dt).tobytes(), level)
+    return _pack("palette", a, payload, palette=len(palette), index=idx_dt.str, level=level)
+
+
+def _decode_palette(h: Dict[str, Any], payload) -> np.ndarray:
+    dtype, shape = np.dtype(h["dtype"]), tuple(h["shape"])
+    item = dtype.itemsize * (shape[2] if len(shape) == 3 else 1)
+    raw = zlib.decompress(payload)
+    palette = np.frombuffer(raw, dtype=np.dtype((np.void, item)), count=h["palette"])
+    idx = np.frombuffer(raw, dtype=np.dtype(h["index"]), offset=h["palette"] * item)
+    return _from_pixels(palette[idx], h)
+
+
+def _encode_image(array: np.ndarray, fmt: str, **params: Any) -> bytes:
+    from PIL import Image  # type: ignore
+
+    a = np.asarray(array)
+    img = Image.fromarray(a if fmt == "png" or a.ndim == 2 else a[..., :3])
+    buf = io.BytesIO()
+    if fmt == "png":
+        img.save(buf, format="PNG", compress_level=int(params.get("level", 1)))
+    else:
+        img.save(buf, format="JPEG", quality=int(params.get("quality", 90)))
+    return _pack(fmt, a, buf.getvalue(), **params)
+
+
+def _decode_image(h: Dict[str, Any], payload) -> np.ndarray:
+    from PIL import Image  # type: ignore
+
+    img = np.asarray(Image.open(io.BytesIO(bytes(payload))))
+    shape = tuple(h["shape"])
+    if img.shape != shape:
+        # jpeg drops alpha: restore an opaque channel
+        img = np.concatenate([img, np.full(img.shape[:2] + (1,), 255, dtype=img.dtype)], axis=2)
+    return img
+
+
+def _encode_zlib(array: np.ndarray, level: int = 6) -> bytes:
+    a = np.ascontiguousarray(array)
+    return _pack("zlib", a, zlib.compress(a.tobytes(), level), level=level)
+
+
+def _decode_zlib(h: Dict[str, Any], payload) -> np.ndarray:
+    return np.frombuffer(zlib.decompress(payload), dtype=np.dtype(h["dtype"])).reshape(tuple(h["shape"]))
+
+
+ENCODERS: Dict[str, Callable[..., bytes]] = {
+    "depth16": _encode_depth16,
+    "rle": _encode_rle,
+    "palette": _encode_palette,
+    "png": functools.partial(_encode_image, fmt="png"),
+    "jpeg": functools.partial(_encode_image, fmt="jpeg"),
+    "zlib": _encode_zlib,
+}
+DECODERS: Dict[str, Callable[[Dict[str, Any], Any], np.ndarray]] = {
+    "depth16": _decode_depth16,
+    "rle": _decode_rle,
+    "palette": _decode_palette,
+    "png": _decode_image,
+    "jpeg": _decode_image,
+    "zlib": _decode_zlib,
+}
+LOSSLESS = ("rle", "palette", "png", "zlib")
+
+
+def encode(array: np.ndarray, codec: str, **params: Any) -> bytes:
+    try:
+        fn = ENCODERS[codec]
+    except KeyError:
+        raise ValueError(f"unknown codec {codec!r} (expected one of {sorted(ENCODERS)})") from None
+    return fn(np.asarray(array), **params)
+
+
+def decode(blob) -> np.ndarray:
+    header, payload = _unpack(blob)
+    return DECODERS[header["codec"]](header, payload)
+
+
+def blob_header(blob) -> Dict[str, Any]:
+    return _unpack(blob)[0]
+
+
+def parse_codecs(text: str, aliases: Optional[Mapping[str, str]] = None) -> Dict[str, CodecSpec]:
+    """"depth=depth16:scale=0.0005,semantic=rle" -> {channel: (codec, params)}; channel names
+    go through `aliases` (e.g. REC_CHANNELS name -> annotator name)."""
+    out: Dict[str, CodecSpec] = {}
+    for item in filter(None, (s.strip() for s in text.split(","))):
+        channel, _, rest = item.partition("=")
+        codec, *opts = rest.split(":")
+        params: Dict[str, Any] = {}
+        for opt in opts:
+            key, _, value = opt.partition("=")
+            params[key] = json.loads(value) if value[:1].isdigit() or value[:1] in "-." else value
+        if codec not in ENCODERS:
+            raise ValueError(f"unknown codec {codec!r} for channel {channel!r}")
+        channel = channel.strip()
+        out[(aliases or {}).get(channel, channel)] = (codec, params)
+    return out
+
+
+def encode_arrays(arrays: Mapping[str, np.ndarray], codecs: Mapping[str, CodecSpec]) -> Dict[str, Any]:
+    """Arrays with a codec become G2C blobs (bytes), the others pass through unchanged."""
+    out: Dict[str, Any] = {}
+    for name, arr in arrays.items():
+        spec = codecs.get(name)
+        out[name] = arr if spec is None else encode(arr, spec[0], **spec[1])
+    return out
+
+
+def _ready() -> bool:
+    return True
+
+
+class ProcessEncoder:
+    """encode(arrays) runs encode_arrays() on a pool of `processes` worker processes (blocking the
+    calling thread only; call it from AsyncFrameWriter workers so several frames encode at once).
+    processes=0 encodes in the calling thread, and so does a pool that fails to start or breaks.
+
+    start() launches the workers; with the fork start method call it before heavy runtimes
+    (SimulationApp) spin up threads, so the children are forked from a quiet process."""
+
+    def __init__(self, codecs: Mapping[str, CodecSpec], processes: int = 2, start_method: Optional[str] = None):
+        self.codecs = dict(codecs)
+        self.processes = max(0, int(processes))
+        self._pool = None
+        if self.processes and self.codecs:
+            self._pool = ProcessPoolExecutor(self.processes, mp_context=mp.get_context(start_method))
+
+    def start(self, timeout: float = 60.0) -> bool:
+        """Launch the worker processes now; False (and in-thread encoding) when that fails."""
+        if self._pool is None:
+            return False
+        try:
+            for f in [self._pool.submit(_ready) for _ in range(self.processes)]:
+                f.result(timeout)
+            return True
+        except Exception as exc:
+            LOGGER.warning("Encoder processes unavailable (%s); encoding on writer threads", exc)
+            self.close()
+            return False
+
+    def encode(self, arrays: Mapping[str, np.ndarray]) -> Dict[str, Any]:
+        pool = self._pool
+        todo = {k: v for k, v in arrays.items() if k in self.codecs}
+        if pool is None or not todo:
+            return encode_arrays(arrays, self.codecs)
+        try:
+            encoded = pool.submit(encode_arrays, todo, self.codecs).result()
+        except BrokenProcessPool:
+            LOGGER.warning("Encoder process pool broke; encoding on writer threads")
+            self._pool = None
+            return encode_arrays(arrays, self.codecs)
+        out = dict(arrays)
+        out.update(encoded)
+        return out
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "ProcessEncoder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+__all__ = ["encode", "decode", "blob_header", "parse_codecs", "encode_arrays", "ProcessEncoder", "ENCODERS",
+           "LOSSLESS", "SUFFIX"]
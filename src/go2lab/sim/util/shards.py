@@ -0,0 +1,384 @@
+"""Chunked, indexed shard format for recorded datasets.
+
+A shard directory packs every frame, channel and per-episode blob of many recordings into a
+few large files instead of millions of small ones:
+    <root>/chunk_00000.bin, chunk_00001.bin, ...   blobs back to back (64-byte aligned);
+                                                   a new chunk starts past chunk_bytes
+    <root>/index.bin                               fixed-size INDEX_DTYPE records
+                                                   (episode, frame, channel) -> (codec, chunk,
+                                                   offset, length)
+    <root>/shards.json                             channel table, episodes, counts
+
+Frame -1 holds episode-level blobs (telemetry.bin / telemetry.json, legacy meta.jsonl).
+Codecs: "npy" (NumPy arrays; decoded zero-copy from the memory-mapped chunk), "png" (encoded
+image bytes, decoded with PIL), "g2c" (go2lab.sim.util.channel_codecs blobs), "json" and
+"raw" (bytes as stored). The codec is part of every index record, so one channel may mix
+codecs (e.g. .npy and PNG masks, or recordings made with different REC_CODECS).
+
+ShardWriter appends while recording (thread-safe, so AsyncFrameWriter workers can call it)
+and can reopen an existing shard directory to add episodes; index records are only
+published after the blobs they point to are flushed and after shards.json lists their
+channels, so a crash never leaves dangling entries (readers and a reopening writer also
+ignore records naming a channel the manifest does not list). ShardReader memory-maps the
+index and chunks and builds a dense (episode, frame, channel) table, so get() is O(1) in
+the number of frames.
+sim/scripts/pack_shards.py converts existing output/<timestamp>/ directories.
+"""
+from __future__ import annotations
+
+import io
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from go2lab.sim.util.async_writer import json_default
+from go2lab.sim.util.channel_codecs import decode
+
+SHARD_FORMAT = 1
+MANIFEST_NAME = "shards.json"
+INDEX_NAME = "index.bin"
+CHUNK_PATTERN = "chunk_{:05d}.bin"
+INDEX_DTYPE = np.dtype([
+    ("episode", "<u4"),
+    ("frame", "<i8"),      # -1 for episode-level blobs
+    ("channel", "<u2"),
+    ("codec", "u1"),       # position in CODECS
+    ("chunk", "<u4"),
+    ("offset", "<u8"),
+    ("length", "<u8"),
+])
+CODECS = ("npy", "png", "g2c", "json", "raw")
+_CODEC_IDS = {c: i for i, c in enumerate(CODECS)}
+_ALIGN = 64
+_SUFFIX_CODECS = {".npy": "npy", ".png": "png", ".g2c": "g2c", ".json": "json"}
+
+
+def codec_for_suffix(suffix: str) -> str:
+    return _SUFFIX_CODECS.get(suffix.lower(), "raw")
+
+
+def _encode_npy(array: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    np.save(buf, np.ascontiguousarray(array), allow_pickle=False)
+    return buf.getvalue()
+
+
+def _decode_npy(blob) -> np.ndarray:
+    # parse the .npy header, then view the payload in place (no copy out of the chunk mmap)
+    head = io.BytesIO(bytes(blob[:min(len(blob), 4096)]))
+    version = np.lib.format.read_magic(head)
+    read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+    shape, fortran, dtype = read_header(head)
+    count = int(np.prod(shape, dtype=np.int64))
+    arr = np.frombuffer(blob, dtype=dtype, count=count, offset=head.tell())
+    return arr.reshape(shape, order="F" if fortran else "C")
+
+
+class ShardWriter:
+    """Append blobs to a shard directory; add() is safe to call from several threads."""
+
+    def __init__(self, root: Path | str, chunk_bytes: int = 256 << 20, flush_every: int = 256):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.chunk_bytes = int(chunk_bytes)
+        self.flush_every = max(1, int(flush_every))
+        self._lock = threading.RLock()
+        self.channels: List[Dict[str, str]] = []
+        self.episodes: Dict[str, Dict[str, Any]] = {}
+        self.count = 0
+        manifest = self.root / MANIFEST_NAME
+        if manifest.exists():
+            meta = json.loads(manifest.read_text(encoding="utf-8"))
+            if meta.get("format") != SHARD_FORMAT:
+                raise ValueError(f"unsupported shard format in {self.root}")
+            self.channels = meta.get("channels", [])
+            self.episodes = meta.get("episodes", {})
+            self.chunk_bytes = int(meta.get("chunk_bytes", self.chunk_bytes))
+        # drop a trailing partial index record left by a crash, then keep appending
+        index_path = self.root / INDEX_NAME
+        size = index_path.stat().st_size if index_path.exists() else 0
+        self.count = size // INDEX_DTYPE.itemsize
+        if self.count:
+            # and records of channels the manifest never listed (older writers, torn manifests)
+            chans = np.memmap(index_path, dtype=INDEX_DTYPE, mode="r", shape=(self.count,))["channel"]
+            orphans = np.flatnonzero(chans >= len(self.channels))
+            if orphans.size:
+                self.count = int(orphans[0])
+            del chans
+        self._index = index_path.open("ab")
+        self._index.truncate(self.count * INDEX_DTYPE.itemsize)
+        self._channel_ids = {c["name"]: i for i, c in enumerate(self.channels)}
+        self._pending = np.zeros(self.flush_every, dtype=INDEX_DTYPE)
+        self._n_pending = 0
+        # always start a fresh chunk: earlier chunks stay immutable
+        chunks = sorted(self.root.glob("chunk_*.bin"))
+        self._chunk_id = int(chunks[-1].stem.split("_")[1]) + 1 if chunks else 0
+        self._chunk = None
+        self._chunk_pos = 0
+
+    # episodes / channels ---------------------------------------------------
+    def new_episode(self, name: str = "", **attrs: Any) -> int:
+        with self._lock:
+            ep = max((int(k) for k in self.episodes), default=-1) + 1
+            self.episodes[str(ep)] = {"name": name, "frames": 0, **attrs}
+            self._write_manifest()
+            return ep
+
+    def _channel(self, name: str) -> int:
+        cid = self._channel_ids.get(name)
+        if cid is None:
+            cid = self._channel_ids[name] = len(self.channels)
+            self.channels.append({"name": name})
+        return cid
+
+    # appending ---------------------------------------------------------------
+    def add(self, episode: int, frame: int, channel: str, data: Any, codec: Optional[str] = None) -> None:
+        """Store one blob: ndarrays as "npy", dicts/lists as "json", bytes with the given codec
+        (default "raw"); frame -1 for episode-level data."""
+        if isinstance(data, np.ndarray):
+            if codec not in (None, "npy"):
+                raise ValueError("ndarrays are stored with the npy codec")
+            blob, codec = _encode_npy(data), codec or "npy"
+        elif isinstance(data, (dict, list)):
+            blob, codec = json.dumps(data, default=json_default).encode("utf-8"), "json"
+        else:
+            blob, codec = bytes(data), codec or "raw"
+        if codec not in _CODEC_IDS:
+            raise ValueError(f"unknown codec {codec!r}")
+        with self._lock:
+            cid = self._channel(channel)
+            if self._chunk is None or (self._chunk_pos and self._chunk_pos + len(blob) > self.chunk_bytes):
+                self._next_chunk()
+            pad = -self._chunk_pos % _ALIGN
+            if pad:
+                self._chunk.write(b"\0" * pad)
+                self._chunk_pos += pad
+            self._pending[self._n_pending] = (episode, frame, cid, _CODEC_IDS[codec], self._chunk_id,
+                                              self._chunk_pos, len(blob))
+            self._n_pending += 1
+            self._chunk.write(blob)
+            self._chunk_pos += len(blob)
+            ep = self.episodes.setdefault(str(episode), {"name": "", "frames": 0})
+            if frame >= 0:
+                ep["frames"] = max(ep["frames"], int(frame) + 1)
+            if self._n_pending == len(self._pending):
+                self.flush()
+
+    def add_file(self, episode: int, frame: int, channel: str, path: Path | str) -> None:
+        """Store a file's bytes unchanged, codec from its suffix (.npy / .png / .g2c / .json / raw)."""
+        path = Path(path)
+        self.add(episode, frame, channel, path.read_bytes(), codec=codec_for_suffix(path.suffix))
+
+    def _next_chunk(self) -> None:
+        if self._chunk is not None:
+            self.flush()
+            self._chunk.close()
+            self._chunk_id += 1
+        self._chunk = (self.root / CHUNK_PATTERN.format(self._chunk_id)).open("wb")
+        self._chunk_pos = 0
+
+    def flush(self) -> None:
+        """Make everything added so far durable and visible to readers."""
+        with self._lock:
+            if self._chunk is not None:
+                self._chunk.flush()
+            # the manifest (channel table) first, so published records never name unknown channels
+            self._write_manifest(self.count + self._n_pending)
+            if self._n_pending:
+                self._index.write(self._pending[:self._n_pending].tobytes())
+                self._index.flush()
+                self.count += self._n_pending
+                self._n_pending = 0
+
+    def _write_manifest(self, entries: Optional[int] = None) -> None:
+        meta = {"format": SHARD_FORMAT, "chunk_bytes": self.chunk_bytes,
+                "entries": self.count if entries is None else entries,
+                "channels": self.channels, "episodes": self.episodes}
+        tmp = self.root / f".{MANIFEST_NAME}.tmp"
+        tmp.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        os.replace(tmp, self.root / MANIFEST_NAME)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._index.closed:
+                return
+            self.flush()
+            if self._chunk is not None:
+                self._chunk.close()
+            self._index.close()
+
+    def __enter__(self) -> "ShardWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ShardReader:
+    """Random access into a shard directory: get(episode, frame, channel)."""
+
+    def __init__(self, root: Path | str):
+        self.root = Path(root)
+        meta = json.loads((self.root / MANIFEST_NAME).read_text(encoding="utf-8"))
+        if meta.get("format") != SHARD_FORMAT:
+            raise ValueError(f"unsupported shard format in {self.root}")
+        self.channels = [c["name"] for c in meta["channels"]]
+        self.episodes = {int(k): v for k, v in meta["episodes"].items()}
+        self._channel_ids = {name: i for i, name in enumerate(self.channels)}
+        path = self.root / INDEX_NAME
+        n = path.stat().st_size // INDEX_DTYPE.itemsize if path.exists() else 0
+        self.index = np.memmap(path, dtype=INDEX_DTYPE, mode="r", shape=(n,)) if n else np.zeros(0, INDEX_DTYPE)
+        self._chunks: Dict[int, np.memmap] = {}
+        self._tables = self._build_tables()
+
+    def _build_tables(self) -> Dict[int, np.ndarray]:
+        # per episode: (frames + 1, channels) entry ids, row 0 for frame -1; later entries win
+        tables: Dict[int, np.ndarray] = {}
+        idx = self.index
+        if len(idx) == 0:
+            return tables
+        eps = np.asarray(idx["episode"])
+        frames = np.asarray(idx["frame"])
+        chans = np.asarray(idx["channel"])
+        known = chans < len(self.channels)  # a writer may publish records before we read shards.json
+        for ep in np.unique(eps[known]).tolist():
+            sel = np.flatnonzero((eps == ep) & known)
+            table = np.full((int(frames[sel].max()) + 2, len(self.channels)), -1, dtype=np.int64)
+            table[frames[sel] + 1, chans[sel]] = sel
+            tables[ep] = table
+        return tables
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def num_frames(self, episode: int) -> int:
+        table = self._tables.get(int(episode))
+        return 0 if table is None else len(table) - 1
+
+    def has(self, episode: int, frame: int, channel: str) -> bool:
+        return self._entry(episode, frame, channel) >= 0
+
+    def _entry(self, episode: int, frame: int, channel: str) -> int:
+        table = self._tables.get(int(episode))
+        cid = self._channel_ids.get(channel)
+        if table is None or cid is None or not -1 <= frame < len(table) - 1:
+            return -1
+        return int(table[frame + 1, cid])
+
+    def _chunk(self, chunk_id: int) -> np.memmap:
+        mm = self._chunks.get(chunk_id)
+        if mm is None:
+            path = self.root / CHUNK_PATTERN.format(chunk_id)
+            mm = self._chunks[chunk_id] = np.memmap(path, dtype=np.uint8, mode="r")
+        return mm
+
+    def _blob(self, e: int) -> memoryview:
+        rec = self.index[e]
+        off = int(rec["offset"])
+        return memoryview(self._chunk(int(rec["chunk"])))[off:off + int(rec["length"])]
+
+    def get_bytes(self, episode: int, frame: int, channel: str) -> memoryview:
+        """Stored blob as a zero-copy view into the chunk; KeyError when missing."""
+        e = self._entry(episode, frame, channel)
+        if e < 0:
+            raise KeyError((episode, frame, channel))
+        return self._blob(e)
+
+    def codec(self, episode: int, frame: int, channel: str) -> str:
+        """Codec the blob was stored with; KeyError when missing."""
+        e = self._entry(episode, frame, channel)
+        if e < 0:
+            raise KeyError((episode, frame, channel))
+        return CODECS[int(self.index[e]["codec"])]
+
+    def get(self, episode: int, frame: int, channel: str) -> Any:
+        """Decoded blob: ndarray for npy/png/g2c, parsed JSON for json, bytes for raw."""
+        e = self._entry(episode, frame, channel)
+        if e < 0:
+            raise KeyError((episode, frame, channel))
+        blob, codec = self._blob(e), CODECS[int(self.index[e]["codec"])]
+        if codec == "npy":
+            return _decode_npy(blob)
+        if codec == "png":
+            from PIL import Image  # type: ignore
+
+            return np.asarray(Image.open(io.BytesIO(blob)))
+        if codec == "g2c":
+            return decode(blob)
+        if codec == "json":
+            return json.loads(bytes(blob))
+        return bytes(blob)
+
+    def frame(self, episode: int, frame: int, channels: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """{channel: decoded blob} for every stored channel of one frame."""
+        names = self.channels if channels is None else channels
+        return {c: self.get(episode, frame, c) for c in names if self.has(episode, frame, c)}
+
+    def telemetry(self, episode: int) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Episode telemetry records (go2lab.sim.util.telemetry layout) and attrs."""
+        from go2lab.sim.util.telemetry import _dtype_from_descr
+
+        schema = self.get(episode, -1, "telemetry.json")
+        blob = self.get_bytes(episode, -1, "telemetry.bin")
+        dtype = _dtype_from_descr(schema["dtype"])
+        n = len(blob) // dtype.itemsize
+        return np.frombuffer(blob, dtype=dtype, count=n), schema.get("attrs", {})
+
+
+def _png_bytes(image: np.ndarray) -> Optional[bytes]:
+    try:
+        from PIL import Image  # type: ignore
+    except ImportError:
+        return None
+    buf = io.BytesIO()
+    Image.fromarray(image).save(buf, format="PNG", compress_level=1)
+    return buf.getvalue()
+
+
+def shard_frame_writer(writer: ShardWriter, episode: int,
+                       encode: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+    """AsyncFrameWriter write function appending frames {"arrays": {name: ndarray}, "labels":
+    {name: dict}} to a shard episode; uint8 RGB(A) images are stored as PNG (when PIL is
+    available), like frame_file_writer, blobs returned by `encode`
+    (channel_codecs.ProcessEncoder.encode) with the "g2c" codec and labels as "json" under
+    channel <name>_labels (pack_shards' name for <name>_labels_XXXX.json files).
+    Encoding runs on the calling worker thread, only the append holds the writer lock."""
+
+    def write(index: int, frame: Dict[str, Any]) -> None:
+        arrays = frame.get("arrays", {})
+        for name, arr in (encode(arrays) if encode is not None else arrays).items():
+            if isinstance(arr, bytes):
+                writer.add(episode, index, name, arr, codec="g2c")
+                continue
+            arr = np.asarray(arr)
+            png = None
+            if arr.dtype == np.uint8 and arr.ndim == 3 and arr.shape[2] in (3, 4):
+                png = _png_bytes(arr)
+            if png is not None:
+                writer.add(episode, index, name, png, codec="png")
+            else:
+                writer.add(episode, index, name, _encode_npy(arr), codec="npy")
+        for name, info in frame.get("labels", {}).items():
+            writer.add(episode, index, f"{name}_labels", info)
+
+    write.close = writer.flush  # type: ignore[attr-defined]
+    return write
+
+
+def add_telemetry(writer: ShardWriter, episode: int, directory: Path | str) -> bool:
+    """Store a TelemetryLog directory's telemetry.bin/.json as episode-level blobs."""
+    from go2lab.sim.util.telemetry import DATA_NAME, SCHEMA_NAME
+
+    directory = Path(directory)
+    if not (directory / SCHEMA_NAME).exists():
+        return False
+    writer.add_file(episode, -1, SCHEMA_NAME, directory / SCHEMA_NAME)
+    writer.add_file(episode, -1, DATA_NAME, directory / DATA_NAME)
+    return True
+
+
+__all__ = ["ShardWriter", "ShardReader", "INDEX_DTYPE", "add_telemetry", "codec_for_suffix", "shard_frame_writer"]
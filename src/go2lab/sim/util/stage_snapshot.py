@@ -0,0 +1,315 @@
+"""Flattened binary snapshots of composed stages for fast environment startup.
+
+Opening the warehouse recomposes it from every source layer (sublayers, references,
+payloads) on each run. A snapshot is the composed stage -- optionally with GO2 already
+spawned -- flattened into one binary layer:
+    <cache>/snapshots/<key[:24]>.usdc
+and recorded in <cache>/index.json. The key hashes the source spec, the contents of every
+layer the composition used and the generator parameters (plus the USD version and the
+snapshot format), so editing any input layer or parameter produces a new snapshot.
+
+Validating a hit only stats the recorded layers; a layer is re-hashed when its mtime or
+size changed, and the snapshot is rebuilt when its content did.
+
+Environment:
+- GO2LAB_STAGE_SNAPSHOT=1: open_warehouse() opens the snapshot instead of the source
+- GO2LAB_SNAPSHOT_GO2=1: include the spawned GO2 in the snapshot
+- GO2LAB_SNAPSHOT_DIR: cache location (default <repo>/.stage_cache)
+- GO2LAB_SNAPSHOT_MAX_MB / GO2LAB_SNAPSHOT_MAX_AGE_DAYS: eviction limits (default 4096 / 30)
+
+Warm the cache for every registry entry with sim/scripts/warm_stage_snapshots.py.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .asset_cache import _atomic_write, _env_flag
+
+LOGGER = logging.getLogger("go2lab.stage_snapshot")
+
+SNAPSHOT_ENV = "GO2LAB_STAGE_SNAPSHOT"
+SNAPSHOT_GO2_ENV = "GO2LAB_SNAPSHOT_GO2"
+SNAPSHOT_DIR_ENV = "GO2LAB_SNAPSHOT_DIR"
+SNAPSHOT_MAX_MB_ENV = "GO2LAB_SNAPSHOT_MAX_MB"
+SNAPSHOT_MAX_AGE_ENV = "GO2LAB_SNAPSHOT_MAX_AGE_DAYS"
+DEFAULT_SNAPSHOT_DIR = Path(__file__).resolve().parents[4] / ".stage_cache"
+DEFAULT_MAX_MB = 4096.0
+DEFAULT_MAX_AGE_DAYS = 30.0
+INDEX_NAME = "index.json"
+SNAPSHOT_FORMAT = 1
+_HASH_CHUNK = 1 << 20
+_TOUCH_INTERVAL_S = 60.0
+
+
+def snapshot_enabled() -> bool:
+    return _env_flag(SNAPSHOT_ENV, False)
+
+
+def snapshot_go2() -> bool:
+    return _env_flag(SNAPSHOT_GO2_ENV, False)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, "") or default)
+    except ValueError:
+        return default
+
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stamp(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _usd_version() -> str:
+    from pxr import Usd  # type: ignore
+
+    return ".".join(str(v) for v in Usd.GetVersion())
+
+
+def source_id(spec: str, params: Optional[dict] = None) -> str:
+    """Identity of (spec, generator params) before any layer content is read."""
+    blob = json.dumps({"spec": spec, "params": params or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def snapshot_key(spec: str, params: Optional[dict], layer_digests: Dict[str, str]) -> str:
+    """Cache key: source spec, generator params, every used layer's content hash, USD version."""
+    h = hashlib.sha256()
+    h.update(f"format={SNAPSHOT_FORMAT};usd={_usd_version()};".encode("utf-8"))
+    h.update(source_id(spec, params).encode("utf-8"))
+    for path in sorted(layer_digests):
+        h.update(f";{path}={layer_digests[path]}".encode("utf-8"))
+    return h.hexdigest()
+
+
+class StageSnapshotCache:
+    def __init__(self, root: Path | str | None = None, max_bytes: float | None = None,
+                 max_age_s: float | None = None):
+        self.root = Path(root or os.environ.get(SNAPSHOT_DIR_ENV) or DEFAULT_SNAPSHOT_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else _env_float(SNAPSHOT_MAX_MB_ENV, DEFAULT_MAX_MB) * 2**20
+        self.max_age_s = max_age_s if max_age_s is not None else _env_float(SNAPSHOT_MAX_AGE_ENV, DEFAULT_MAX_AGE_DAYS) * 86400.0
+        self._index_path = self.root / INDEX_NAME
+        self._index: Optional[dict] = None
+
+    # index ----------------------------------------------------------------
+    @property
+    def index(self) -> dict:
+        """{"entries": key -> record, "sources": source_id -> key}."""
+        if self._index is None:
+            try:
+                data = json.loads(self._index_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            data.setdefault("entries", {})
+            data.setdefault("sources", {})
+            self._index = data
+        return self._index
+
+    def _save_index(self) -> None:
+        _atomic_write(self._index_path, json.dumps(self.index, indent=2, sort_keys=True).encode("utf-8"))
+
+    def _entry_path(self, entry: dict) -> Path:
+        return self.root / entry["file"]
+
+    # lookup / build -------------------------------------------------------
+    def lookup(self, spec: str, params: Optional[dict] = None) -> Optional[str]:
+        """Path of a valid snapshot for (spec, params), or None when missing or stale."""
+        key = self.index["sources"].get(source_id(spec, params))
+        entry = self.index["entries"].get(key) if key else None
+        if not entry or not self._entry_path(entry).exists():
+            return None
+        dirty = False
+        for path, (mtime_ns, size, digest) in entry["deps"].items():
+            stamp = _stamp(path)
+            if stamp is None:
+                return None
+            if stamp != [mtime_ns, size]:
+                # touched on disk: only a content change invalidates the snapshot
+                if _file_sha256(path) != digest:
+                    LOGGER.info("Snapshot for %s is stale (%s changed)", spec, path)
+                    return None
+                entry["deps"][path] = [*stamp, digest]
+                dirty = True
+        now = time.time()
+        # last_used only feeds eviction, so it is persisted at most once a minute
+        if dirty or now - entry["last_used"] > _TOUCH_INTERVAL_S:
+            entry["last_used"] = now
+            self._save_index()
+        return str(self._entry_path(entry))
+
+    def build(self, spec: str, params: Optional[dict] = None,
+              populate: Optional[Callable[[object], None]] = None) -> str:
+        """Compose spec (all payloads loaded), run populate(stage), flatten and export a .usdc."""
+        from pxr import Usd  # type: ignore
+
+        t0 = time.perf_counter()
+        stage = Usd.Stage.Open(spec, Usd.Stage.LoadAll)
+        if stage is None:
+            raise FileNotFoundError(f"could not open stage '{spec}'")
+        if populate is not None:
+            populate(stage)
+        deps: Dict[str, list] = {}
+        for layer in stage.GetUsedLayers():
+            real = layer.realPath
+            if layer.anonymous or not real or not os.path.isfile(real):
+                continue
+            stamp = _stamp(real)
+            if stamp is not None:
+                deps[real] = [*stamp, _file_sha256(real)]
+        key = snapshot_key(spec, params, {p: d[2] for p, d in deps.items()})
+        rel = Path("snapshots") / f"{key[:24]}.usdc"
+        out = self.root / rel
+        if not out.exists():
+            flat = stage.Flatten()
+            out.parent.mkdir(parents=True, exist_ok=True)
+            # Export picks the file format from the extension, so the temp file keeps .usdc
+            tmp = out.with_name(f".tmp-{os.getpid()}-{out.name}")
+            try:
+                if not flat.Export(str(tmp)):
+                    raise OSError(f"could not export snapshot to {tmp}")
+                os.replace(tmp, out)
+            finally:
+                if tmp.exists():
+                    tmp.unlink()
+        now = time.time()
+        sid = source_id(spec, params)
+        old = self.index["sources"].get(sid)
+        if old and old != key:
+            self._drop(old)
+        self.index["entries"][key] = {
+            "spec": spec,
+            "params": params or {},
+            "file": rel.as_posix(),
+            "size": out.stat().st_size,
+            "deps": deps,
+            "created": now,
+            "last_used": now,
+            "build_s": round(time.perf_counter() - t0, 3),
+        }
+        self.index["sources"][sid] = key
+        self.evict()
+        self._save_index()
+        LOGGER.info("Snapshot %s -> %s (%d layers, %.1f MiB, %.2fs)", spec, out, len(deps),
+                    out.stat().st_size / 2**20, time.perf_counter() - t0)
+        return str(out)
+
+    def get(self, spec: str, params: Optional[dict] = None,
+            populate: Optional[Callable[[object], None]] = None) -> Tuple[str, bool]:
+        """(snapshot path, hit) for spec, building the snapshot on a miss."""
+        hit = self.lookup(spec, params)
+        if hit is not None:
+            return hit, True
+        return self.build(spec, params, populate), False
+
+    # eviction -------------------------------------------------------------
+    def _drop(self, key: str) -> None:
+        entry = self.index["entries"].pop(key, None)
+        if entry is not None:
+            try:
+                self._entry_path(entry).unlink()
+            except OSError:
+                pass
+        for sid in [s for s, k in self.index["sources"].items() if k == key]:
+            del self.index["sources"][sid]
+
+    def evict(self, max_bytes: float | None = None, max_age_s: float | None = None) -> List[str]:
+        """Drop snapshots unused for longer than max_age_s, then least recently used ones until
+        the total size fits max_bytes. Returns the evicted keys (the index is saved by callers)."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        max_age_s = self.max_age_s if max_age_s is None else max_age_s
+        entries = self.index["entries"]
+        now = time.time()
+        evicted = [k for k, e in entries.items()
+                   if not self._entry_path(e).exists() or (max_age_s > 0 and now - e["last_used"] > max_age_s)]
+        for key in evicted:
+            self._drop(key)
+        total = sum(e["size"] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if max_bytes <= 0 or total <= max_bytes:
+                break
+            total -= entries[key]["size"]
+            self._drop(key)
+            evicted.append(key)
+        if evicted:
+            LOGGER.info("Evicted %d stage snapshots", len(evicted))
+        return evicted
+
+    def prune(self, max_bytes: float | None = None, max_age_s: float | None = None) -> List[str]:
+        """evict() plus removal of snapshot files the index does not know about; saves the index."""
+        evicted = self.evict(max_bytes, max_age_s)
+        known = {self._entry_path(e) for e in self.index["entries"].values()}
+        for f in (self.root / "snapshots").glob("*.usdc"):
+            if f not in known:
+                f.unlink()
+        self._save_index()
+        return evicted
+
+    def clear(self) -> None:
+        for key in list(self.index["entries"]):
+            self._drop(key)
+        self._save_index()
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(e["size"] for e in self.index["entries"].values())
+
+
+_DEFAULT: Optional[StageSnapshotCache] = None
+
+
+def default_snapshot_cache() -> StageSnapshotCache:
+    """Process-wide snapshot cache configured from the environment."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = StageSnapshotCache()
+    return _DEFAULT
+
+
+def go2_populator(repo_root: Path) -> Tuple[dict, Callable[[object], None]]:
+    """(generator params, populate callback) that spawn GO2 into the snapshot like spawn_go2."""
+    from go2lab.sim.scripts.spawn_go2 import GO2_DEFAULT_PATH, _resolve_go2_usd, spawn_go2
+
+    _mode, target = _resolve_go2_usd(Path(repo_root))
+    params = {"go2": {"path": GO2_DEFAULT_PATH, "usd": target or "placeholder"}}
+    return params, lambda stage: spawn_go2(stage, Path(repo_root))
+
+
+def snapshot_stage(spec: str, repo_root: Path | str | None = None, with_go2: bool = False,
+                   params: Optional[dict] = None, cache: Optional[StageSnapshotCache] = None) -> Tuple[str, bool]:
+    """(snapshot path, hit) for a local stage spec, optionally with GO2 spawned into it."""
+    cache = cache or default_snapshot_cache()
+    params = dict(params or {})
+    populate = None
+    if with_go2:
+        go2_params, populate = go2_populator(Path(repo_root or DEFAULT_SNAPSHOT_DIR.parent))
+        params.update(go2_params)
+    return cache.get(spec, params, populate)
+
+
+__all__ = [
+    "StageSnapshotCache",
+    "default_snapshot_cache",
+    "snapshot_enabled",
+    "snapshot_go2",
+    "snapshot_key",
+    "snapshot_stage",
+    "source_id",
+]
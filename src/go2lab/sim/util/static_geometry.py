@@ -0,0 +1,235 @@
+"""Static stage geometry as axis-aligned boxes, and occupancy grids cached next to the USD.
+
+Boxes are (N, 6) float32 [xmin, ymin, zmin, xmax, ymax, zmax] in world space, taken either
+from warehouse_gen parameters (exact, no stage needed) or from any composed stage through
+UsdGeom.BBoxCache (gprims and PointInstancer instances; robot prims are skipped).
+
+occupancy_for_stage() rasterizes them (go2lab.core.occupancy) once and stores the grid in
+    <usd dir>/<usd name>.occupancy/<key[:16]>/{occupied,distance,height}.npy + meta.json
+keyed by the grid spec and the stamps (path, mtime, size) of every layer the stage used, or
+by the generator parameters for warehouse_gen variants (a params.json next to the USD).
+Later calls load the grid memory-mapped. spawn_sampler_for_stage() wraps the grid in a
+go2lab.core.spawn.SpawnSampler for collision-free reset poses.
+
+index_for_stage() / index_for_params() do the same for a go2lab.core.spatial.BoxIndex over
+the blocking boxes (<usd name>.boxindex/<key[:16]>/), used for collision queries.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from go2lab.core.occupancy import GRID_FORMAT, GridSpec, OccupancyGrid, blocking_boxes, rasterize
+from go2lab.core.spatial import INDEX_FORMAT, BoxIndex
+from go2lab.core.spawn import SpawnSampler, parse_region
+
+LOGGER = logging.getLogger("go2lab.static_geometry")
+
+OCCUPANCY_SUFFIX = ".occupancy"
+INDEX_SUFFIX = ".boxindex"
+PARAMS_NAME = "params.json"
+SPAWN_REGION_ENV = "GO2_SPAWN_REGION"
+
+
+def _robot_paths() -> tuple[str, ...]:
+    from go2lab.sim.scripts.spawn_go2 import GO2_DEFAULT_PATH, GO2_ENVS_ROOT, GO2_PROTOTYPE_PATH
+
+    return (GO2_DEFAULT_PATH, GO2_ENVS_ROOT, GO2_PROTOTYPE_PATH)
+
+
+def boxes_from_params(params) -> np.ndarray:
+    """Boxes of a warehouse_gen.WarehouseParams layout: props plus the four walls."""
+    from go2lab.sim.scripts.warehouse_gen import PROP_KINDS, WALL_THICKNESS, warehouse_layout
+
+    layout = warehouse_layout(params)
+    dims = np.asarray([params.prop_dims[k] for k in PROP_KINDS], dtype=np.float32)
+    half = dims[layout["proto_indices"]] * layout["scales"] * 0.5
+    pos = layout["positions"]
+    sx, sy = params.floor_size
+    t, h = WALL_THICKNESS / 2, params.wall_height
+    walls = np.asarray([
+        [-sx / 2 - t, -sy / 2, 0.0, -sx / 2 + t, sy / 2, h],
+        [sx / 2 - t, -sy / 2, 0.0, sx / 2 + t, sy / 2, h],
+        [-sx / 2, -sy / 2 - t, 0.0, sx / 2, -sy / 2 + t, h],
+        [-sx / 2, sy / 2 - t, 0.0, sx / 2, sy / 2 + t, h],
+    ], dtype=np.float32)
+    return np.concatenate([np.concatenate([pos - half, pos + half], axis=1), walls]).astype(np.float32)
+
+
+def boxes_from_stage(stage, exclude: Optional[Sequence[str]] = None, purposes=None) -> np.ndarray:
+    """World-space AABBs of every gprim and point instance on the composed stage (instance
+    proxies included); prims under any of the exclude prefixes (default: GO2 robots) are skipped."""
+    from pxr import Usd, UsdGeom  # type: ignore
+
+    exclude = tuple(_robot_paths() if exclude is None else exclude)
+    purposes = purposes or [UsdGeom.Tokens.default_, UsdGeom.Tokens.render]
+    cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), purposes, useExtentsHint=True)
+    out: list = []
+
+    def _add(rng) -> None:
+        if not rng.IsEmpty():
+            lo, hi = rng.GetMin(), rng.GetMax()
+            out.append((lo[0], lo[1], lo[2], hi[0], hi[1], hi[2]))
+
+    it = iter(Usd.PrimRange.Stage(stage, Usd.TraverseInstanceProxies()))
+    for prim in it:
+        path = prim.GetPath().pathString
+        if any(path == p or path.startswith(p + "/") for p in exclude):
+            it.PruneChildren()
+            continue
+        if prim.IsA(UsdGeom.PointInstancer):
+            inst = UsdGeom.PointInstancer(prim)
+            n = len(inst.GetProtoIndicesAttr().Get() or [])
+            if n:
+                for bbox in cache.ComputePointInstanceWorldBounds(inst, list(range(n))):
+                    _add(bbox.ComputeAlignedRange())
+            it.PruneChildren()  # prototypes are only drawn through the instancer
+        elif prim.IsA(UsdGeom.Gprim):
+            _add(cache.ComputeWorldBound(prim).ComputeAlignedRange())
+    return np.asarray(out, dtype=np.float32).reshape(-1, 6)
+
+
+def _digest(payload: dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def params_key(params, spec: GridSpec) -> str:
+    return _digest({"format": GRID_FORMAT, "spec": asdict(spec), "params": asdict(params)})
+
+
+def _layer_stamps(stage) -> list:
+    layers = []
+    for layer in stage.GetUsedLayers():
+        real = layer.realPath
+        if layer.anonymous or not real:
+            continue
+        try:
+            st = os.stat(real)
+        except OSError:
+            continue
+        layers.append((real, st.st_mtime_ns, st.st_size))
+    return sorted(layers)
+
+
+def stage_key(stage, spec: GridSpec) -> str:
+    """Grid key from the spec and the on-disk stamp of every layer the stage composes."""
+    return _digest({"format": GRID_FORMAT, "spec": asdict(spec), "layers": _layer_stamps(stage)})
+
+
+def grid_dir(usd_path: Path | str, key: str, suffix: str = OCCUPANCY_SUFFIX) -> Path:
+    usd_path = Path(usd_path)
+    return usd_path.parent / f"{usd_path.name}{suffix}" / key[:16]
+
+
+def _load_or_build(directory: Optional[Path], build, cls=OccupancyGrid):
+    if directory is not None and (directory / "meta.json").exists():
+        try:
+            return cls.load(directory)
+        except (OSError, ValueError) as exc:
+            LOGGER.warning("Ignoring unreadable %s %s: %s", cls.__name__, directory, exc)
+    built = build()
+    if directory is not None:
+        try:
+            built.save(directory)
+            LOGGER.info("%s saved: %s", cls.__name__, directory)
+            return cls.load(directory)
+        except OSError as exc:
+            LOGGER.warning("Could not cache %s in %s: %s", cls.__name__, directory, exc)
+    return built
+
+
+def occupancy_for_params(params, spec: GridSpec = GridSpec(), usd_path: Path | str | None = None) -> OccupancyGrid:
+    """Grid of a warehouse_gen layout over its floor; cached next to usd_path when given."""
+    key = params_key(params, spec)
+    sx, sy = params.floor_size
+    bounds = (-sx / 2 - spec.padding, -sy / 2 - spec.padding, sx / 2 + spec.padding, sy / 2 + spec.padding)
+    directory = grid_dir(usd_path, key) if usd_path else None
+    return _load_or_build(directory, lambda: rasterize(boxes_from_params(params), spec, bounds, key=key))
+
+
+def _variant_params(usd_path: Path):
+    # warehouse_gen variants (generate_variants.py) carry their generator parameters
+    from go2lab.sim.scripts.warehouse_gen import WarehouseParams
+
+    path = usd_path.parent / PARAMS_NAME
+    if not path.exists():
+        return None
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        known = {f.name for f in fields(WarehouseParams)}
+        kwargs = {k: (tuple(v) if isinstance(v, list) else v) for k, v in raw.items() if k in known}
+        return WarehouseParams(**kwargs)
+    except (OSError, ValueError, TypeError) as exc:
+        LOGGER.warning("Ignoring unreadable %s: %s", path, exc)
+        return None
+
+
+def occupancy_for_stage(stage, spec: GridSpec = GridSpec(), cache: bool = True) -> OccupancyGrid:
+    """Occupancy grid of the stage's static geometry, cached next to its root layer."""
+    usd = stage.GetRootLayer().realPath
+    usd_path = Path(usd) if usd else None
+    if usd_path is not None:
+        params = _variant_params(usd_path)
+        if params is not None:
+            return occupancy_for_params(params, spec, usd_path if cache else None)
+    key = stage_key(stage, spec)
+    directory = grid_dir(usd_path, key) if (cache and usd_path is not None) else None
+    return _load_or_build(directory, lambda: rasterize(boxes_from_stage(stage), spec, key=key))
+
+
+def _index_key(source: dict, spec: GridSpec, cell: Optional[float]) -> str:
+    return _digest({"index": INDEX_FORMAT, "cell": cell, "max_z": spec.max_z, "floor_z": spec.floor_z,
+                    "min_height": spec.min_height, **source})
+
+
+def index_for_params(params, spec: GridSpec = GridSpec(), cell: Optional[float] = None,
+                     usd_path: Path | str | None = None) -> BoxIndex:
+    """BoxIndex over the blocking boxes of a warehouse_gen layout; cached next to usd_path when given."""
+    key = _index_key({"params": asdict(params)}, spec, cell)
+    directory = grid_dir(usd_path, key, INDEX_SUFFIX) if usd_path else None
+    return _load_or_build(directory, lambda: BoxIndex.build(blocking_boxes(boxes_from_params(params), spec), cell,
+                                                            key=key), BoxIndex)
+
+
+def index_for_stage(stage, spec: GridSpec = GridSpec(), cell: Optional[float] = None, cache: bool = True) -> BoxIndex:
+    """BoxIndex over the stage's blocking static geometry, cached next to its root layer."""
+    usd = stage.GetRootLayer().realPath
+    usd_path = Path(usd) if usd else None
+    if usd_path is not None:
+        params = _variant_params(usd_path)
+        if params is not None:
+            return index_for_params(params, spec, cell, usd_path if cache else None)
+    key = _index_key({"layers": _layer_stamps(stage)}, spec, cell)
+    directory = grid_dir(usd_path, key, INDEX_SUFFIX) if (cache and usd_path is not None) else None
+    return _load_or_build(directory, lambda: BoxIndex.build(blocking_boxes(boxes_from_stage(stage), spec), cell,
+                                                            key=key), BoxIndex)
+
+
+def spawn_sampler_for_stage(stage, clearance: float = 0.4, region=None, spec: GridSpec = GridSpec(),
+                            **kwargs) -> SpawnSampler:
+    """SpawnSampler over the stage's (cached) occupancy grid; region defaults to GO2_SPAWN_REGION
+    (set from the registry's spawn_region by the launcher). Extra kwargs go to SpawnSampler."""
+    if region is None:
+        region = parse_region(os.environ.get(SPAWN_REGION_ENV))
+    return SpawnSampler(occupancy_for_stage(stage, spec), clearance=clearance, region=region, **kwargs)
+
+
+__all__ = [
+    "boxes_from_params",
+    "boxes_from_stage",
+    "grid_dir",
+    "index_for_params",
+    "index_for_stage",
+    "occupancy_for_params",
+    "occupancy_for_stage",
+    "params_key",
+    "spawn_sampler_for_stage",
+    "stage_key",
+]
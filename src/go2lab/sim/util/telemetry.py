@@ -0,0 +1,140 @@
+"""Columnar per-frame telemetry: preallocated record chunks flushed to a memory-mappable file.
+
+TelemetryLog buffers one fixed-size record per frame in a preallocated NumPy structured
+array and appends it in chunks to
+    <dir>/telemetry.bin    raw little-endian records, back to back
+    <dir>/telemetry.json   schema (dtype descr), record count and run attributes
+so analysis is a single np.memmap over millions of frames instead of a JSON parse loop.
+A run that crashes loses at most the unflushed chunk; load_telemetry() ignores a trailing
+partial record.
+
+TELEMETRY_FIELDS is the default record (dataset_recorder): frame index, sim and wall time,
+base pose, commanded velocity, key state bitmask, render (app.update) latency and whether
+the frame was accepted by the frame writer. Row i describes frame i as rendered: pos/yaw is
+the pose shown in the frame, cmd the command then applied to move from it to row i+1. frame_drops() finds missed frames from the
+timestamps.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+TELEMETRY_FORMAT = 1
+DATA_NAME = "telemetry.bin"
+SCHEMA_NAME = "telemetry.json"
+
+TELEMETRY_FIELDS: Tuple[Tuple[Any, ...], ...] = (
+    ("frame", "<i8"),
+    ("sim_time", "<f8"),     # seconds of simulated time
+    ("wall_time", "<f8"),    # time.time() after the frame
+    ("pos", "<f4", (3,)),    # base position [m] shown in the frame (before the step)
+    ("yaw", "<f4"),          # base yaw [rad] shown in the frame (before the step)
+    ("cmd", "<f4", (3,)),    # commanded [vx, vy, wz], applied by the step after the frame
+    ("keys", "<u2"),         # bit i set when key i of the recorder's KEY_MAP is down
+    ("render_ms", "<f4"),    # app.update() duration
+    ("captured", "u1"),      # 1 when the frame writer accepted the frame
+)
+
+
+def _dtype_from_descr(descr) -> np.dtype:
+    # JSON turns descr tuples (and subarray shapes) into lists
+    return np.dtype([tuple(tuple(x) if isinstance(x, list) else x for x in field) for field in descr])
+
+
+class TelemetryLog:
+    """Append-only columnar log; record() fills the next row of a preallocated chunk."""
+
+    def __init__(self, directory: Path | str, fields: Sequence[Tuple[Any, ...]] = TELEMETRY_FIELDS,
+                 chunk: int = 4096, attrs: Optional[Dict[str, Any]] = None):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.dtype = np.dtype(list(fields))
+        self.chunk = np.zeros(max(1, int(chunk)), dtype=self.dtype)
+        self.attrs = dict(attrs or {})
+        self.count = 0
+        self._n = 0
+        self._file = (self.dir / DATA_NAME).open("wb")
+        self._write_schema()
+
+    def _write_schema(self) -> None:
+        schema = {"format": TELEMETRY_FORMAT, "dtype": self.dtype.descr, "itemsize": self.dtype.itemsize,
+                  "count": self.count, "attrs": self.attrs}
+        tmp = self.dir / f".{SCHEMA_NAME}.tmp"
+        tmp.write_text(json.dumps(schema, indent=2), encoding="utf-8")
+        os.replace(tmp, self.dir / SCHEMA_NAME)
+
+    def record(self, **values: Any) -> None:
+        """Store one record; omitted fields are zero."""
+        row = self.chunk[self._n]
+        for name, value in values.items():
+            row[name] = value
+        self._n += 1
+        if self._n == len(self.chunk):
+            self.flush()
+
+    def flush(self) -> None:
+        if self._n:
+            self._file.write(self.chunk[:self._n].tobytes())
+            self._file.flush()
+            self.count += self._n
+            self.chunk[:self._n] = 0
+            self._n = 0
+            self._write_schema()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self) -> "TelemetryLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def load_telemetry(directory: Path | str, mmap: bool = True) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """(records, attrs): records is a structured (read-only memmap) array, e.g. records["pos"] is (T, 3)."""
+    directory = Path(directory)
+    schema = json.loads((directory / SCHEMA_NAME).read_text(encoding="utf-8"))
+    if schema.get("format") != TELEMETRY_FORMAT:
+        raise ValueError(f"unsupported telemetry format in {directory}")
+    dtype = _dtype_from_descr(schema["dtype"])
+    path = directory / DATA_NAME
+    n = path.stat().st_size // dtype.itemsize
+    if n == 0:
+        return np.zeros(0, dtype=dtype), schema.get("attrs", {})
+    if mmap:
+        return np.memmap(path, dtype=dtype, mode="r", shape=(n,)), schema.get("attrs", {})
+    return np.fromfile(path, dtype=dtype, count=n), schema.get("attrs", {})
+
+
+def frame_drops(records: np.ndarray, fps: float, tolerance: float = 1.5) -> Dict[str, Any]:
+    """Missed frames from the wall-clock timestamps: a gap of k periods between consecutive
+    records counts k - 1 missed frames once it exceeds tolerance periods. Frames the writer
+    did not accept are reported separately."""
+    period = 1.0 / float(fps)
+    wall = np.asarray(records["wall_time"], dtype=np.float64)
+    dt = np.diff(wall)
+    late = np.flatnonzero(dt > tolerance * period)
+    missed = int(np.maximum(np.rint(dt[late] / period) - 1, 0).sum()) if late.size else 0
+    out = {
+        "frames": int(len(wall)),
+        "duration_s": float(wall[-1] - wall[0]) if len(wall) > 1 else 0.0,
+        "late_frames": int(late.size),
+        "missed_frames": missed,
+        "late_at": late + 1,
+        "period_ms_p95": float(np.percentile(dt, 95) * 1e3) if dt.size else 0.0,
+    }
+    if "captured" in records.dtype.names:
+        out["not_captured"] = int((np.asarray(records["captured"]) == 0).sum())
+    if "render_ms" in records.dtype.names and len(wall):
+        out["render_ms_p95"] = float(np.percentile(np.asarray(records["render_ms"]), 95))
+    return out
+
+
+__all__ = ["TelemetryLog", "TELEMETRY_FIELDS", "load_telemetry", "frame_drops"]
@@ -1,10 +1,17 @@
-"""Utilities for resolving USD path specs consistently and building Isaac Lab URLs."""
+"""Utilities for resolving USD path specs consistently and building Isaac Lab URLs.
+
+Remote specs resolve to their local copy in the asset cache (go2lab.sim.util.asset_cache)
+when available, so repeat startups open local files instead of the network.
+"""
 from __future__ import annotations
 
+import logging
 import os
 from pathlib import Path
 from typing import Tuple
 
+LOGGER = logging.getLogger("go2lab.usd_path")
+
 URL_PREFIXES = ("omniverse://", "omni://", "http://", "https://")
 
 
@@ -39,12 +46,23 @@ def isaaclab_asset_path(rel_path: str) -> str:
     return f"omniverse://localhost/NVIDIA/Isaac/IsaacLab/{rel}".replace("\\", "/")
 
 
-def resolve_usd_spec(spec: str, repo_root: Path | str) -> Tuple[str, str, bool]:
+def resolve_usd_spec(spec: str, repo_root: Path | str, use_cache: bool = True) -> Tuple[str, str, bool]:
     rr = Path(repo_root)
     s = normalize_spec(spec)
     kind = classify_spec(s)
     if kind == "url":
-        return "url", s, True
+        if not use_cache:
+            return "url", s, True
+        from .asset_cache import AssetCacheMiss, cached_asset
+
+        try:
+            local = cached_asset(s)
+        except AssetCacheMiss as exc:
+            LOGGER.error("%s", exc)
+            return "path", s, False
+        if local == s:
+            return "url", s, True
+        return "path", local, True
     p = Path(s)
     if not p.is_absolute():
         p = rr / s
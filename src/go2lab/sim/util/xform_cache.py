@@ -0,0 +1,182 @@
+"""Cached transform access for USD prims (local and world matrices).
+
+Per prim path the cache keeps the UsdGeom.Xformable handle, its ordered xform ops and
+the composed parent-to-world matrix; batched world queries compose parents in one matmul.
+Entries are invalidated from Usd.Notice.ObjectsChanged:
+- xformOpOrder edits / resyncs drop the prim's cached op list
+- xform value edits on a prim drop the cached parent matrix of its cached descendants
+so a per-step read is one GetLocalTransformation(ops) call instead of re-querying the
+op stack and re-composing every ancestor.
+
+version(path) is a cheap change counter for a prim's local transform, bumped by the same
+notices, so callers that keep their own pose state can detect edits made by others.
+
+Matrices follow the Gf row-vector layout (translation in the last row). One cache per
+stage is shared through shared_xform_cache(stage).
+"""
+from __future__ import annotations
+
+from typing import Dict, Sequence, Set
+import logging
+
+import numpy as np
+from pxr import Usd, UsdGeom, Sdf, Gf, Tf  # type: ignore
+
+LOGGER = logging.getLogger("go2lab.xform_cache")
+
+_IDENTITY = Gf.Matrix4d(1.0)
+
+
+def _as_path(p: Sdf.Path | str) -> Sdf.Path:
+    return p if isinstance(p, Sdf.Path) else Sdf.Path(p)
+
+
+class _Entry:
+    __slots__ = ("xformable", "ops", "resets", "parent", "parent_np")
+
+    def __init__(self, xformable, ops, resets: bool):
+        self.xformable = xformable
+        self.ops = ops
+        self.resets = resets
+        # parent-to-world matrix (Gf and NumPy copies); None until computed, parent_np None for identity
+        self.parent: Gf.Matrix4d | None = None
+        self.parent_np: np.ndarray | None = None
+
+
+class XformCache:
+    def __init__(self, stage: Usd.Stage, time: Usd.TimeCode | float | None = None):
+        self.stage = stage
+        self.time = Usd.TimeCode.Default() if time is None else Usd.TimeCode(time)
+        self._entries: Dict[Sdf.Path, _Entry] = {}
+        # ancestor path -> cached descendants whose parent matrix depends on it
+        self._dependents: Dict[Sdf.Path, Set[Sdf.Path]] = {}
+        # per-prim local transform edit counts, plus a global count of resyncs (which may touch any prim)
+        self._versions: Dict[Sdf.Path, int] = {}
+        self._resyncs = 0
+        self._listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._on_objects_changed, stage)
+
+    def _entry(self, path: Sdf.Path) -> _Entry:
+        e = self._entries.get(path)
+        if e is not None:
+            return e
+        prim = self.stage.GetPrimAtPath(path)
+        if prim and prim.IsA(UsdGeom.Xformable):
+            xf = UsdGeom.Xformable(prim)
+            e = _Entry(xf, xf.GetOrderedXformOps(), bool(xf.GetResetXformStack()))
+        else:
+            e = _Entry(None, [], False)
+        self._entries[path] = e
+        for anc in path.GetParentPath().GetPrefixes():
+            self._dependents.setdefault(anc, set()).add(path)
+        return e
+
+    def _local(self, e: _Entry) -> Gf.Matrix4d:
+        # single C++ call composing the pre-fetched op list
+        if not e.ops:
+            return Gf.Matrix4d(1.0)
+        return e.xformable.GetLocalTransformation(e.ops, self.time)
+
+    def _parent_world(self, path: Sdf.Path, e: _Entry) -> Gf.Matrix4d:
+        if e.parent is None:
+            parent = path.GetParentPath()
+            m = _IDENTITY if e.resets or parent == Sdf.Path.absoluteRootPath else self.world_matrix(parent)
+            e.parent = _IDENTITY if m == _IDENTITY else m
+            e.parent_np = None if e.parent is _IDENTITY else np.array(e.parent)
+        return e.parent
+
+    def local_matrix(self, path: Sdf.Path | str) -> Gf.Matrix4d:
+        return self._local(self._entry(_as_path(path)))
+
+    def world_matrix(self, path: Sdf.Path | str) -> Gf.Matrix4d:
+        p = _as_path(path)
+        e = self._entry(p)
+        parent = self._parent_world(p, e)
+        local = self._local(e)
+        return local if parent is _IDENTITY else local * parent
+
+    def local_matrices(self, paths: Sequence[Sdf.Path | str], out: np.ndarray | None = None) -> np.ndarray:
+        """Local matrices for many prims as an (N, 4, 4) float64 array (written into out if given)."""
+        if out is None:
+            out = np.empty((len(paths), 4, 4), dtype=np.float64)
+        for i, p in enumerate(paths):
+            out[i] = self._local(self._entry(_as_path(p)))
+        return out
+
+    def world_matrices(self, paths: Sequence[Sdf.Path | str], out: np.ndarray | None = None) -> np.ndarray:
+        """World matrices for many prims; parents are composed in one batched matmul."""
+        if out is None:
+            out = np.empty((len(paths), 4, 4), dtype=np.float64)
+        rows: list[int] = []
+        parents: list[np.ndarray] = []
+        for i, p in enumerate(paths):
+            p = _as_path(p)
+            e = self._entry(p)
+            self._parent_world(p, e)
+            out[i] = self._local(e)
+            if e.parent_np is not None:
+                rows.append(i)
+                parents.append(e.parent_np)
+        if rows:
+            out[rows] = np.matmul(out[rows], np.stack(parents))
+        return out
+
+    def version(self, path: Sdf.Path | str) -> int:
+        """Monotonic counter that changes whenever the prim's local transform may have changed."""
+        return self._resyncs + self._versions.get(_as_path(path), 0)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._dependents.clear()
+        self._resyncs += 1
+
+    def _drop_parents_below(self, prim_path: Sdf.Path) -> None:
+        for d in self._dependents.get(prim_path, ()):
+            e = self._entries.get(d)
+            if e is not None:
+                e.parent = None
+                e.parent_np = None
+
+    def _on_objects_changed(self, notice, sender) -> None:
+        resynced = notice.GetResyncedPaths()
+        if resynced:
+            self._resyncs += 1
+        for p in resynced:
+            if p == Sdf.Path.absoluteRootPath:
+                self.clear()
+                return
+            prim_path = p.GetPrimPath()
+            if p.IsPrimPath():
+                # prim (and subtree) recomposed: forget all handles under it
+                for d in self._dependents.pop(prim_path, ()):
+                    self._entries.pop(d, None)
+                self._entries.pop(prim_path, None)
+            else:
+                self._entries.pop(prim_path, None)
+                self._drop_parents_below(prim_path)
+        for p in notice.GetChangedInfoOnlyPaths():
+            if p.IsPropertyPath() and not p.name.startswith("xformOp"):
+                continue
+            prim_path = p.GetPrimPath()
+            if p.IsPropertyPath():
+                self._versions[prim_path] = self._versions.get(prim_path, 0) + 1
+            if p.name == UsdGeom.Tokens.xformOpOrder:
+                self._entries.pop(prim_path, None)
+            self._drop_parents_below(prim_path)
+
+
+_SHARED: Dict[str, XformCache] = {}
+
+
+def shared_xform_cache(stage: Usd.Stage) -> XformCache:
+    """Return the process-wide XformCache for stage (one per stage, keyed by its session layer)."""
+    key = stage.GetSessionLayer().identifier
+    cache = _SHARED.get(key)
+    if cache is None or cache.stage.expired:
+        for k in [k for k, c in _SHARED.items() if c.stage.expired]:
+            _SHARED.pop(k, None)
+        cache = XformCache(stage)
+        _SHARED[key] = cache
+    return cache
+
+
+__all__ = ["XformCache", "shared_xform_cache"]
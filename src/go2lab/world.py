@@ -1,33 +1,77 @@
 # Wrapper to import world helpers from legacy location
 from __future__ import annotations
 
+import os
 from pathlib import Path
 from typing import Callable
+import time
 
-from .sim.util.usd_path import resolve_usd_spec
+from .sim.util.usd_path import normalize_spec, resolve_usd_spec
 from .config import get_warehouse_spec
 
+PREFETCH_ENV = "GO2LAB_STAGE_PREFETCH"
+SNAPSHOT_ENV = "GO2LAB_STAGE_SNAPSHOT"
+
+
+def _prefetch(spec: str, logger=None):
+	# warm the asset cache with the whole dependency graph (concurrently) before resolving/opening
+	from .sim.util.asset_cache import cache_enabled, is_remote
+	if not is_remote(spec) or not cache_enabled():
+		return None
+	from .sim.util.stage_prefetch import prefetch_stage
+	try:
+		return prefetch_stage(spec)[1]
+	except Exception as exc:
+		if logger:
+			logger.warning("Stage prefetch failed for %s: %s", spec, exc)
+		return None
+
+
+def _snapshot(target: str, repo_root: Path, logger=None) -> str:
+	# flattened .usdc of the composed local stage; falls back to the source on any failure
+	from .sim.util.stage_snapshot import snapshot_go2, snapshot_stage
+	try:
+		path, hit = snapshot_stage(target, repo_root, with_go2=snapshot_go2())
+	except Exception as exc:
+		if logger:
+			logger.warning("Stage snapshot failed for %s: %s", target, exc)
+		return target
+	if logger:
+		logger.info("Stage snapshot %s: %s", "hit" if hit else "built", path)
+	return path
 
 
 def open_warehouse(open_stage: Callable[[str], None], repo_root: Path, spec: str | None = None,
-				   strict_missing: bool = False, logger=None) -> bool:
+				   strict_missing: bool = False, logger=None, prefetch: bool | None = None,
+				   snapshot: bool | None = None) -> bool:
+	"""Resolve and open the warehouse stage. Remote specs are prefetched concurrently into the
+	asset cache first (prefetch=None follows GO2LAB_STAGE_PREFETCH, default on) and a timing
+	report of I/O vs open time is logged. With snapshot (None follows GO2LAB_STAGE_SNAPSHOT,
+	default off) a local stage is opened from its flattened snapshot (go2lab.sim.util.stage_snapshot)."""
 	effective = (spec or get_warehouse_spec()).strip()
 	if effective.lower() in ("", "empty", "none"):
 		if logger:
 			logger.info("No environment specified (spec='%s'); skipping stage open.", effective)
 		return False
+	if prefetch is None:
+		prefetch = os.environ.get(PREFETCH_ENV, "1") != "0"
+	report = _prefetch(normalize_spec(effective), logger) if prefetch else None
 	kind, target, ok = resolve_usd_spec(effective, repo_root)
-	if kind == "url":
+	if snapshot is None:
+		snapshot = os.environ.get(SNAPSHOT_ENV, "0") not in ("", "0")
+	if kind == "path" and snapshot and Path(target).exists():
+		target = _snapshot(target, repo_root, logger)
+	if kind == "url" or Path(target).exists():
 		if logger:
-			logger.info("Opening stage from URL: %s", target)
+			logger.info("Opening %s: %s", "stage from URL" if kind == "url" else "local stage", target)
+		t0 = time.perf_counter()
 		open_stage(target)
+		if report is not None:
+			report.open_s = time.perf_counter() - t0
+			if logger:
+				logger.info("%s", report.summary())
 		return True
 	p = Path(target)
-	if p.exists():
-		if logger:
-			logger.info("Opening local stage: %s", p)
-		open_stage(str(p))
-		return True
 	if strict_missing:
 		if logger:
 			logger.error("Warehouse USD not found at local path: %s", p)
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import argparse
+import logging
 import os
 import sys
 from pathlib import Path
 
+LOGGER = logging.getLogger("isaac_unitree_go2")
+
 # This runner is executed by Isaac Sim's --exec. It dispatches per the new schema.
 RUN_CHOICES = [
     "train",
@@ -64,12 +67,14 @@ def main() -> int:
     target = None
     if args.env:
         try:
-            from go2lab.env_registry import resolve_env
-            kind, target, ok = resolve_env(args.env, repo_root)
+            from go2lab.env_registry import default_registry
+            registry = default_registry()
+            kind, target, ok = registry.resolve(args.env, repo_root)
             if ok and (target or "").strip().lower() not in ("", "empty", "none"):
                 os.environ["WAREHOUSE_USD"] = target
             else:
                 os.environ["WAREHOUSE_USD"] = "empty"
+            apply_env_entry(registry.entry_for(args.env), args)
         except Exception:
             # Best-effort: if a direct path/url was given, pass it through
             os.environ["WAREHOUSE_USD"] = args.env
@@ -123,6 +128,22 @@ def main() -> int:
     return run_exec(exec_path)
 
 
+def apply_env_entry(entry, args: argparse.Namespace) -> None:
+    # Per-env defaults from env/registry.yaml; CLI flags and already-set env vars take precedence
+    if entry.render_preset and not args.render_mode:
+        if entry.render_preset in ("performance", "quality", "pathtraced"):
+            args.render_mode = entry.render_preset
+        else:
+            LOGGER.warning("Unknown render_preset '%s' for env '%s'", entry.render_preset, entry.name)
+    os.environ.setdefault("GO2_NUM_ROBOTS", str(entry.num_robots))
+    if entry.spawn_region:
+        os.environ.setdefault("GO2_SPAWN_REGION", ",".join(str(v) for v in entry.spawn_region))
+    opts = entry.stage_opts
+    os.environ.setdefault("GO2LAB_INSTANCEABLE", "1" if opts.instanceable else "0")
+    os.environ.setdefault("GO2LAB_STAGE_PREFETCH", "1" if opts.prefetch else "0")
+    os.environ.setdefault("GO2LAB_STAGE_SNAPSHOT", "1" if opts.snapshot else "0")
+
+
 def run_exec(script: Path, extra: list[str] | None = None) -> int:
     # Run the given script as __main__ using runpy
     import runpy